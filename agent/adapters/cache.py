@@ -0,0 +1,35 @@
+"""Small in-process caches shared by the API adapters."""
+import time
+from typing import Any, Optional
+
+
+class TTLCache:
+    """Dict-like cache whose entries expire `ttl` seconds after being set."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict = {}  # key -> (value, expires_at)
+
+    def get(self, key, default: Optional[Any] = None) -> Any:
+        """Return the cached value, or default if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            # pop, not del: another thread may have expired it first
+            self._entries.pop(key, None)
+            return default
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+
+    def pop(self, key, default: Optional[Any] = None) -> Any:
+        """Remove and return the cached value (expired or not)."""
+        entry = self._entries.pop(key, None)
+        return entry[0] if entry else default
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
@@ -1,12 +1,38 @@
 """GitHub Adapter - Interact with GitHub API for PR status checks."""
+import asyncio
+import functools
 import os
 import re
+import time
 import httpx
-from typing import Optional, List
+import orjson
+from typing import Optional, List, Tuple
 from pydantic import BaseModel
 
 GITHUB_API_URL = "https://api.github.com"
 
+# Shared connection-pool settings for the sync and async clients
+HTTP_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=15.0
+)
+
+# Seconds a cached ETag/response pair stays eligible for conditional GETs
+ETAG_CACHE_TTL = 30.0
+
+# Unmerged PRs are re-checked after 60s, 120s, 240s, then every 5 minutes
+MERGE_BACKOFF_BASE = 30.0
+MERGE_BACKOFF_MAX = 300.0
+
+# "owner/repo#123" -> (etag, misses, next_check_at) for PRs last seen unmerged.
+# Module-level so it is shared by the sync and async adapters.
+MERGE_CHECK_CACHE: dict = {}
+
+# PR URL patterns, compiled once for get_pr_by_url
+PR_NUMBER_PATTERN = re.compile(r'/pull/(\d+)')
+PR_REPO_PATTERN = re.compile(r'github\.com/([^/]+/[^/]+)/pull')
+
 
 class PullRequest(BaseModel):
     """Representation of a GitHub PR."""
@@ -18,6 +44,110 @@ class PullRequest(BaseModel):
     head_ref: str  # branch name
 
 
+# GitHub v4 query returning open PRs and their merge state in one round-trip
+OPEN_PRS_QUERY = '''
+    query OpenPullRequests($owner: String!, $name: String!, $after: String) {
+        repository(owner: $owner, name: $name) {
+            pullRequests(first: 100, states: OPEN, after: $after) {
+                nodes {
+                    number
+                    title
+                    state
+                    merged
+                    url
+                    headRefName
+                }
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+            }
+        }
+    }
+'''
+
+
+def _parse_pr_url(pr_url: str, default_repo: str) -> Optional[Tuple[str, int]]:
+    """Extract (owner/repo, PR number) from a PR URL, falling back to default_repo."""
+    # Extract PR number from URL
+    match = PR_NUMBER_PATTERN.search(pr_url)
+    if not match:
+        print(f"Could not extract PR number from: {pr_url}")
+        return None
+    
+    # Extract owner/repo from URL or use configured repo
+    repo_match = PR_REPO_PATTERN.search(pr_url)
+    repo = repo_match.group(1) if repo_match else default_repo
+    return repo, int(match.group(1))
+
+
+def _parse_pr(data: dict) -> PullRequest:
+    """Build a PullRequest from a GitHub pulls API payload, skipping validation."""
+    return PullRequest.model_construct(
+        number=data["number"],
+        title=data["title"],
+        state=data["state"],
+        merged=data.get("merged", False),
+        html_url=data["html_url"],
+        head_ref=data["head"]["ref"]
+    )
+
+
+def _merge_status(response: httpx.Response, pr_number: int) -> bool:
+    """Interpret a /pulls/{n}/merge response: 204 merged, 404 not merged."""
+    if response.status_code == 204:
+        return True
+    if response.status_code != 404:
+        print(f"GitHub API error: {response.status_code} - {response.text}")
+    return False
+
+
+def _merge_check_headers(key: str) -> Optional[dict]:
+    """Return conditional headers for a due merge check, or None if it is backing off.
+    
+    A PR with no cache entry is always due; the dict may then be empty.
+    """
+    entry = MERGE_CHECK_CACHE.get(key)
+    if not entry:
+        return {}
+    etag, _, next_check_at = entry
+    if time.monotonic() < next_check_at:
+        return None
+    return {"If-None-Match": etag} if etag else {}
+
+
+def _record_merge_check(key: str, response: Optional[httpx.Response], merged: bool) -> None:
+    """Forget merged PRs; push an unmerged PR's next check out exponentially."""
+    if merged:
+        MERGE_CHECK_CACHE.pop(key, None)
+        return
+    etag, misses, _ = MERGE_CHECK_CACHE.get(key, (None, 0, 0.0))
+    if response is not None:
+        etag = response.headers.get("ETag") or etag
+    misses += 1
+    delay = min(MERGE_BACKOFF_MAX, MERGE_BACKOFF_BASE * 2 ** misses)
+    MERGE_CHECK_CACHE[key] = (etag, misses, time.monotonic() + delay)
+
+
+def _fresh_etag_entry(cache: dict, path: str) -> Optional[tuple]:
+    """Return the cached (etag, body) for path if it is within ETAG_CACHE_TTL."""
+    entry = cache.get(path)
+    if not entry:
+        return None
+    etag, body, fetched_at = entry
+    if time.monotonic() - fetched_at > ETAG_CACHE_TTL:
+        del cache[path]
+        return None
+    return etag, body
+
+
+def _store_etag_entry(cache: dict, path: str, response: httpx.Response, body) -> None:
+    """Remember the response body under its ETag, if GitHub sent one."""
+    etag = response.headers.get("ETag")
+    if etag:
+        cache[path] = (etag, body, time.monotonic())
+
+
 class GitHubAdapter:
     """Adapter for GitHub API interactions."""
 
@@ -34,15 +164,52 @@ class GitHubAdapter:
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28"
         }
+        # Persistent client so repeated API calls reuse the TCP+TLS connection
+        self._client = httpx.Client(
+            base_url=GITHUB_API_URL,
+            headers=self.headers,
+            http2=True,
+            timeout=30.0,
+            limits=HTTP_LIMITS
+        )
+        # path -> (etag, body, fetched_at) for conditional GETs
+        self._etag_cache: dict = {}
+
+    def close(self):
+        """Close the underlying HTTP client and release pooled connections."""
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        client = getattr(self, "_client", None)
+        if client is not None:
+            client.close()
 
     def _get(self, path: str) -> dict:
-        """Execute a GET request to GitHub API."""
-        url = f"{GITHUB_API_URL}{path}"
-        response = httpx.get(url, headers=self.headers)
-        if response.status_code != 200:
+        """Execute a GET request to GitHub API.
+        
+        Sends If-None-Match for recently fetched paths; a 304 reuses the cached
+        body and does not count against the rate limit.
+        """
+        cached = _fresh_etag_entry(self._etag_cache, path)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        response = self._client.get(path, headers=headers)
+        if cached and response.status_code == 304:
+            _store_etag_entry(self._etag_cache, path, response, cached[1])
+            return cached[1]
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError:
             print(f"GitHub API error: {response.status_code} - {response.text}")
-        response.raise_for_status()
-        return response.json()
+            raise
+        data = orjson.loads(response.content)
+        _store_etag_entry(self._etag_cache, path, response, data)
+        return data
 
     def get_pr_by_url(self, pr_url: str) -> Optional[PullRequest]:
         """Get PR details from a GitHub PR URL.
@@ -53,28 +220,13 @@ class GitHubAdapter:
         Returns:
             PullRequest object or None if not found
         """
-        # Extract PR number from URL
-        match = re.search(r'/pull/(\d+)', pr_url)
-        if not match:
-            print(f"Could not extract PR number from: {pr_url}")
+        parsed = _parse_pr_url(pr_url, self.repo)
+        if not parsed:
             return None
-        
-        pr_number = int(match.group(1))
-        
-        # Extract owner/repo from URL or use configured repo
-        repo_match = re.search(r'github\.com/([^/]+/[^/]+)/pull', pr_url)
-        repo = repo_match.group(1) if repo_match else self.repo
+        repo, pr_number = parsed
         
         try:
-            data = self._get(f"/repos/{repo}/pulls/{pr_number}")
-            return PullRequest(
-                number=data["number"],
-                title=data["title"],
-                state=data["state"],
-                merged=data.get("merged", False),
-                html_url=data["html_url"],
-                head_ref=data["head"]["ref"]
-            )
+            return _parse_pr(self._get(f"/repos/{repo}/pulls/{pr_number}"))
         except Exception as e:
             print(f"Error fetching PR {pr_number}: {e}")
             return None
@@ -88,26 +240,223 @@ class GitHubAdapter:
         Returns:
             True if merged, False otherwise
         """
-        pr = self.get_pr_by_url(pr_url)
-        if not pr:
+        # The /merge endpoint answers 204 (merged) or 404 (not merged) with no body
+        parsed = _parse_pr_url(pr_url, self.repo)
+        if not parsed:
             return False
-        return pr.merged
+        repo, pr_number = parsed
+        
+        # Only unmerged PRs are cached, so a skipped check or a 304 means "not merged"
+        key = f"{repo}#{pr_number}"
+        headers = _merge_check_headers(key)
+        if headers is None:
+            return False
+        
+        try:
+            response = self._client.get(f"/repos/{repo}/pulls/{pr_number}/merge", headers=headers)
+        except httpx.HTTPError as e:
+            print(f"Error checking merge status of PR {pr_number}: {e}")
+            _record_merge_check(key, None, False)
+            return False
+        merged = response.status_code != 304 and _merge_status(response, pr_number)
+        _record_merge_check(key, response, merged)
+        return merged
+
+    def are_prs_merged(self, pr_urls: List[str]) -> dict:
+        """Check several PRs concurrently via AsyncGitHubAdapter.
+
+        Sync callers only: from inside an event loop (graph nodes), await
+        AsyncGitHubAdapter.are_prs_merged directly instead.
+
+        Returns:
+            Dict of PR URL -> merged (True/False)
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "GitHubAdapter.are_prs_merged called from a running event loop; "
+                "await AsyncGitHubAdapter().are_prs_merged(...) instead"
+            )
+
+        async def _check():
+            async with AsyncGitHubAdapter() as client:
+                return await client.are_prs_merged(pr_urls)
+
+        return asyncio.run(_check())
 
     def get_open_prs(self) -> List[PullRequest]:
         """Get all open PRs for the configured repo."""
         try:
             data = self._get(f"/repos/{self.repo}/pulls?state=open")
-            return [
-                PullRequest(
-                    number=pr["number"],
-                    title=pr["title"],
-                    state=pr["state"],
-                    merged=pr.get("merged", False),
-                    html_url=pr["html_url"],
-                    head_ref=pr["head"]["ref"]
+            return [_parse_pr(pr) for pr in data]
+        except Exception as e:
+            print(f"Error fetching open PRs: {e}")
+            return []
+
+    def get_open_prs_with_status(self) -> List[PullRequest]:
+        """Get all open PRs with merge state via one GraphQL (v4) query per 100 PRs.
+        
+        Avoids a REST round-trip per PR when callers need state for every open PR.
+        """
+        owner, _, name = self.repo.partition("/")
+        prs = []
+        cursor = None
+        try:
+            while True:
+                response = self._client.post("/graphql", content=orjson.dumps({
+                    "query": OPEN_PRS_QUERY,
+                    "variables": {"owner": owner, "name": name, "after": cursor}
+                }))
+                response.raise_for_status()
+                result = orjson.loads(response.content)
+                if result.get("errors"):
+                    print(f"GitHub GraphQL error: {result['errors']}")
+                    return prs
+                pull_requests = result["data"]["repository"]["pullRequests"]
+                prs.extend(
+                    PullRequest.model_construct(
+                        number=pr["number"],
+                        title=pr["title"],
+                        state=pr["state"].lower(),
+                        merged=pr["merged"],
+                        html_url=pr["url"],
+                        head_ref=pr["headRefName"]
+                    )
+                    for pr in pull_requests["nodes"]
                 )
-                for pr in data
-            ]
+                page_info = pull_requests["pageInfo"]
+                if not page_info["hasNextPage"]:
+                    return prs
+                cursor = page_info["endCursor"]
+        except Exception as e:
+            print(f"Error fetching open PRs: {e}")
+            return prs
+
+
+@functools.cache
+def get_github_adapter() -> GitHubAdapter:
+    """Return the process-wide GitHubAdapter, created on first use.
+    
+    The poller calls it every tick, so merge checks keep one HTTP/2
+    connection and the ETag cache instead of starting cold each time.
+    Raises ValueError (and caches nothing) while GITHUB_API_KEY is unset.
+    """
+    return GitHubAdapter()
+
+
+class AsyncGitHubAdapter:
+    """Async adapter for GitHub API interactions.
+
+    Mirrors GitHubAdapter on an httpx.AsyncClient so independent lookups
+    (e.g. merge checks for several PRs) can be fanned out with asyncio.gather.
+    """
+
+    def __init__(self):
+        self.api_key = os.getenv("GITHUB_API_KEY")
+        if not self.api_key:
+            raise ValueError("GITHUB_API_KEY not set")
+        
+        self.repo = os.getenv("GITHUB_REPO", "")  # format: owner/repo
+        
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28"
+        }
+        self._client = httpx.AsyncClient(
+            base_url=GITHUB_API_URL,
+            headers=self.headers,
+            http2=True,
+            timeout=30.0,
+            limits=HTTP_LIMITS
+        )
+        # path -> (etag, body, fetched_at) for conditional GETs
+        self._etag_cache: dict = {}
+
+    async def aclose(self):
+        """Close the underlying HTTP client and release pooled connections."""
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _get(self, path: str) -> dict:
+        """Execute a GET request to GitHub API, revalidating cached ETags."""
+        cached = _fresh_etag_entry(self._etag_cache, path)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        response = await self._client.get(path, headers=headers)
+        if cached and response.status_code == 304:
+            _store_etag_entry(self._etag_cache, path, response, cached[1])
+            return cached[1]
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError:
+            print(f"GitHub API error: {response.status_code} - {response.text}")
+            raise
+        data = orjson.loads(response.content)
+        _store_etag_entry(self._etag_cache, path, response, data)
+        return data
+
+    async def get_pr_by_url(self, pr_url: str) -> Optional[PullRequest]:
+        """Get PR details from a GitHub PR URL."""
+        parsed = _parse_pr_url(pr_url, self.repo)
+        if not parsed:
+            return None
+        repo, pr_number = parsed
+        
+        try:
+            return _parse_pr(await self._get(f"/repos/{repo}/pulls/{pr_number}"))
+        except Exception as e:
+            print(f"Error fetching PR {pr_number}: {e}")
+            return None
+
+    async def is_pr_merged(self, pr_url: str) -> bool:
+        """Check if a PR has been merged."""
+        parsed = _parse_pr_url(pr_url, self.repo)
+        if not parsed:
+            return False
+        repo, pr_number = parsed
+        
+        key = f"{repo}#{pr_number}"
+        headers = _merge_check_headers(key)
+        if headers is None:
+            return False
+        
+        try:
+            response = await self._client.get(f"/repos/{repo}/pulls/{pr_number}/merge", headers=headers)
+        except httpx.HTTPError as e:
+            print(f"Error checking merge status of PR {pr_number}: {e}")
+            _record_merge_check(key, None, False)
+            return False
+        merged = response.status_code != 304 and _merge_status(response, pr_number)
+        _record_merge_check(key, response, merged)
+        return merged
+
+    async def are_prs_merged(self, pr_urls: List[str]) -> dict:
+        """Check several PRs concurrently.
+        
+        Returns:
+            Dict of PR URL -> merged (True/False)
+        """
+        results = await asyncio.gather(*(self.is_pr_merged(url) for url in pr_urls))
+        return dict(zip(pr_urls, results))
+
+    async def is_any_pr_merged(self, pr_urls: List[str]) -> bool:
+        """Check if any of the given PRs has been merged."""
+        merged = await self.are_prs_merged(pr_urls)
+        return any(merged.values())
+
+    async def get_open_prs(self) -> List[PullRequest]:
+        """Get all open PRs for the configured repo."""
+        try:
+            data = await self._get(f"/repos/{self.repo}/pulls?state=open")
+            return [_parse_pr(pr) for pr in data]
         except Exception as e:
             print(f"Error fetching open PRs: {e}")
             return []
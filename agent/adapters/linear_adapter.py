@@ -1,10 +1,360 @@
+import asyncio
+import functools
 import os
+import threading
 import httpx
+import orjson
 from typing import Optional, List
 from pydantic import BaseModel
+from agent.adapters.cache import TTLCache
 
 LINEAR_API_URL = "https://api.linear.app/graphql"
 
+# Shared connection-pool settings for the sync and async clients
+HTTP_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=15.0
+)
+
+# Team used for state lookups when the caller doesn't know the issue's team
+DEFAULT_TEAM_KEY = os.getenv("LINEAR_TEAM_KEY", "ENG")
+
+# Team and workflow-state IDs change rarely; share lookups across adapter instances.
+# State IDs are keyed by (team key, state name): every team has its own "Done"
+ID_CACHE_TTL = 300  # seconds
+STATE_ID_CACHE = TTLCache(ttl=ID_CACHE_TTL)
+TEAM_ID_CACHE = TTLCache(ttl=ID_CACHE_TTL)
+
+# Workflow states the AI factory relies on, created by ensure_workflow_states
+REQUIRED_WORKFLOW_STATES = [
+    # PRD Phase
+    {"name": "AI: Create PRD", "color": "#5e6ad2", "type": "unstarted", 
+     "description": "Product Manager will create PRD for this issue"},
+    {"name": "Human: Review PRD", "color": "#bb87fc", "type": "started",
+     "description": "Human reviews PRD before engineering"},
+    # ERD Phase
+    {"name": "AI: Create ERD", "color": "#26b5ce", "type": "started",
+     "description": "Engineer creates technical sub-issues with ERD"},
+    {"name": "Human: Review ERD", "color": "#bb87fc", "type": "started",
+     "description": "Human reviews technical specs in sub-issues"},
+    # Implementation Phase
+    {"name": "AI: Implement", "color": "#5e6ad2", "type": "started",
+     "description": "Queue of sub-issues ready for implementation"},
+    {"name": "AI: In Progress", "color": "#f2c94c", "type": "started",
+     "description": "AI is currently working on this issue"},
+    {"name": "Human: Review PR", "color": "#bb87fc", "type": "started",
+     "description": "PR opened, waiting for human review and merge"},
+    # Error handling
+    {"name": "AI: Failed", "color": "#eb5757", "type": "started",
+     "description": "AI encountered an error"},
+]
+
+
+# States that count a sub-issue as finished for parent completion
+COMPLETED_STATES = frozenset({"Done", "Completed", "Closed", "Canceled"})
+
+# GraphQL documents, defined once at module scope and shared by both adapters
+ISSUES_IN_STATE_QUERY = '''
+    query IssuesInState($teamKey: String!, $stateName: String!) {
+        issues(filter: {
+            team: { key: { eq: $teamKey } }
+            state: { name: { eq: $stateName } }
+        }) {
+            nodes {
+                id
+                identifier
+                title
+                description
+                state { name }
+                priority
+                parent { id }
+                team { key }
+            }
+        }
+    }
+'''
+
+# Several columns in one request; callers group the nodes by state name.
+# Paginated with _query_issue_pages so busy columns are never cut off
+ISSUES_IN_STATES_QUERY = '''
+    query IssuesInStates($teamKey: String!, $stateNames: [String!]!, $after: String) {
+        issues(first: 250, after: $after, filter: {
+            team: { key: { eq: $teamKey } }
+            state: { name: { in: $stateNames } }
+        }) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+                id
+                identifier
+                title
+                description
+                state { name }
+                priority
+                parent { id }
+                team { key }
+            }
+        }
+    }
+'''
+
+GET_STATE_QUERY = '''
+    query GetState($name: String!) {
+        workflowStates(filter: { name: { eq: $name } }) {
+            nodes { id }
+        }
+    }
+'''
+
+# Every state of a team, so one lookup fills the state-ID cache for all names
+TEAM_WORKFLOW_STATES_QUERY = '''
+    query TeamWorkflowStates($teamKey: String!) {
+        workflowStates(first: 250, filter: { team: { key: { eq: $teamKey } } }) {
+            nodes { id name }
+        }
+    }
+'''
+
+UPDATE_ISSUE_STATE_MUTATION = '''
+    mutation UpdateIssue($id: String!, $stateId: String!) {
+        issueUpdate(id: $id, input: { stateId: $stateId }) {
+            success
+        }
+    }
+'''
+
+ADD_COMMENT_MUTATION = '''
+    mutation AddComment($issueId: String!, $body: String!) {
+        commentCreate(input: { issueId: $issueId, body: $body }) {
+            success
+        }
+    }
+'''
+
+# State change plus a comment explaining it, as one request
+TRANSITION_AND_COMMENT_MUTATION = '''
+    mutation TransitionAndComment($id: String!, $stateId: String!, $body: String!) {
+        update: issueUpdate(id: $id, input: { stateId: $stateId }) {
+            success
+        }
+        comment: commentCreate(input: { issueId: $id, body: $body }) {
+            success
+        }
+    }
+'''
+
+UPDATE_ISSUE_DESCRIPTION_MUTATION = '''
+    mutation UpdateIssueDescription($id: String!, $description: String!) {
+        issueUpdate(id: $id, input: { description: $description }) {
+            success
+        }
+    }
+'''
+
+# Description + state in one issueUpdate, optionally with a comment, as one request
+UPDATE_ISSUE_DESCRIPTION_AND_STATE_MUTATION = '''
+    mutation UpdateIssueDescriptionAndState($id: String!, $description: String!, $stateId: String!) {
+        update: issueUpdate(id: $id, input: { description: $description, stateId: $stateId }) {
+            success
+        }
+    }
+'''
+
+COMMENT_AND_UPDATE_ISSUE_MUTATION = '''
+    mutation CommentAndUpdateIssue($id: String!, $body: String!, $description: String!, $stateId: String!) {
+        comment: commentCreate(input: { issueId: $id, body: $body }) {
+            success
+        }
+        update: issueUpdate(id: $id, input: { description: $description, stateId: $stateId }) {
+            success
+        }
+    }
+'''
+
+CREATE_SUB_ISSUE_MUTATION = '''
+    mutation CreateSubIssue($teamId: String!, $title: String!, $description: String!, $parentId: String!, $stateId: String) {
+        issueCreate(input: {
+            teamId: $teamId
+            title: $title
+            description: $description
+            parentId: $parentId
+            stateId: $stateId
+        }) {
+            success
+            issue {
+                id
+                identifier
+                title
+                description
+                state { name }
+                priority
+                parent { id }
+                team { key }
+            }
+        }
+    }
+'''
+
+# Sub-issue creation plus the parent's state change, as one request
+CREATE_SUB_ISSUE_AND_UPDATE_PARENT_MUTATION = '''
+    mutation CreateSubIssueAndUpdateParent($teamId: String!, $title: String!, $description: String!, $parentId: String!, $stateId: String, $parentStateId: String!) {
+        create: issueCreate(input: {
+            teamId: $teamId
+            title: $title
+            description: $description
+            parentId: $parentId
+            stateId: $stateId
+        }) {
+            success
+            issue {
+                id
+                identifier
+                title
+                description
+                state { name }
+                priority
+                parent { id }
+                team { key }
+            }
+        }
+        update: issueUpdate(id: $parentId, input: { stateId: $parentStateId }) {
+            success
+        }
+    }
+'''
+
+GET_SUB_ISSUES_QUERY = '''
+    query GetSubIssues($parentId: String!) {
+        issue(id: $parentId) {
+            children {
+                nodes {
+                    id
+                    identifier
+                    title
+                    description
+                    state { name }
+                    priority
+                    parent { id }
+                    team { key }
+                }
+            }
+        }
+    }
+'''
+
+# Children of several parents in one request; callers group them by parent.
+# Paginated: a truncated list could make a parent look complete
+SUB_ISSUES_BULK_QUERY = '''
+    query SubIssuesBulk($parentIds: [ID!]!, $after: String) {
+        issues(first: 250, after: $after, filter: { parent: { id: { in: $parentIds } } }) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+                id
+                identifier
+                title
+                description
+                state { name }
+                priority
+                parent { id }
+                team { key }
+            }
+        }
+    }
+'''
+
+GET_COMMENTS_QUERY = '''
+    query GetComments($issueId: String!) {
+        issue(id: $issueId) {
+            comments {
+                nodes {
+                    body
+                }
+            }
+        }
+    }
+'''
+
+GET_ISSUE_QUERY = '''
+    query GetIssue($id: String!) {
+        issue(id: $id) {
+            id
+            identifier
+            title
+            description
+            state { name }
+            priority
+            parent { id }
+            team { key }
+        }
+    }
+'''
+
+GET_TEAM_QUERY = '''
+    query GetTeam($key: String!) {
+        teams(filter: { key: { eq: $key } }) {
+            nodes { id }
+        }
+    }
+'''
+
+GET_TEAM_STATES_QUERY = '''
+    query GetStates($teamId: String!) {
+        team(id: $teamId) {
+            states {
+                nodes {
+                    name
+                }
+            }
+        }
+    }
+'''
+
+CREATE_WORKFLOW_STATE_MUTATION = '''
+    mutation CreateWorkflowState($teamId: String!, $name: String!, $color: String!, $type: String!, $description: String) {
+        workflowStateCreate(input: {
+            teamId: $teamId
+            name: $name
+            color: $color
+            type: $type
+            description: $description
+        }) {
+            success
+            workflowState {
+                id
+                name
+            }
+        }
+    }
+'''
+
+
+GET_WEBHOOKS_QUERY = '''
+    query GetWebhooks {
+        webhooks {
+            nodes {
+                id
+                url
+                enabled
+            }
+        }
+    }
+'''
+
+CREATE_WEBHOOK_MUTATION = '''
+    mutation CreateWebhook($teamId: String!, $url: String!, $secret: String) {
+        webhookCreate(input: {
+            teamId: $teamId
+            url: $url
+            secret: $secret
+            resourceTypes: ["Issue"]
+        }) {
+            success
+            webhook {
+                id
+            }
+        }
+    }
+'''
 
 class LinearIssue(BaseModel):
     id: str
@@ -14,6 +364,43 @@ class LinearIssue(BaseModel):
     state: str
     priority: int
     parent_id: Optional[str] = None
+    team_key: Optional[str] = None
+
+
+def _parse_issue(issue: dict) -> LinearIssue:
+    """Build a LinearIssue from a GraphQL issue node.
+
+    Uses model_construct to skip validation - the shape is fixed by our own queries.
+    """
+    parent = issue.get("parent")
+    team = issue.get("team")
+    return LinearIssue.model_construct(
+        id=issue["id"],
+        identifier=issue["identifier"],
+        title=issue["title"],
+        description=issue.get("description"),
+        state=issue["state"]["name"],
+        priority=issue.get("priority", 0),
+        parent_id=parent.get("id") if parent else None,
+        team_key=team.get("key") if team else None
+    )
+
+
+def _state_key(state_name: str, team_key: Optional[str]) -> tuple[str, str]:
+    """STATE_ID_CACHE key for a state of a team (DEFAULT_TEAM_KEY if unknown)."""
+    return (team_key or DEFAULT_TEAM_KEY, state_name)
+
+
+def _cache_team_states(team_key: str, result: dict) -> None:
+    """Store every state from a TEAM_WORKFLOW_STATES_QUERY result."""
+    for state in (result.get("data") or {}).get("workflowStates", {}).get("nodes", []):
+        STATE_ID_CACHE[(team_key, state["name"])] = state["id"]
+
+
+def _first_state_id(result: dict) -> Optional[str]:
+    """ID of the first state in a GET_STATE_QUERY result."""
+    states = (result.get("data") or {}).get("workflowStates", {}).get("nodes", [])
+    return states[0]["id"] if states else None
 
 
 class LinearAdapter:
@@ -27,6 +414,31 @@ class LinearAdapter:
             "Authorization": self.api_key,
             "Content-Type": "application/json"
         }
+        # Persistent client so back-to-back GraphQL calls reuse the TCP+TLS connection
+        self._client = httpx.Client(
+            headers=self.headers,
+            http2=True,
+            timeout=30.0,
+            limits=HTTP_LIMITS
+        )
+        # (team key, state name) and team key -> ID, populated lazily and shared across instances
+        self._state_id_cache = STATE_ID_CACHE
+        self._team_id_cache = TEAM_ID_CACHE
+
+    def close(self):
+        """Close the underlying HTTP client and release pooled connections."""
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        client = getattr(self, "_client", None)
+        if client is not None:
+            client.close()
 
     def _query(self, query: str, variables: dict = None) -> dict:
         """Execute a GraphQL query against Linear."""
@@ -34,120 +446,185 @@ class LinearAdapter:
         if variables:
             payload["variables"] = variables
 
-        response = httpx.post(
-            LINEAR_API_URL,
-            headers=self.headers,
-            json=payload
-        )
-        if response.status_code != 200:
+        response = self._client.post(LINEAR_API_URL, content=orjson.dumps(payload))
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError:
             print(f"Linear API error: {response.status_code} - {response.text}")
-        response.raise_for_status()
-        return response.json()
+            raise
+        return orjson.loads(response.content)
 
     def get_issues_in_state(self, team_key: str, state_name: str) -> List[LinearIssue]:
         """Fetch issues in a specific workflow state."""
-        query = '''
-        query IssuesInState($teamKey: String!, $stateName: String!) {
-            issues(filter: {
-                team: { key: { eq: $teamKey } }
-                state: { name: { eq: $stateName } }
-            }) {
-                nodes {
-                    id
-                    identifier
-                    title
-                    description
-                    state { name }
-                    priority
-                    parent { id }
-                }
-            }
-        }
-        '''
-        result = self._query(query, {"teamKey": team_key, "stateName": state_name})
+        result = self._query(ISSUES_IN_STATE_QUERY, {"teamKey": team_key, "stateName": state_name})
         issues = result.get("data", {}).get("issues", {}).get("nodes", [])
 
-        return [
-            LinearIssue(
-                id=issue["id"],
-                identifier=issue["identifier"],
-                title=issue["title"],
-                description=issue.get("description"),
-                state=issue["state"]["name"],
-                priority=issue["priority"],
-                parent_id=issue.get("parent", {}).get("id") if issue.get("parent") else None
-            )
-            for issue in issues
-        ]
+        return [_parse_issue(issue) for issue in issues]
+
+    def _query_issue_pages(self, query: str, variables: dict) -> List[dict]:
+        """Run a paginated issues query and return the nodes from every page.
+        
+        Raises:
+            ValueError: If Linear reports a GraphQL error, rather than returning
+                a partial list that callers would take as complete
+        """
+        nodes = []
+        cursor = None
+        while True:
+            result = self._query(query, {**variables, "after": cursor})
+            if result.get("errors"):
+                raise ValueError(f"Linear API error: {result['errors']}")
+            issues = result["data"]["issues"]
+            nodes.extend(issues["nodes"])
+            page_info = issues["pageInfo"]
+            if not page_info["hasNextPage"]:
+                return nodes
+            cursor = page_info["endCursor"]
+
+    def get_issues_in_states(self, team_key: str, state_names: List[str]) -> dict[str, List[LinearIssue]]:
+        """Fetch issues in several workflow states, one request per 250 issues.
+        
+        Returns:
+            Dict of state name -> issues, with an entry for every requested state
+        """
+        nodes = self._query_issue_pages(
+            ISSUES_IN_STATES_QUERY,
+            {"teamKey": team_key, "stateNames": list(state_names)}
+        )
+        by_state = {name: [] for name in state_names}
+        for node in nodes:
+            issue = _parse_issue(node)
+            by_state.setdefault(issue.state, []).append(issue)
+        return by_state
 
     def get_ready_issues(self, team_key: str) -> List[LinearIssue]:
         """Fetch issues in the 'AI: Create PRD' state. (Legacy - use get_issues_in_state)"""
         return self.get_issues_in_state(team_key, "AI: Create PRD")
 
-    def transition_issue(self, issue_id: str, state_name: str) -> bool:
-        """Move an issue to a different state."""
-        # First, get the state ID
-        state_query = '''
-        query GetState($name: String!) {
-            workflowStates(filter: { name: { eq: $name } }) {
-                nodes { id }
-            }
-        }
-        '''
-        state_result = self._query(state_query, {"name": state_name})
-        states = state_result.get("data", {}).get("workflowStates", {}).get("nodes", [])
+    def _get_state_id(self, state_name: str, team_key: Optional[str] = None) -> Optional[str]:
+        """Resolve a team's workflow state name to its ID, caching successful lookups.
+        
+        A miss loads every state of the team in one query, so the other names
+        a tick transitions to are already cached.
+        """
+        key = _state_key(state_name, team_key)
+        state_id = self._state_id_cache.get(key)
+        if state_id:
+            return state_id
 
-        if not states:
-            return False
+        _cache_team_states(key[0], self._query(TEAM_WORKFLOW_STATES_QUERY, {"teamKey": key[0]}))
+        state_id = self._state_id_cache.get(key)
+        if state_id:
+            return state_id
+
+        # Not a state of that team - fall back to a workspace-wide lookup
+        state_id = _first_state_id(self._query(GET_STATE_QUERY, {"name": state_name}))
+        if state_id:
+            self._state_id_cache[key] = state_id
+        return state_id
 
-        state_id = states[0]["id"]
+    def transition_issue(self, issue_id: str, state_name: str, team_key: Optional[str] = None) -> bool:
+        """Move an issue to a different state of its team (DEFAULT_TEAM_KEY if not given)."""
+        state_id = self._get_state_id(state_name, team_key)
+        if not state_id:
+            return False
 
-        mutation = '''
-        mutation UpdateIssue($id: String!, $stateId: String!) {
-            issueUpdate(id: $id, input: { stateId: $stateId }) {
-                success
-            }
-        }
-        '''
-        result = self._query(mutation, {"id": issue_id, "stateId": state_id})
-        return result.get("data", {}).get("issueUpdate", {}).get("success", False)
+        result = self._query(UPDATE_ISSUE_STATE_MUTATION, {"id": issue_id, "stateId": state_id})
+        success = result.get("data", {}).get("issueUpdate", {}).get("success", False)
+        if not success:
+            # Cached ID may be stale (state deleted/recreated) - re-resolve next time
+            self._state_id_cache.pop(_state_key(state_name, team_key), None)
+        return success
 
     def add_comment(self, issue_id: str, body: str) -> bool:
         """Add a comment to an issue."""
-        mutation = '''
-        mutation AddComment($issueId: String!, $body: String!) {
-            commentCreate(input: { issueId: $issueId, body: $body }) {
-                success
-            }
-        }
-        '''
-        result = self._query(mutation, {"issueId": issue_id, "body": body})
+        result = self._query(ADD_COMMENT_MUTATION, {"issueId": issue_id, "body": body})
         return result.get("data", {}).get("commentCreate", {}).get("success", False)
 
+    def transition_issue_with_comment(
+        self,
+        issue_id: str,
+        state_name: str,
+        body: str,
+        team_key: Optional[str] = None
+    ) -> bool:
+        """Move an issue to a state of its team and comment on it in one request.
+        
+        Returns:
+            True if both the state change and the comment succeeded
+        """
+        state_id = self._get_state_id(state_name, team_key)
+        if not state_id:
+            # Still leave the comment, as separate transition/comment calls would
+            self.add_comment(issue_id, body)
+            return False
+
+        result = self._query(TRANSITION_AND_COMMENT_MUTATION, {"id": issue_id, "stateId": state_id, "body": body})
+        data = result.get("data") or {}
+        if not (data.get("update") or {}).get("success", False):
+            # Cached ID may be stale (state deleted/recreated) - re-resolve next time
+            self._state_id_cache.pop(_state_key(state_name, team_key), None)
+            return False
+        return (data.get("comment") or {}).get("success", False)
+
     def update_issue_description(self, issue_id: str, description: str) -> bool:
         """Update an issue's description."""
-        mutation = '''
-        mutation UpdateIssueDescription($id: String!, $description: String!) {
-            issueUpdate(id: $id, input: { description: $description }) {
-                success
-            }
-        }
-        '''
-        result = self._query(mutation, {"id": issue_id, "description": description})
+        result = self._query(UPDATE_ISSUE_DESCRIPTION_MUTATION, {"id": issue_id, "description": description})
         return result.get("data", {}).get("issueUpdate", {}).get("success", False)
 
+    def update_issue_with_comment(
+        self,
+        issue_id: str,
+        description: str,
+        state_name: str,
+        comment_body: Optional[str] = None,
+        team_key: Optional[str] = None
+    ) -> bool:
+        """Replace an issue's description and move it to a state in one request.
+        
+        Args:
+            issue_id: Issue ID to update
+            description: New description
+            state_name: Target workflow state name
+            comment_body: Optional comment posted in the same mutation
+            team_key: Issue's team, for resolving state_name (DEFAULT_TEAM_KEY if omitted)
+            
+        Returns:
+            True if every write in the mutation succeeded
+        """
+        state_id = self._get_state_id(state_name, team_key)
+        if not state_id:
+            return False
+
+        variables = {"id": issue_id, "description": description, "stateId": state_id}
+        if comment_body:
+            variables["body"] = comment_body
+            mutation, aliases = COMMENT_AND_UPDATE_ISSUE_MUTATION, ("comment", "update")
+        else:
+            mutation, aliases = UPDATE_ISSUE_DESCRIPTION_AND_STATE_MUTATION, ("update",)
+
+        result = self._query(mutation, variables)
+        data = result.get("data") or {}
+        success = all((data.get(alias) or {}).get("success", False) for alias in aliases)
+        if not success:
+            # Cached ID may be stale (state deleted/recreated) - re-resolve next time
+            self._state_id_cache.pop(_state_key(state_name, team_key), None)
+        return success
+
     def get_team_id(self, team_key: str) -> Optional[str]:
         """Get team ID by team key."""
-        query = '''
-        query GetTeam($key: String!) {
-            teams(filter: { key: { eq: $key } }) {
-                nodes { id }
-            }
-        }
-        '''
-        result = self._query(query, {"key": team_key})
+        team_id = self._team_id_cache.get(team_key)
+        if team_id:
+            return team_id
+
+        result = self._query(GET_TEAM_QUERY, {"key": team_key})
         teams = result.get("data", {}).get("teams", {}).get("nodes", [])
-        return teams[0]["id"] if teams else None
+        if not teams:
+            return None
+
+        team_id = teams[0]["id"]
+        self._team_id_cache[team_key] = team_id
+        return team_id
 
     def create_sub_issue(
         self,
@@ -165,40 +642,9 @@ class LinearAdapter:
             return None
 
         # Get state ID for initial state
-        state_query = '''
-        query GetState($name: String!) {
-            workflowStates(filter: { name: { eq: $name } }) {
-                nodes { id }
-            }
-        }
-        '''
-        state_result = self._query(state_query, {"name": state_name})
-        states = state_result.get("data", {}).get("workflowStates", {}).get("nodes", [])
-        state_id = states[0]["id"] if states else None
+        state_id = self._get_state_id(state_name, team_key)
 
         # Create the sub-issue
-        mutation = '''
-        mutation CreateSubIssue($teamId: String!, $title: String!, $description: String!, $parentId: String!, $stateId: String) {
-            issueCreate(input: {
-                teamId: $teamId
-                title: $title
-                description: $description
-                parentId: $parentId
-                stateId: $stateId
-            }) {
-                success
-                issue {
-                    id
-                    identifier
-                    title
-                    description
-                    state { name }
-                    priority
-                    parent { id }
-                }
-            }
-        }
-        '''
         variables = {
             "teamId": team_id,
             "title": title,
@@ -208,7 +654,7 @@ class LinearAdapter:
         if state_id:
             variables["stateId"] = state_id
 
-        result = self._query(mutation, variables)
+        result = self._query(CREATE_SUB_ISSUE_MUTATION, variables)
         issue_data = result.get("data", {}).get("issueCreate", {})
 
         if not issue_data.get("success"):
@@ -216,15 +662,59 @@ class LinearAdapter:
             return None
 
         issue = issue_data.get("issue", {})
-        return LinearIssue(
-            id=issue["id"],
-            identifier=issue["identifier"],
-            title=issue["title"],
-            description=issue.get("description"),
-            state=issue["state"]["name"],
-            priority=issue.get("priority", 0),
-            parent_id=issue.get("parent", {}).get("id") if issue.get("parent") else None
-        )
+        return _parse_issue(issue)
+
+    def create_sub_issue_and_transition_parent(
+        self,
+        parent_id: str,
+        team_key: str,
+        title: str,
+        description: str,
+        state_name: str,
+        parent_state_name: str
+    ) -> tuple[Optional[LinearIssue], bool]:
+        """Create a sub-issue and move its parent to a new state in one request.
+        
+        Both mutations run in the same GraphQL document, so the parent update
+        is attempted even if the create fails; callers should undo it then.
+        
+        Returns:
+            (created sub-issue or None, whether the parent update succeeded)
+        """
+        parent_state_id = self._get_state_id(parent_state_name, team_key)
+        if not parent_state_id:
+            return self.create_sub_issue(parent_id, team_key, title, description, state_name), False
+
+        team_id = self.get_team_id(team_key)
+        if not team_id:
+            print(f"Could not find team with key: {team_key}")
+            return None, False
+
+        variables = {
+            "teamId": team_id,
+            "title": title,
+            "description": description,
+            "parentId": parent_id,
+            "parentStateId": parent_state_id
+        }
+        state_id = self._get_state_id(state_name, team_key)
+        if state_id:
+            variables["stateId"] = state_id
+
+        result = self._query(CREATE_SUB_ISSUE_AND_UPDATE_PARENT_MUTATION, variables)
+        data = result.get("data") or {}
+
+        updated = (data.get("update") or {}).get("success", False)
+        if not updated:
+            # Cached ID may be stale (state deleted/recreated) - re-resolve next time
+            self._state_id_cache.pop(_state_key(parent_state_name, team_key), None)
+
+        issue_data = data.get("create") or {}
+        if not issue_data.get("success"):
+            print(f"Failed to create sub-issue: {result}")
+            return None, updated
+
+        return _parse_issue(issue_data.get("issue", {})), updated
 
     def create_workflow_state(
         self,
@@ -251,24 +741,7 @@ class LinearAdapter:
             print(f"Could not find team with key: {team_key}")
             return None
 
-        mutation = '''
-        mutation CreateWorkflowState($teamId: String!, $name: String!, $color: String!, $type: String!, $description: String) {
-            workflowStateCreate(input: {
-                teamId: $teamId
-                name: $name
-                color: $color
-                type: $type
-                description: $description
-            }) {
-                success
-                workflowState {
-                    id
-                    name
-                }
-            }
-        }
-        '''
-        result = self._query(mutation, {
+        result = self._query(CREATE_WORKFLOW_STATE_MUTATION, {
             "teamId": team_id,
             "name": name,
             "color": color,
@@ -280,6 +753,7 @@ class LinearAdapter:
         if state_data.get("success"):
             state = state_data.get("workflowState", {})
             print(f"✅ Created workflow state: {state.get('name')} ({state.get('id')})")
+            self._state_id_cache[_state_key(name, team_key)] = state.get("id")
             return state.get("id")
         else:
             errors = result.get("errors", [])
@@ -292,153 +766,159 @@ class LinearAdapter:
         if not team_id:
             return []
             
-        query = '''
-        query GetStates($teamId: String!) {
-            team(id: $teamId) {
-                states {
-                    nodes {
-                        name
-                    }
-                }
-            }
-        }
-        '''
-        result = self._query(query, {"teamId": team_id})
+        result = self._query(GET_TEAM_STATES_QUERY, {"teamId": team_id})
         states = result.get("data", {}).get("team", {}).get("states", {}).get("nodes", [])
         return [s["name"] for s in states]
 
+    def create_workflow_states(self, team_id: str, states: List[dict]) -> dict:
+        """Create several workflow states in one aliased GraphQL mutation.
+        
+        Args:
+            team_id: Team ID (not key) that owns the states
+            states: Dicts with "name", "color", "type" and "description"
+            
+        Returns:
+            Dict of state name -> state ID if created, None if failed
+        """
+        if not states:
+            return {}
+
+        params = ["$teamId: String!"]
+        fields = []
+        variables = {"teamId": team_id}
+        for i, state in enumerate(states):
+            params.append(
+                f"$name{i}: String!, $color{i}: String!, $type{i}: String!, $description{i}: String"
+            )
+            fields.append(f'''
+            s{i}: workflowStateCreate(input: {{
+                teamId: $teamId
+                name: $name{i}
+                color: $color{i}
+                type: $type{i}
+                description: $description{i}
+            }}) {{
+                success
+                workflowState {{
+                    id
+                    name
+                }}
+            }}''')
+            variables[f"name{i}"] = state["name"]
+            variables[f"color{i}"] = state["color"]
+            variables[f"type{i}"] = state["type"]
+            variables[f"description{i}"] = state["description"]
+
+        mutation = f"mutation CreateWorkflowStates({', '.join(params)}) {{{''.join(fields)}\n        }}"
+        result = self._query(mutation, variables)
+        data = result.get("data") or {}
+
+        created = {}
+        for i, state in enumerate(states):
+            state_data = data.get(f"s{i}") or {}
+            if state_data.get("success"):
+                new_state = state_data.get("workflowState", {})
+                print(f"✅ Created workflow state: {new_state.get('name')} ({new_state.get('id')})")
+                created[state["name"]] = new_state.get("id")
+            else:
+                created[state["name"]] = None
+        if not all(created.values()):
+            print(f"Failed to create workflow state(s): {result.get('errors', [])}")
+        return created
+
     def ensure_workflow_states(self, team_key: str) -> dict:
         """Ensure required workflow states exist for the AI factory.
         
-        Creates any missing states from the required set.
+        Checks existing states in one query and creates any missing ones
+        from the required set in a single batched mutation.
         
         Returns:
             Dict of state name -> created (True) or already existed (False)
         """
-        required_states = [
-            # PRD Phase
-            {"name": "AI: Create PRD", "color": "#5e6ad2", "type": "unstarted", 
-             "description": "Product Manager will create PRD for this issue"},
-            {"name": "Human: Review PRD", "color": "#bb87fc", "type": "started",
-             "description": "Human reviews PRD before engineering"},
-            # ERD Phase
-            {"name": "AI: Create ERD", "color": "#26b5ce", "type": "started",
-             "description": "Engineer creates technical sub-issues with ERD"},
-            {"name": "Human: Review ERD", "color": "#bb87fc", "type": "started",
-             "description": "Human reviews technical specs in sub-issues"},
-            # Implementation Phase
-            {"name": "AI: Implement", "color": "#5e6ad2", "type": "started",
-             "description": "Queue of sub-issues ready for implementation"},
-            {"name": "AI: In Progress", "color": "#f2c94c", "type": "started",
-             "description": "AI is currently working on this issue"},
-            {"name": "Human: Review PR", "color": "#bb87fc", "type": "started",
-             "description": "PR opened, waiting for human review and merge"},
-            # Error handling
-            {"name": "AI: Failed", "color": "#eb5757", "type": "started",
-             "description": "AI encountered an error"},
-        ]
-        
+        team_id = self.get_team_id(team_key)
+        if not team_id:
+            print(f"Could not find team with key: {team_key}")
+            return {}
+
         existing = set(self.get_workflow_states(team_key))
         results = {}
+        missing = []
         
-        for state in required_states:
+        for state in REQUIRED_WORKFLOW_STATES:
             if state["name"] in existing:
                 print(f"   ✓ {state['name']} already exists")
                 results[state["name"]] = False
             else:
-                created = self.create_workflow_state(
-                    team_key=team_key,
-                    name=state["name"],
-                    color=state["color"],
-                    state_type=state["type"],
-                    description=state["description"]
-                )
-                results[state["name"]] = created is not None
+                missing.append(state)
+
+        for name, state_id in self.create_workflow_states(team_id, missing).items():
+            results[name] = state_id is not None
                 
         return results
 
+    def ensure_webhook(self, team_key: str, url: str, secret: Optional[str] = None) -> Optional[str]:
+        """Ensure an Issue webhook pointing at url exists for the team.
+        
+        Returns:
+            The webhook ID, or None if it could not be created
+        """
+        result = self._query(GET_WEBHOOKS_QUERY)
+        for hook in result.get("data", {}).get("webhooks", {}).get("nodes", []):
+            if hook.get("url") == url:
+                print(f"   ✓ Webhook already registered: {url}")
+                return hook.get("id")
+
+        team_id = self.get_team_id(team_key)
+        if not team_id:
+            print(f"Could not find team with key: {team_key}")
+            return None
+
+        result = self._query(CREATE_WEBHOOK_MUTATION, {"teamId": team_id, "url": url, "secret": secret})
+        data = result.get("data", {}).get("webhookCreate", {})
+        if not data.get("success"):
+            print(f"Failed to create webhook: {result}")
+            return None
+
+        print(f"   ✅ Registered webhook: {url}")
+        return data.get("webhook", {}).get("id")
+
     def get_sub_issues(self, parent_id: str) -> List[LinearIssue]:
         """Get all sub-issues of a parent issue."""
-        query = '''
-        query GetSubIssues($parentId: String!) {
-            issue(id: $parentId) {
-                children {
-                    nodes {
-                        id
-                        identifier
-                        title
-                        description
-                        state { name }
-                        priority
-                        parent { id }
-                    }
-                }
-            }
-        }
-        '''
-        result = self._query(query, {"parentId": parent_id})
+        result = self._query(GET_SUB_ISSUES_QUERY, {"parentId": parent_id})
         children = result.get("data", {}).get("issue", {}).get("children", {}).get("nodes", [])
         
-        return [
-            LinearIssue(
-                id=issue["id"],
-                identifier=issue["identifier"],
-                title=issue["title"],
-                description=issue.get("description"),
-                state=issue["state"]["name"],
-                priority=issue.get("priority", 0),
-                parent_id=issue.get("parent", {}).get("id") if issue.get("parent") else None
-            )
-            for issue in children
-        ]
+        return [_parse_issue(issue) for issue in children]
+
+    def get_sub_issues_bulk(self, parent_ids: List[str]) -> dict[str, List[LinearIssue]]:
+        """Get the sub-issues of several parents, one request per 250 sub-issues.
+        
+        Returns:
+            Dict of parent ID -> sub-issues, with an entry for every requested parent
+        """
+        by_parent = {parent_id: [] for parent_id in parent_ids}
+        if not parent_ids:
+            return by_parent
+
+        for node in self._query_issue_pages(SUB_ISSUES_BULK_QUERY, {"parentIds": list(parent_ids)}):
+            issue = _parse_issue(node)
+            by_parent.setdefault(issue.parent_id, []).append(issue)
+        return by_parent
 
     def get_issue_comments(self, issue_id: str) -> List[str]:
         """Get all comments on an issue."""
-        query = '''
-        query GetComments($issueId: String!) {
-            issue(id: $issueId) {
-                comments {
-                    nodes {
-                        body
-                    }
-                }
-            }
-        }
-        '''
-        result = self._query(query, {"issueId": issue_id})
+        result = self._query(GET_COMMENTS_QUERY, {"issueId": issue_id})
         comments = result.get("data", {}).get("issue", {}).get("comments", {}).get("nodes", [])
         return [c["body"] for c in comments]
 
     def get_issue_by_id(self, issue_id: str) -> Optional[LinearIssue]:
         """Get an issue by its ID."""
-        query = '''
-        query GetIssue($id: String!) {
-            issue(id: $id) {
-                id
-                identifier
-                title
-                description
-                state { name }
-                priority
-                parent { id }
-            }
-        }
-        '''
-        result = self._query(query, {"id": issue_id})
+        result = self._query(GET_ISSUE_QUERY, {"id": issue_id})
         issue = result.get("data", {}).get("issue")
         
         if not issue:
             return None
             
-        return LinearIssue(
-            id=issue["id"],
-            identifier=issue["identifier"],
-            title=issue["title"],
-            description=issue.get("description"),
-            state=issue["state"]["name"],
-            priority=issue.get("priority", 0),
-            parent_id=issue.get("parent", {}).get("id") if issue.get("parent") else None
-        )
+        return _parse_issue(issue)
 
     def all_sub_issues_completed(self, parent_id: str, completed_state: str = "Done") -> bool:
         """Check if all sub-issues of a parent are in the completed state."""
@@ -447,5 +927,251 @@ class LinearAdapter:
             return False  # No sub-issues means not complete
         
         # Check if all sub-issues are in a "done" type state
-        completed_states = {"Done", "Completed", "Closed", "Canceled"}
-        return all(issue.state in completed_states for issue in sub_issues)
+        return all(issue.state in COMPLETED_STATES for issue in sub_issues)
+
+
+@functools.cache
+def get_linear_adapter() -> LinearAdapter:
+    """Return the process-wide LinearAdapter, created on first use.
+    
+    Nodes and the poller share it so every Linear call reuses one HTTP/2
+    connection pool instead of a fresh TLS handshake per adapter.
+    """
+    return LinearAdapter()
+
+
+class AsyncLinearAdapter:
+    """Async adapter for Linear API interactions.
+
+    Mirrors the workflow-setup and node-facing subsets of LinearAdapter on an
+    httpx.AsyncClient, so async nodes don't block the event loop on Linear and
+    independent GraphQL calls can be fanned out with asyncio.gather.
+    """
+
+    def __init__(self):
+        self.api_key = os.getenv("LINEAR_API_KEY")
+        if not self.api_key:
+            raise ValueError("LINEAR_API_KEY not set")
+        self.headers = {
+            "Authorization": self.api_key,
+            "Content-Type": "application/json"
+        }
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            http2=True,
+            timeout=30.0,
+            limits=HTTP_LIMITS
+        )
+
+    async def aclose(self):
+        """Close the underlying HTTP client and release pooled connections."""
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _query(self, query: str, variables: dict = None) -> dict:
+        """Execute a GraphQL query against Linear."""
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+
+        response = await self._client.post(LINEAR_API_URL, content=orjson.dumps(payload))
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError:
+            print(f"Linear API error: {response.status_code} - {response.text}")
+            raise
+        return orjson.loads(response.content)
+
+    async def get_team_id(self, team_key: str) -> Optional[str]:
+        """Get team ID by team key."""
+        team_id = TEAM_ID_CACHE.get(team_key)
+        if team_id:
+            return team_id
+
+        result = await self._query(GET_TEAM_QUERY, {"key": team_key})
+        teams = result.get("data", {}).get("teams", {}).get("nodes", [])
+        if not teams:
+            return None
+
+        team_id = teams[0]["id"]
+        TEAM_ID_CACHE[team_key] = team_id
+        return team_id
+
+    async def get_workflow_states(self, team_id: str) -> List[str]:
+        """Get all workflow state names for a team."""
+        result = await self._query(GET_TEAM_STATES_QUERY, {"teamId": team_id})
+        states = result.get("data", {}).get("team", {}).get("states", {}).get("nodes", [])
+        return [s["name"] for s in states]
+
+    async def create_workflow_state(
+        self,
+        team_id: str,
+        name: str,
+        color: str = "#95a2b3",
+        state_type: str = "started",
+        description: str = ""
+    ) -> Optional[str]:
+        """Create a new workflow state for a team.
+        
+        Returns:
+            State ID if created, None if failed
+        """
+        result = await self._query(CREATE_WORKFLOW_STATE_MUTATION, {
+            "teamId": team_id,
+            "name": name,
+            "color": color,
+            "type": state_type,
+            "description": description
+        })
+        
+        state_data = result.get("data", {}).get("workflowStateCreate", {})
+        if state_data.get("success"):
+            state = state_data.get("workflowState", {})
+            print(f"✅ Created workflow state: {state.get('name')} ({state.get('id')})")
+            return state.get("id")
+        else:
+            errors = result.get("errors", [])
+            print(f"Failed to create workflow state: {errors}")
+            return None
+
+    async def ensure_workflow_states(self, team_key: str) -> dict:
+        """Ensure required workflow states exist, creating missing ones concurrently.
+        
+        Returns:
+            Dict of state name -> created (True) or already existed (False)
+        """
+        team_id = await self.get_team_id(team_key)
+        if not team_id:
+            print(f"Could not find team with key: {team_key}")
+            return {}
+
+        existing = set(await self.get_workflow_states(team_id))
+        results = {}
+        missing = []
+        
+        for state in REQUIRED_WORKFLOW_STATES:
+            if state["name"] in existing:
+                print(f"   ✓ {state['name']} already exists")
+                results[state["name"]] = False
+            else:
+                missing.append(state)
+
+        created_ids = await asyncio.gather(*(
+            self.create_workflow_state(
+                team_id=team_id,
+                name=state["name"],
+                color=state["color"],
+                state_type=state["type"],
+                description=state["description"]
+            )
+            for state in missing
+        ))
+        for state, created in zip(missing, created_ids):
+            results[state["name"]] = created is not None
+                
+        return results
+
+    async def _get_state_id(self, state_name: str, team_key: Optional[str] = None) -> Optional[str]:
+        """Resolve a team's workflow state name to its ID; see LinearAdapter._get_state_id."""
+        key = _state_key(state_name, team_key)
+        state_id = STATE_ID_CACHE.get(key)
+        if state_id:
+            return state_id
+
+        _cache_team_states(key[0], await self._query(TEAM_WORKFLOW_STATES_QUERY, {"teamKey": key[0]}))
+        state_id = STATE_ID_CACHE.get(key)
+        if state_id:
+            return state_id
+
+        state_id = _first_state_id(await self._query(GET_STATE_QUERY, {"name": state_name}))
+        if state_id:
+            STATE_ID_CACHE[key] = state_id
+        return state_id
+
+    async def transition_issue(self, issue_id: str, state_name: str, team_key: Optional[str] = None) -> bool:
+        """Move an issue to a different state of its team (DEFAULT_TEAM_KEY if not given)."""
+        state_id = await self._get_state_id(state_name, team_key)
+        if not state_id:
+            return False
+
+        result = await self._query(UPDATE_ISSUE_STATE_MUTATION, {"id": issue_id, "stateId": state_id})
+        success = result.get("data", {}).get("issueUpdate", {}).get("success", False)
+        if not success:
+            # Cached ID may be stale (state deleted/recreated) - re-resolve next time
+            STATE_ID_CACHE.pop(_state_key(state_name, team_key), None)
+        return success
+
+    async def add_comment(self, issue_id: str, body: str) -> bool:
+        """Add a comment to an issue."""
+        result = await self._query(ADD_COMMENT_MUTATION, {"issueId": issue_id, "body": body})
+        return result.get("data", {}).get("commentCreate", {}).get("success", False)
+
+    async def transition_issue_with_comment(
+        self,
+        issue_id: str,
+        state_name: str,
+        body: str,
+        team_key: Optional[str] = None
+    ) -> bool:
+        """Move an issue to a state of its team and comment on it in one request."""
+        state_id = await self._get_state_id(state_name, team_key)
+        if not state_id:
+            await self.add_comment(issue_id, body)
+            return False
+
+        result = await self._query(TRANSITION_AND_COMMENT_MUTATION, {"id": issue_id, "stateId": state_id, "body": body})
+        data = result.get("data") or {}
+        if not (data.get("update") or {}).get("success", False):
+            STATE_ID_CACHE.pop(_state_key(state_name, team_key), None)
+            return False
+        return (data.get("comment") or {}).get("success", False)
+
+    async def get_issue_comments(self, issue_id: str) -> List[str]:
+        """Get all comments on an issue."""
+        result = await self._query(GET_COMMENTS_QUERY, {"issueId": issue_id})
+        comments = result.get("data", {}).get("issue", {}).get("comments", {}).get("nodes", [])
+        return [c["body"] for c in comments]
+
+    async def get_issue_by_id(self, issue_id: str) -> Optional[LinearIssue]:
+        """Get an issue by its ID."""
+        result = await self._query(GET_ISSUE_QUERY, {"id": issue_id})
+        issue = result.get("data", {}).get("issue")
+
+        if not issue:
+            return None
+
+        return _parse_issue(issue)
+
+
+# Per-thread (event loop, adapter): an AsyncClient's connections belong to the
+# loop that opened them, and each poll worker runs its own loop
+_async_adapter = threading.local()
+
+
+def get_async_linear_adapter() -> AsyncLinearAdapter:
+    """Return the AsyncLinearAdapter shared by async nodes on the running event loop.
+    
+    close_async_linear_adapter (called by run_graph) must close it before the
+    loop ends; one left over from a finished loop can no longer be closed.
+    """
+    loop = asyncio.get_running_loop()
+    if getattr(_async_adapter, "loop", None) is not loop:
+        if getattr(_async_adapter, "adapter", None) is not None:
+            print("⚠️ AsyncLinearAdapter from a finished event loop was never closed; "
+                  "run graphs through run_graph")
+        _async_adapter.loop, _async_adapter.adapter = loop, AsyncLinearAdapter()
+    return _async_adapter.adapter
+
+
+async def close_async_linear_adapter():
+    """Close the shared AsyncLinearAdapter before the caller's event loop shuts down."""
+    loop = getattr(_async_adapter, "loop", None)
+    adapter = getattr(_async_adapter, "adapter", None)
+    _async_adapter.loop = _async_adapter.adapter = None
+    if adapter is not None and loop is asyncio.get_running_loop():
+        await adapter.aclose()
@@ -3,7 +3,6 @@ Project context loader for agent prompts.
 Loads documentation files to provide additional context to agents.
 """
 from pathlib import Path
-from functools import lru_cache
 
 # Project root is 2 levels up from this file
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -13,36 +12,66 @@ CONTEXT_FILES = [
     "docs/requirements/overview.md",
 ]
 
+# Placeholder used in prompts when no context files are present
+NO_CONTEXT_PLACEHOLDER = "(No project context available)"
+
+# Single-slot cache: (mtime fingerprint of CONTEXT_FILES, combined context, prompt-ready context)
+_context_cache: tuple = (None, "", NO_CONTEXT_PLACEHOLDER)
+
+
+def _context_fingerprint() -> tuple:
+    """Return the mtime of each context file (None if missing)."""
+    fingerprint = []
+    for file_path in CONTEXT_FILES:
+        try:
+            fingerprint.append((PROJECT_ROOT / file_path).stat().st_mtime_ns)
+        except FileNotFoundError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+def _load_context_entry() -> tuple:
+    """Return the cache entry for the current context files, rebuilding it if stale."""
+    global _context_cache
+    fingerprint = _context_fingerprint()
+    if _context_cache[0] == fingerprint:
+        return _context_cache
+
+    context_parts = []
+    
+    for file_path, mtime in zip(CONTEXT_FILES, fingerprint):
+        if mtime is None:
+            continue
+        content = (PROJECT_ROOT / file_path).read_text().strip()
+        if content:
+            context_parts.append(f"## {file_path}\n{content}")
+    
+    if context_parts:
+        context = "# Project Context\n\n" + "\n\n".join(context_parts)
+        _context_cache = (fingerprint, context, f"\n{context}\n")
+    else:
+        _context_cache = (fingerprint, "", NO_CONTEXT_PLACEHOLDER)
+    return _context_cache
+
 
-@lru_cache(maxsize=1)
 def load_project_context() -> str:
     """Load and cache all project context files.
     
+    The cache is keyed on file mtimes, so edits are picked up without a
+    restart at the cost of one stat() per file per call.
+    
     Returns:
         Combined content of all context files, or empty string if none found.
     """
-    context_parts = []
-    
-    for file_path in CONTEXT_FILES:
-        full_path = PROJECT_ROOT / file_path
-        if full_path.exists():
-            content = full_path.read_text().strip()
-            if content:
-                context_parts.append(f"## {file_path}\n{content}")
-    
-    if not context_parts:
-        return ""
-    
-    return "# Project Context\n\n" + "\n\n".join(context_parts)
+    return _load_context_entry()[1]
 
 
 def get_context_for_prompt() -> str:
     """Get project context formatted for inclusion in prompts.
     
+    The wrapped string is built once per cache refresh and reused.
+    
     Returns:
         Context string or placeholder message if no context available.
     """
-    context = load_project_context()
-    if context:
-        return f"\n{context}\n"
-    return "(No project context available)"
+    return _load_context_entry()[2]
@@ -0,0 +1,95 @@
+"""Shared Gemini chat client for the LLM nodes."""
+import asyncio
+import functools
+import os
+import threading
+from typing import TYPE_CHECKING
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+# Cap on concurrent Gemini requests across the whole process; fan-out beyond
+# this queues locally instead of tripping the API rate limit and backing off
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "8"))
+
+
+def per_loop(func):
+    """Cache func's results per thread and running event loop.
+    
+    The Gemini client's async transport is bound to the loop that first uses
+    it. Every worker thread drives its own event loop, and asyncio.run starts
+    a fresh one per call, so a process-wide cache would hand a run a client
+    bound to another thread's loop or to one that has already closed.
+    """
+    local = threading.local()
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if getattr(local, "results", None) is None or local.loop is not loop:
+            local.loop, local.results = loop, {}
+        if args not in local.results:
+            local.results[args] = func(*args)
+        return local.results[args]
+
+    def pop_cached() -> list:
+        """Drop and return the values cached for the running loop."""
+        results = getattr(local, "results", None)
+        if not results or local.loop is not asyncio.get_running_loop():
+            return []
+        local.results = None
+        return list(results.values())
+
+    wrapper.pop_cached = pop_cached
+    return wrapper
+
+
+@per_loop
+def get_llm(model: str = DEFAULT_MODEL) -> "ChatGoogleGenerativeAI":
+    """Return the chat client for a model on the running event loop, created on first use.
+    
+    Nodes apply their own temperature and response settings with .bind()
+    (cached with @per_loop as well), so every Gemini call in one graph run
+    goes through the same client and connection pool.
+    langchain_google_genai (and its grpc/protobuf stack) is imported here, so
+    graph runs that never reach an LLM node don't pay for it.
+    """
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    load_dotenv()
+    return ChatGoogleGenerativeAI(model=model)
+
+
+async def close_llm_clients():
+    """Close the running loop's Gemini clients while the loop can still finish the close."""
+    for llm in get_llm.pop_cached():
+        await llm.aclose()
+
+
+# Process-wide rather than per loop: every poll and webhook worker thread runs
+# its own event loop, and the quota is shared by all of them
+_GEMINI_SLOTS = threading.BoundedSemaphore(GEMINI_CONCURRENCY)
+
+# Seconds between attempts to take a slot while all of them are in use
+GEMINI_SLOT_POLL = 0.05
+
+
+async def gated_ainvoke(llm, prompt):
+    """Await llm.ainvoke(prompt), holding one of GEMINI_CONCURRENCY process-wide slots.
+    
+    The slot is taken with a non-blocking acquire and an asyncio.sleep retry,
+    so waiting never blocks the loop or an executor thread, and a cancelled
+    waiter never ends up holding a slot.
+    """
+    while not _GEMINI_SLOTS.acquire(blocking=False):
+        await asyncio.sleep(GEMINI_SLOT_POLL)
+    try:
+        return await llm.ainvoke(prompt)
+    finally:
+        _GEMINI_SLOTS.release()
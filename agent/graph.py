@@ -1,26 +1,25 @@
+import asyncio
+import atexit
+import functools
+import os
+import threading
+from typing import Final
 from langgraph.graph import StateGraph, END
 from agent.state import AgentState
-from agent.nodes.product_manager import product_manager_node
-from agent.nodes.approval_gate import approval_gate_node
-from agent.nodes.classifier import classifier_node
-from agent.nodes.architect import architect_node
-from agent.nodes.contractor import contractor_node
-from agent.nodes.contractor_planner import contractor_planner_node
-from agent.nodes.infra_engineer import infra_engineer_node
-from agent.nodes.infra_engineer_planner import infra_engineer_planner_node
-from agent.nodes.software_engineer import software_engineer_node
-from agent.nodes.software_engineer_planner import software_engineer_planner_node
-from agent.nodes.sub_issue_handler import sub_issue_handler_node
-from agent.nodes.security import security_node
-from agent.nodes.compliance import compliance_node
-from agent.nodes.design import design_node
-from agent.nodes.supervisor import supervisor_node
-from agent.nodes.stack_manager import stack_manager_node
-from agent.nodes.publisher import publisher_node
-from agent.nodes.deployer import deployer_node
-from agent.nodes.test_agent import test_agent_node
-from agent.nodes.telemetry import telemetry_node
-from agent.nodes.reverter import reverter_node
+from agent.nodes.reviewers import reviewers_for
+
+
+# Implementation node for each request type (default: software_engineer)
+IMPLEMENTATION_ROUTES: Final[dict] = {
+    "requires_contract": "contractor",
+    "infrastructure": "infra_engineer",
+}
+
+# Planner node for each request type (default: software_engineer_planner)
+PLANNER_ROUTES: Final[dict] = {
+    "requires_contract": "contractor_planner",
+    "infrastructure": "infra_engineer_planner",
+}
 
 
 def route_entry_point(state: AgentState) -> str:
@@ -49,25 +48,12 @@ def route_entry_point(state: AgentState) -> str:
 
 def route_from_classifier(state: AgentState) -> str:
     """Route based on workflow phase and request classification."""
-    phase = state.get("workflow_phase", "")
     request_type = state.get("request_type", "general")
-
-    if phase == "implement":
+    if state.get("workflow_phase", "") == "implement":
         # Implementation phase: go directly to implementation engineer
-        if request_type == "requires_contract":
-            return "contractor"
-        elif request_type == "infrastructure":
-            return "infra_engineer"
-        else:
-            return "software_engineer"
-    else:
-        # ERD phase (or legacy): go to planner to create sub-issues
-        if request_type == "requires_contract":
-            return "contractor_planner"
-        elif request_type == "infrastructure":
-            return "infra_engineer_planner"
-        else:
-            return "software_engineer_planner"
+        return IMPLEMENTATION_ROUTES.get(request_type, "software_engineer")
+    # ERD phase (or legacy): go to planner to create sub-issues
+    return PLANNER_ROUTES.get(request_type, "software_engineer_planner")
 
 
 def route_from_supervisor(state: AgentState) -> str:
@@ -75,18 +61,11 @@ def route_from_supervisor(state: AgentState) -> str:
     status = state["status"]
     if status == "approved":
         return "publisher"
-    elif status == "drafting":
-        request_type = state.get("request_type", "general")
-        if state.get("work_items"):
-            return "contractor"
-        if request_type == "requires_contract":
-            return "contractor"
-        elif request_type == "infrastructure":
-            return "infra_engineer"
-        else:
-            return "software_engineer"
-    else:
+    if status != "drafting":
         return "end"
+    if state.get("work_items"):
+        return "contractor"
+    return IMPLEMENTATION_ROUTES.get(state.get("request_type", "general"), "software_engineer")
 
 
 def route_from_stack_manager(state: AgentState) -> str:
@@ -100,23 +79,17 @@ def route_from_stack_manager(state: AgentState) -> str:
         return "end"
 
 
-def route_to_first_reviewer(state: AgentState) -> str:
-    """Route to first reviewer based on work item type."""
-    current_work = state.get("current_work_item")
-    if current_work:
-        work_type = current_work.get("type") if isinstance(current_work, dict) else current_work.type
-        if work_type == "BACKEND":
-            return "compliance"
-        elif work_type == "FRONTEND":
-            return "design"
-    return "security"
+def route_to_reviewers(state: AgentState) -> list:
+    """Fan out to every reviewer for the work item type; they run in parallel."""
+    # COMBINED_REVIEW=1 trades the parallel calls for one request covering all reviewers
+    if os.getenv("COMBINED_REVIEW") == "1":
+        return ["combined_review"]
+    return reviewers_for(state)
 
 
 def route_from_publisher(state: AgentState) -> str:
     """Route from publisher - continue stack or deploy."""
-    work_items = state.get("work_items", [])
-    current_index = state.get("current_work_index", 0)
-    if work_items and current_index < len(work_items):
+    if (state.get("remaining_work_items") or 0) > 0:
         return "stack_manager"
     return "deployer"
 
@@ -160,71 +133,89 @@ def route_from_planner(state: AgentState) -> str:
     return "end"
 
 
+@functools.cache
 def build_graph():
-    """Construct the Phase 3 agent workflow graph with technical review flow."""
-    workflow = StateGraph(AgentState)
-
-    # Entry router (determines if sub-issue or parent)
-    workflow.add_node("entry_router", lambda state: state)  # Pass-through
-
-    # Product Manager nodes
-    workflow.add_node("product_manager", product_manager_node)
-    workflow.add_node("approval_gate", approval_gate_node)
-    
-    # Classifier
-    workflow.add_node("classifier", classifier_node)
+    """Construct the Phase 3 agent workflow graph with technical review flow.
     
-    # Planner nodes (for parent issues)
-    workflow.add_node("contractor_planner", contractor_planner_node)
-    workflow.add_node("software_engineer_planner", software_engineer_planner_node)
-    workflow.add_node("infra_engineer_planner", infra_engineer_planner_node)
-    workflow.add_node("sub_issue_handler", sub_issue_handler_node)
-    
-    # Implementation nodes (for sub-issues)
-    workflow.add_node("architect", architect_node)
-    workflow.add_node("stack_manager", stack_manager_node)
-    workflow.add_node("contractor", contractor_node)
-    workflow.add_node("infra_engineer", infra_engineer_node)
-    workflow.add_node("software_engineer", software_engineer_node)
-    
-    # Review nodes
-    workflow.add_node("security", security_node)
-    workflow.add_node("compliance", compliance_node)
-    workflow.add_node("design", design_node)
-    workflow.add_node("supervisor", supervisor_node)
-    
-    # Publishing & deployment nodes
-    workflow.add_node("publisher", publisher_node)
-    workflow.add_node("deployer", deployer_node)
-    workflow.add_node("test_agent", test_agent_node)
-    workflow.add_node("telemetry", telemetry_node)
-    workflow.add_node("reverter", reverter_node)
-
-    # Entry point: router decides if sub-issue or parent
-    workflow.set_entry_point("entry_router")
-    workflow.add_conditional_edges(
-        "entry_router",
-        route_entry_point,
-        {"product_manager": "product_manager", "classifier": "classifier"}
+    Cached so repeated calls share one compiled app; callers must not mutate it.
+    Node modules (and their LLM clients) are imported here rather than at
+    module import, so importing the routers stays cheap.
+    """
+    from agent.nodes.product_manager import product_manager_node
+    from agent.nodes.approval_gate import approval_gate_node
+    from agent.nodes.classifier import classifier_node
+    from agent.nodes.architect import architect_node
+    from agent.nodes.contractor import contractor_node
+    from agent.nodes.contractor_planner import contractor_planner_node
+    from agent.nodes.infra_engineer import infra_engineer_node
+    from agent.nodes.infra_engineer_planner import infra_engineer_planner_node
+    from agent.nodes.software_engineer import software_engineer_node
+    from agent.nodes.software_engineer_planner import software_engineer_planner_node
+    from agent.nodes.sub_issue_handler import sub_issue_handler_node
+    from agent.nodes.security import security_node
+    from agent.nodes.compliance import compliance_node
+    from agent.nodes.design import design_node
+    from agent.nodes.combined_review import combined_review_node
+    from agent.nodes.supervisor import supervisor_node
+    from agent.nodes.stack_manager import stack_manager_node
+    from agent.nodes.publisher import publisher_node
+    from agent.nodes.deployer import deployer_node
+    from agent.nodes.test_agent import test_agent_node
+    from agent.nodes.telemetry import telemetry_node
+    from agent.nodes.reverter import reverter_node
+
+    nodes = (
+        # Entry router (determines if sub-issue or parent)
+        ("entry_router", lambda state: {}),  # Pass-through (empty update, so reducers see no writes)
+        # Product Manager nodes
+        ("product_manager", product_manager_node),
+        ("approval_gate", approval_gate_node),
+        # Classifier
+        ("classifier", classifier_node),
+        # Planner nodes (for parent issues)
+        ("contractor_planner", contractor_planner_node),
+        ("software_engineer_planner", software_engineer_planner_node),
+        ("infra_engineer_planner", infra_engineer_planner_node),
+        ("sub_issue_handler", sub_issue_handler_node),
+        # Implementation nodes (for sub-issues)
+        ("architect", architect_node),
+        ("stack_manager", stack_manager_node),
+        ("contractor", contractor_node),
+        ("infra_engineer", infra_engineer_node),
+        ("software_engineer", software_engineer_node),
+        # Review nodes
+        ("security", security_node),
+        ("compliance", compliance_node),
+        ("design", design_node),
+        ("combined_review", combined_review_node),
+        ("supervisor", supervisor_node),
+        # Publishing & deployment nodes
+        ("publisher", publisher_node),
+        ("deployer", deployer_node),
+        ("test_agent", test_agent_node),
+        ("telemetry", telemetry_node),
+        ("reverter", reverter_node),
     )
 
-    # Product Manager -> Approval Gate -> Classifier (for parent issues)
-    workflow.add_conditional_edges(
-        "product_manager",
-        route_from_product_manager,
-        {"approval_gate": "approval_gate", "end": END}
-    )
-    workflow.add_conditional_edges(
-        "approval_gate",
-        route_from_approval_gate,
-        {"classifier": "classifier", "end": END}
-    )
-
-    # Classifier routes to planners (parent) or implementation (sub-issue)
-    workflow.add_conditional_edges(
-        "classifier",
-        route_from_classifier,
-        {
+    planner_targets = {"sub_issue_handler": "sub_issue_handler", "end": END}
+    reviewer_targets = {
+        "security": "security",
+        "compliance": "compliance",
+        "design": "design",
+        "combined_review": "combined_review",
+    }
+
+    conditional_edges = (
+        # Entry point: router decides if sub-issue or parent
+        ("entry_router", route_entry_point,
+         {"product_manager": "product_manager", "classifier": "classifier"}),
+        # Product Manager -> Approval Gate -> Classifier (for parent issues)
+        ("product_manager", route_from_product_manager,
+         {"approval_gate": "approval_gate", "end": END}),
+        ("approval_gate", route_from_approval_gate,
+         {"classifier": "classifier", "end": END}),
+        # Classifier routes to planners (parent) or implementation (sub-issue)
+        ("classifier", route_from_classifier, {
             # Parent issue routes (planners)
             "contractor_planner": "contractor_planner",
             "software_engineer_planner": "software_engineer_planner",
@@ -233,97 +224,113 @@ def build_graph():
             "contractor": "architect",  # Contract requests still go through architect->stack_manager
             "infra_engineer": "infra_engineer",
             "software_engineer": "software_engineer"
-        }
-    )
-
-    # Planners -> Sub-issue handler -> END (wait for human)
-    workflow.add_conditional_edges(
-        "contractor_planner",
-        route_from_planner,
-        {"sub_issue_handler": "sub_issue_handler", "end": END}
-    )
-    workflow.add_conditional_edges(
-        "software_engineer_planner",
-        route_from_planner,
-        {"sub_issue_handler": "sub_issue_handler", "end": END}
-    )
-    workflow.add_conditional_edges(
-        "infra_engineer_planner",
-        route_from_planner,
-        {"sub_issue_handler": "sub_issue_handler", "end": END}
-    )
-    workflow.add_edge("sub_issue_handler", END)
-
-    # Architect -> Stack Manager (for contract requests)
-    workflow.add_edge("architect", "stack_manager")
-
-    workflow.add_conditional_edges(
-        "stack_manager",
-        route_from_stack_manager,
-        {
-            "contractor": "contractor",
-            "deployer": "deployer",
-            "end": END
-        }
-    )
-
-    # Implementation nodes -> first reviewer
-    workflow.add_conditional_edges(
-        "contractor",
-        route_to_first_reviewer,
-        {"security": "security", "compliance": "compliance", "design": "design"}
-    )
-    workflow.add_conditional_edges(
-        "infra_engineer",
-        route_to_first_reviewer,
-        {"security": "security", "compliance": "compliance", "design": "design"}
-    )
-    workflow.add_conditional_edges(
-        "software_engineer",
-        route_to_first_reviewer,
-        {"security": "security", "compliance": "compliance", "design": "design"}
-    )
-
-    # Specialized reviewers -> Security (series)
-    workflow.add_edge("compliance", "security")
-    workflow.add_edge("design", "security")
-    workflow.add_edge("security", "supervisor")
-
-    workflow.add_conditional_edges(
-        "supervisor",
-        route_from_supervisor,
-        {
+        }),
+        # Planners -> Sub-issue handler -> END (wait for human)
+        ("contractor_planner", route_from_planner, planner_targets),
+        ("software_engineer_planner", route_from_planner, planner_targets),
+        ("infra_engineer_planner", route_from_planner, planner_targets),
+        ("stack_manager", route_from_stack_manager,
+         {"contractor": "contractor", "deployer": "deployer", "end": END}),
+        # Implementation nodes -> reviewers (fan-out, run concurrently)
+        ("contractor", route_to_reviewers, reviewer_targets),
+        ("infra_engineer", route_to_reviewers, reviewer_targets),
+        ("software_engineer", route_to_reviewers, reviewer_targets),
+        ("supervisor", route_from_supervisor, {
             "contractor": "contractor",
             "infra_engineer": "infra_engineer",
             "software_engineer": "software_engineer",
             "publisher": "publisher",
             "end": END
-        }
+        }),
+        ("publisher", route_from_publisher,
+         {"stack_manager": "stack_manager", "deployer": "deployer"}),
+        ("test_agent", route_from_test_agent, {"telemetry": "telemetry", "end": END}),
+        ("telemetry", route_from_telemetry, {"reverter": "reverter", "end": END}),
     )
 
-    workflow.add_conditional_edges(
-        "publisher",
-        route_from_publisher,
-        {"stack_manager": "stack_manager", "deployer": "deployer"}
+    edges = (
+        ("sub_issue_handler", END),
+        # Architect -> Stack Manager (for contract requests)
+        ("architect", "stack_manager"),
+        # Reviewers -> Supervisor (fan-in; supervisor runs once all branches finish)
+        ("compliance", "supervisor"),
+        ("design", "supervisor"),
+        ("security", "supervisor"),
+        ("combined_review", "supervisor"),
+        ("deployer", "test_agent"),
+        ("reverter", END),
     )
 
-    workflow.add_edge("deployer", "test_agent")
-
-    workflow.add_conditional_edges(
-        "test_agent",
-        route_from_test_agent,
-        {"telemetry": "telemetry", "end": END}
-    )
+    workflow = StateGraph(AgentState)
+    for name, node in nodes:
+        workflow.add_node(name, node)
+    workflow.set_entry_point("entry_router")
+    for source, router, targets in conditional_edges:
+        workflow.add_conditional_edges(source, router, targets)
+    for source, target in edges:
+        workflow.add_edge(source, target)
 
-    workflow.add_conditional_edges(
-        "telemetry",
-        route_from_telemetry,
-        {"reverter": "reverter", "end": END}
-    )
+    return workflow.compile()
 
-    workflow.add_edge("reverter", END)
 
-    return workflow.compile()
+def get_app():
+    """Return the compiled workflow graph, building it on first use."""
+    return build_graph()
 
 
-app = build_graph()
+async def run_graph(initial_state: AgentState, keep_sessions: bool = False) -> dict:
+    """Run the graph once; async clients live only as long as the run.
+    
+    Every entry point goes through here, so the per-loop clients are closed
+    while their event loop can still finish closing them. Pooled Claude Code
+    sessions are closed too unless keep_sessions is set, which only callers
+    that reuse the loop for the next run (run_graph_on_thread) should do.
+    """
+    from agent.adapters.linear_adapter import close_async_linear_adapter
+    from agent.config.llm import close_llm_clients
+    from agent.tools.claude_code import close_claude_sessions
+
+    try:
+        return await get_app().ainvoke(initial_state)
+    finally:
+        if not keep_sessions:
+            await close_claude_sessions()
+        await close_async_linear_adapter()
+        await close_llm_clients()
+
+
+# One long-lived event loop per worker thread, and every runner for exit cleanup
+_thread_runner = threading.local()
+_all_runners: list[asyncio.Runner] = []
+
+
+def run_graph_on_thread(initial_state: AgentState) -> dict:
+    """Run the graph on this worker thread's event loop, kept across runs.
+    
+    asyncio.run would close the loop after every issue, and pooled Claude Code
+    sessions (CLAUDE_SESSION_MAX_CALLS) die with their loop. Reusing one loop
+    per poll or webhook worker lets a session serve the thread's next issue.
+    """
+    runner = getattr(_thread_runner, "runner", None)
+    if runner is None:
+        runner = _thread_runner.runner = asyncio.Runner()
+        _all_runners.append(runner)
+    return runner.run(run_graph(initial_state, keep_sessions=True))
+
+
+@atexit.register
+def _close_runners():
+    # Worker threads have been joined by now, so their loops are idle
+    from agent.tools.claude_code import close_claude_sessions
+
+    for runner in _all_runners:
+        runner.run(close_claude_sessions())
+        runner.close()
+    _all_runners.clear()
+
+
+def __getattr__(name: str):
+    # Lazily expose `app` for langgraph.json ("./agent/graph.py:app")
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
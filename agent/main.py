@@ -1,23 +1,15 @@
+import asyncio
 import sys
 from dotenv import load_dotenv
-from agent.graph import app
-from agent.state import AgentState
+from agent.graph import run_graph
+from agent.state import new_agent_state
 
 load_dotenv()
 
 
-def run_factory(task: str) -> dict:
+async def run_factory(task: str) -> dict:
     """Run the software factory on a given task."""
-    initial_state: AgentState = {
-        "task_description": task,
-        "current_contract": None,
-        "review_feedback": [],
-        "iteration_count": 0,
-        "status": "drafting",
-        "messages": []
-    }
-
-    result = app.invoke(initial_state)
+    result = await run_graph(new_agent_state(task_description=task))
     return result
 
 
@@ -37,7 +29,7 @@ def main():
     print(f"📝 Task: {task.strip()[:100]}...")
     print(f"{'=' * 50}\n")
 
-    result = run_factory(task)
+    result = asyncio.run(run_factory(task))
 
     print(f"\n{'=' * 50}")
     print(f"✅ Final Status: {result['status']}")
@@ -1,5 +1,20 @@
 """Approval Gate node - posts PRD for human review in Linear."""
+import functools
+import os
+import sys
 from agent.state import AgentState
+from agent.adapters.linear_adapter import get_linear_adapter
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_scenario(scenario, given, when, then) -> str:
+    """Render one Gherkin scenario; cached so PRD re-renders on retries are cheap."""
+    return (
+        f"  **Scenario:** {scenario}\n"
+        f"    - **Given** {given}\n"
+        f"    - **When** {when}\n"
+        f"    - **Then** {then}"
+    )
 
 
 def format_gherkin_criteria(criteria: list) -> str:
@@ -8,27 +23,29 @@ def format_gherkin_criteria(criteria: list) -> str:
     for ac in criteria:
         # Handle both new Gherkin format and legacy string format
         if isinstance(ac, dict):
-            lines.append(f"  **Scenario:** {ac.get('scenario', 'Unnamed scenario')}")
-            lines.append(f"    - **Given** {ac.get('given', 'N/A')}")
-            lines.append(f"    - **When** {ac.get('when', 'N/A')}")
-            lines.append(f"    - **Then** {ac.get('then', 'N/A')}")
+            lines.append(_format_scenario(
+                ac.get('scenario', 'Unnamed scenario'),
+                ac.get('given', 'N/A'),
+                ac.get('when', 'N/A'),
+                ac.get('then', 'N/A'),
+            ))
         else:
             # Legacy string format fallback
             lines.append(f"  - {ac}")
     return "\n".join(lines)
 
 
+def _append_bullets(append, items: list) -> None:
+    """Append items as a newline-separated markdown bullet list."""
+    for i, item in enumerate(items):
+        if i:
+            append("\n")
+        append("- ")
+        append(item)
+
+
 def format_prd_for_review(prd: dict) -> str:
     """Format PRD as markdown for human review."""
-    # Format User Stories
-    user_stories = []
-    for s in prd.get("user_stories", []):
-        sid = s.get('id', '')
-        header = f"### {sid} As a **{s.get('as_a', 'user')}**, I want **{s.get('i_want', 'feature')}**, so that **{s.get('so_that', 'benefit')}**"
-        user_stories.append(header)
-    
-    stories_section = "\n\n".join(user_stories)
-
     # Format Acceptance Criteria (grouped by story)
     ac_list = prd.get("acceptance_criteria", [])
     # Fallback for old format if nested
@@ -50,37 +67,38 @@ def format_prd_for_review(prd: dict) -> str:
             ac_by_story[sid] = []
         ac_by_story[sid].append(ac)
 
-    ac_parts = []
-    for sid, criteria in ac_by_story.items():
-        ac_header = f"#### {sid}"
-        ac_text = format_gherkin_criteria(criteria)
-        ac_parts.append(f"{ac_header}\n{ac_text}")
-
-    ac_section = "\n\n".join(ac_parts) if ac_parts else "No acceptance criteria defined."
+    # Build the document into a single buffer and join once at the end
+    parts: list[str] = []
+    append = parts.append
 
-    return f"""# {prd.get('title', 'Untitled')}
+    append(f"# {prd.get('title', 'Untitled')}\n\n## Problem Statement\n")
+    append(f"{prd.get('problem_statement', 'N/A')}\n\n## User Stories\n")
 
-## Problem Statement
-{prd.get('problem_statement', 'N/A')}
-
-## User Stories
-{stories_section}
-
-## Acceptance Criteria
-{ac_section}
-
-## Edge Cases
-{chr(10).join('- ' + e for e in prd.get('edge_cases', []))}
-
-## Out of Scope
-{chr(10).join('- ' + e for e in prd.get('out_of_scope', []))}
-
-## Success Metrics
-{chr(10).join('- ' + m for m in prd.get('success_metrics', []))}
-
----
-**Priority:** {prd.get('priority', 'P1')} | **Complexity:** {prd.get('estimated_complexity', 'M')}
-"""
+    # Format User Stories
+    for i, s in enumerate(prd.get("user_stories", [])):
+        if i:
+            append("\n\n")
+        append(f"### {s.get('id', '')} As a **{s.get('as_a', 'user')}**, I want **{s.get('i_want', 'feature')}**, so that **{s.get('so_that', 'benefit')}**")
+
+    append("\n\n## Acceptance Criteria\n")
+    if ac_by_story:
+        for i, (sid, criteria) in enumerate(ac_by_story.items()):
+            if i:
+                append("\n\n")
+            append(f"#### {sid}\n")
+            append(format_gherkin_criteria(criteria))
+    else:
+        append("No acceptance criteria defined.")
+
+    append("\n\n## Edge Cases\n")
+    _append_bullets(append, prd.get("edge_cases", []))
+    append("\n\n## Out of Scope\n")
+    _append_bullets(append, prd.get("out_of_scope", []))
+    append("\n\n## Success Metrics\n")
+    _append_bullets(append, prd.get("success_metrics", []))
+
+    append(f"\n\n---\n**Priority:** {prd.get('priority', 'P1')} | **Complexity:** {prd.get('estimated_complexity', 'M')}\n")
+    return "".join(parts)
 
 
 def approval_gate_node(state: AgentState) -> dict:
@@ -91,27 +109,36 @@ def approval_gate_node(state: AgentState) -> dict:
     if not prd:
         return {
             "status": "failed",
-            "messages": state.get("messages", []) + ["No PRD to review"]
+            "messages": ["No PRD to review"]
         }
 
     # Format PRD for display
     prd_markdown = format_prd_for_review(prd)
-    print(f"   📋 PRD Ready for Review:")
-    print(prd_markdown)
+    # Full PRD dump only when asked for; it is posted to Linear either way.
+    # One write for the whole dump so concurrent runs cannot interleave inside it
+    if os.getenv("AGENT_VERBOSE"):
+        sys.stdout.write(f"   📋 PRD Ready for Review:\n{prd_markdown}\n")
 
     # If we have a Linear issue, post the PRD and move to Human: Review
     if issue:
         try:
-            from agent.adapters.linear_adapter import LinearAdapter
-            adapter = LinearAdapter()
-            # Save original ticket content as a comment before overwriting
+            adapter = get_linear_adapter()
             original_description = issue.description
-            if original_description:
-                adapter.add_comment(issue.id, f"## Original ticket request\n\n{original_description}")
-            # Replace the ticket description with the PRD
-            adapter.update_issue_description(issue.id, prd_markdown)
-            # Move to Human: Review PRD for human approval
-            adapter.transition_issue(issue.id, "Human: Review PRD")
+            if (original_description or "").strip() == prd_markdown.strip():
+                # Re-entry with an unchanged PRD: the description already holds it
+                # and the original request was saved on the first pass
+                print(f"   ↩️  PRD unchanged on {issue.identifier} - skipping description update")
+                adapter.transition_issue(issue.id, "Human: Review PRD", issue.team_key)
+            else:
+                # Save the original ticket content as a comment, replace the
+                # description with the PRD and move to Human: Review PRD for
+                # human approval, all in one request
+                comment_body = None
+                if original_description:
+                    comment_body = f"## Original ticket request\n\n{original_description}"
+                adapter.update_issue_with_comment(
+                    issue.id, prd_markdown, "Human: Review PRD", comment_body, issue.team_key
+                )
             print(f"   ✅ Posted PRD to Linear issue {issue.identifier}")
             print(f"   ⏸️  Moved to 'Human: Review PRD' - waiting for human approval")
         except Exception as e:
@@ -120,6 +147,6 @@ def approval_gate_node(state: AgentState) -> dict:
     # End flow here - human will move issue back to "AI: Ready" when approved
     return {
         "status": "awaiting_prd_review",
-        "messages": state.get("messages", []) + ["PRD posted for review - awaiting human approval"]
+        "messages": ["PRD posted for review - awaiting human approval"]
     }
 
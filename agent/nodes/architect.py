@@ -1,13 +1,17 @@
-import json
-import re
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from agent.state import AgentState
+from agent.config.llm import gated_ainvoke, get_llm, per_loop
+from agent.utils.json_parse import parse_first_json
+from agent.utils.prompt import PromptTemplate
 
-load_dotenv()
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0)
+@per_loop
+def _llm():
+    # JSON mode: Gemini returns bare JSON, no prose or code fences
+    return get_llm().bind(
+        temperature=0,
+        response_mime_type="application/json",
+    )
 
-ARCHITECT_PROMPT = """You are a Software Architect breaking down a feature into stacked PRs.
+ARCHITECT_PROMPT = PromptTemplate("""You are a Software Architect breaking down a feature into stacked PRs.
 
 Feature Request:
 {task_description}
@@ -42,30 +46,23 @@ Output JSON:
     }}
   ]
 }}
-"""
+""")
 
 
-def architect_node(state: AgentState) -> dict:
+async def architect_node(state: AgentState) -> dict:
     """Break down a feature into stacked work items."""
     prompt = ARCHITECT_PROMPT.format(
         task_description=state["task_description"]
     )
 
-    response = llm.invoke(prompt)
+    response = await gated_ainvoke(_llm(), prompt)
     content = response.content
     if isinstance(content, list):
         content = content[0] if content else ""
     content = content.strip()
 
-    if content.startswith("```"):
-        content = re.sub(r"^```(?:json)?\n?", "", content)
-        content = re.sub(r"\n?```$", "", content)
-
-    try:
-        breakdown = json.loads(content)
-        work_items = breakdown.get("work_items", [])
-    except json.JSONDecodeError:
-        work_items = []
+    breakdown = parse_first_json(content)
+    work_items = breakdown.get("work_items", []) if isinstance(breakdown, dict) else []
 
     print(f"   🏗️ Architect: {len(work_items)} work items planned")
 
@@ -73,5 +70,5 @@ def architect_node(state: AgentState) -> dict:
         "work_items": work_items,
         "current_work_index": 0,
         "status": "architected" if work_items else "failed",
-        "messages": state.get("messages", []) + [f"Architected {len(work_items)} work items"]
+        "messages": [f"Architected {len(work_items)} work items"]
     }
@@ -1,13 +1,18 @@
-import json
-import re
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from agent.state import AgentState
+from agent.state import AgentState, ClassifierResponse
+from agent.config.llm import gated_ainvoke, get_llm, per_loop
+from agent.utils.json_parse import strip_fence
+from agent.utils.prompt import PromptTemplate
 
-load_dotenv()
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0)
+@per_loop
+def _llm():
+    # JSON mode with a response schema, so replies parse without repair
+    return get_llm().bind(
+        temperature=0,
+        response_mime_type="application/json",
+        response_schema=ClassifierResponse.model_json_schema(),
+    )
 
-CLASSIFIER_PROMPT = """You are a request classifier for a software development AI system.
+CLASSIFIER_PROMPT = PromptTemplate("""You are a request classifier for a software development AI system.
 
 Analyze this task and classify it into ONE of these categories:
 
@@ -36,36 +41,31 @@ Task: {task_description}
 
 Respond with ONLY a JSON object:
 {{"classification": "requires_contract"}} or {{"classification": "infrastructure"}} or {{"classification": "general"}}
-"""
+""")
 
 
-def classifier_node(state: AgentState) -> dict:
+async def classifier_node(state: AgentState) -> dict:
     """Classify the request type to determine workflow path."""
     prompt = CLASSIFIER_PROMPT.format(
         task_description=state["task_description"]
     )
 
-    response = llm.invoke(prompt)
+    response = await gated_ainvoke(_llm(), prompt)
     content = response.content
     if isinstance(content, list):
         content = content[0] if content else ""
     content = content.strip()
 
-    if content.startswith("```"):
-        content = re.sub(r"^```(?:json)?\n?", "", content)
-        content = re.sub(r"\n?```$", "", content)
+    content = strip_fence(content)
 
     try:
-        data = json.loads(content)
-        request_type = data.get("classification", "general")
-        if request_type not in ["requires_contract", "infrastructure", "general"]:
-            request_type = "general"
-    except json.JSONDecodeError:
+        request_type = ClassifierResponse.model_validate_json(content).classification
+    except ValueError:
         request_type = "general"
 
     print(f"   📊 Classified as: {request_type}")
 
     return {
         "request_type": request_type,
-        "messages": state.get("messages", []) + [f"Classified as: {request_type}"]
+        "messages": [f"Classified as: {request_type}"]
     }
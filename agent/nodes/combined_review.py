@@ -0,0 +1,90 @@
+"""Combined Review - runs every reviewer for a work item in one LLM call."""
+from typing import List
+from pydantic import BaseModel
+from agent.state import AgentState, ReviewFeedback
+from agent.config.llm import get_llm, per_loop
+from agent.utils.llm_cache import cached_ainvoke
+from agent.nodes.reviewers import reviewers_for
+from agent.utils.json_parse import strip_fence, validate_json
+from agent.nodes.security import SECURITY_PROMPT
+from agent.nodes.compliance import COMPLIANCE_PROMPT
+from agent.nodes.design import DESIGN_PROMPT
+
+
+class CombinedReviewResponse(BaseModel):
+    """Structured output schema: one review per requested reviewer."""
+    reviews: List[ReviewFeedback]
+
+
+@per_loop
+def _llm():
+    # JSON mode with a response schema, so replies parse without repair
+    return get_llm().bind(
+        temperature=0,
+        response_mime_type="application/json",
+        response_schema=CombinedReviewResponse.model_json_schema(),
+    )
+
+# Reviewer prompt and the name of its artifact placeholder
+REVIEWER_PROMPTS = {
+    "security": (SECURITY_PROMPT, "contract"),
+    "compliance": (COMPLIANCE_PROMPT, "content"),
+    "design": (DESIGN_PROMPT, "content"),
+}
+
+ARTIFACT_REFERENCE = "(the artifact at the top of this message)"
+
+
+def build_combined_prompt(artifact: str, reviewers: List[str]) -> str:
+    """Embed the artifact once, followed by each reviewer's brief."""
+    parts = [
+        "You are a review panel. Each section below is one reviewer's brief; "
+        "apply every brief to the same artifact.\n\n"
+        f"Artifact under review:\n{artifact}\n"
+    ]
+    for name in reviewers:
+        template, field = REVIEWER_PROMPTS[name]
+        parts.append(f"\n## Reviewer: {name}\n{template.format(**{field: ARTIFACT_REFERENCE})}")
+    parts.append(
+        "\nIgnore the per-reviewer response formats above. Respond with ONLY one JSON object:\n"
+        '{"reviews": [{"agent": "<reviewer name>", "approved": true or false, '
+        '"concerns": [...], "suggestions": [...]}]}\n'
+        f"Include exactly one review for each of: {', '.join(reviewers)}.\n"
+    )
+    return "".join(parts)
+
+
+async def combined_review_node(state: AgentState) -> dict:
+    """Review the artifact with every reviewer for its work item type in a single request."""
+    reviewers = reviewers_for(state)
+    prompt = build_combined_prompt(state.get("current_contract") or "", reviewers)
+
+    response = await cached_ainvoke(_llm(), prompt, "combined_review")
+    content = response.content
+    if isinstance(content, list):
+        content = content[0] if content else ""
+    content = strip_fence(content.strip())
+
+    try:
+        by_agent = {
+            review.agent: review
+            for review in validate_json(CombinedReviewResponse, content).reviews
+        }
+    except ValueError:
+        by_agent = {}
+
+    feedback = []
+    for name in reviewers:
+        review = by_agent.get(name)
+        if review is None:
+            review = ReviewFeedback(
+                agent=name,
+                approved=False,
+                concerns=[f"Failed to parse {name} review"],
+                suggestions=[]
+            )
+        feedback.append(review)
+        print(f"   🧾 {name.capitalize()}: {'✅ Approved' if review.approved else '❌ Issues found'}")
+
+    # review_feedback has an appending reducer; all reviews land in one write
+    return {"review_feedback": feedback}
@@ -1,21 +1,17 @@
 """Contractor Planner - creates technical specs for data contracts using Claude Code."""
-import json
+import asyncio
 import os
 from agent.state import AgentState
+from agent.adapters.linear_adapter import get_async_linear_adapter
 from agent.config.context import get_context_for_prompt
-from agent.tools.claude_code import run_claude_code, extract_json_from_response
+from agent.tools.claude_code import READ_ONLY_TOOLS, run_claude_code, extract_json_from_response
+from agent.utils.prompt import PromptTemplate
 
 
-CONTRACTOR_PLANNER_PROMPT = """You are a Senior Software Architect creating a technical specification for a data contract.
+CONTRACTOR_PLANNER_PROMPT = PromptTemplate("""You are a Senior Software Architect creating a technical specification for a data contract.
 
 {project_context}
 
-PRD (Product Requirements Document):
-{prd_content}
-
-Additional Context (Comments):
-{comments}
-
 Create a detailed technical specification including:
 
 1. **Schema Design**: Field names, types, validation rules
@@ -43,26 +39,36 @@ Output your response as JSON (no markdown code blocks):
   "testing_strategy": ["test cases to implement"],
   "estimated_effort": "S|M|L"
 }}
-"""
+""")
+
+# Per-issue part of the prompt; the static instructions above go in the system prompt
+CONTRACTOR_PLANNER_REQUEST = PromptTemplate("""PRD (Product Requirements Document):
+{prd_content}
+
+Additional Context (Comments):
+{comments}
+""")
 
 
-def contractor_planner_node(state: AgentState) -> dict:
+async def contractor_planner_node(state: AgentState) -> dict:
     """Generate a technical spec for a data contract using Claude Code."""
     # Fetch fresh issue content from Linear - PRD is in the description after approval
     issue = state.get("current_issue")
     prd_content = ""
+    comments_text = "No comments available."
     
     if issue:
-        from agent.adapters.linear_adapter import LinearAdapter
         try:
-            adapter = LinearAdapter()
-            fresh_issue = adapter.get_issue_by_id(issue.id)
+            adapter = get_async_linear_adapter()
+            # Issue and comments are independent queries - fetch them concurrently
+            fresh_issue, comments = await asyncio.gather(
+                adapter.get_issue_by_id(issue.id),
+                adapter.get_issue_comments(issue.id)
+            )
             if fresh_issue and fresh_issue.description:
                 prd_content = fresh_issue.description
                 print(f"   📄 Fetched fresh PRD from Linear issue {fresh_issue.identifier}")
 
-            # Fetch comments
-            comments = adapter.get_issue_comments(issue.id)
             if comments:
                 comments_text = "\n\n".join(comments)
                 print(f"   💬 Fetched {len(comments)} comments")
@@ -76,20 +82,21 @@ def contractor_planner_node(state: AgentState) -> dict:
     if not prd_content:
         prd_content = state.get("task_description", "No PRD available")
 
-    prompt = CONTRACTOR_PLANNER_PROMPT.format(
-        project_context=get_context_for_prompt(),
+    system_prompt = CONTRACTOR_PLANNER_PROMPT.format(project_context=get_context_for_prompt())
+    prompt = CONTRACTOR_PLANNER_REQUEST.format(
         prd_content=prd_content,
         comments=comments_text
     )
 
     # Run Claude Code CLI
     print("   🤖 Running Claude Code for contract planning...")
-    result = run_claude_code(
+    result = await run_claude_code(
         prompt=prompt,
         working_dir=state.get("workspace_path", "."),
-        allowed_tools=["Read"],  # Read-only for planning
+        allowed_tools=READ_ONLY_TOOLS,  # Read-only for planning
         output_format="text",
-        timeout=120
+        timeout=120,
+        system_prompt=system_prompt
     )
 
     if result.get("error"):
@@ -97,7 +104,7 @@ def contractor_planner_node(state: AgentState) -> dict:
         return {
             "technical_spec": {"error": result["error"]},
             "status": "spec_failed",
-            "messages": state.get("messages", []) + [f"Contractor planner failed: {result['error']}"]
+            "messages": [f"Contractor planner failed: {result['error']}"]
         }
 
     # Parse the response
@@ -115,5 +122,5 @@ def contractor_planner_node(state: AgentState) -> dict:
     return {
         "technical_spec": tech_spec,
         "status": "spec_ready",
-        "messages": state.get("messages", []) + ["Contractor Planner created technical spec"]
+        "messages": ["Contractor Planner created technical spec"]
     }
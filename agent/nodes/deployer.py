@@ -9,7 +9,7 @@ def deployer_node(state: AgentState) -> dict:
         print("   🚀 Deployer: Skipped (no branch)")
         return {
             "ephemeral_status": "skipped",
-            "messages": state.get("messages", []) + ["No branch to deploy"]
+            "messages": ["No branch to deploy"]
         }
 
     db_success, db_result = provision_ephemeral_db(branch)
@@ -17,7 +17,7 @@ def deployer_node(state: AgentState) -> dict:
         print(f"   🚀 Deployer: DB provisioning skipped")
         return {
             "ephemeral_status": "db_skipped",
-            "messages": state.get("messages", []) + [f"DB provisioning skipped: {db_result}"]
+            "messages": [f"DB provisioning skipped: {db_result}"]
         }
 
     deploy_success, preview_url = deploy_preview(branch)
@@ -26,7 +26,7 @@ def deployer_node(state: AgentState) -> dict:
         return {
             "ephemeral_status": "deploy_skipped",
             "ephemeral_db_url": db_result,
-            "messages": state.get("messages", []) + [f"Deploy skipped: {preview_url}"]
+            "messages": [f"Deploy skipped: {preview_url}"]
         }
 
     print(f"   🚀 Deployer: Deployed to {preview_url}")
@@ -34,5 +34,5 @@ def deployer_node(state: AgentState) -> dict:
         "ephemeral_status": "deployed",
         "preview_url": preview_url,
         "ephemeral_db_url": db_result,
-        "messages": state.get("messages", []) + [f"Deployed to {preview_url}"]
+        "messages": [f"Deployed to {preview_url}"]
     }
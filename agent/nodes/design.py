@@ -1,13 +1,19 @@
-import json
-import re
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from agent.state import AgentState, ReviewFeedback
+from agent.state import AgentState, ReviewFeedback, ReviewResponse
+from agent.config.llm import get_llm, per_loop
+from agent.utils.llm_cache import cached_ainvoke
+from agent.utils.json_parse import strip_fence, validate_json
+from agent.utils.prompt import PromptTemplate
 
-load_dotenv()
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0)
+@per_loop
+def _llm():
+    # JSON mode with a response schema, so replies parse without repair
+    return get_llm().bind(
+        temperature=0,
+        response_mime_type="application/json",
+        response_schema=ReviewResponse.model_json_schema(),
+    )
 
-DESIGN_PROMPT = """You are a Design System Purist reviewing frontend code.
+DESIGN_PROMPT = PromptTemplate("""You are a Design System Purist reviewing frontend code.
 
 Code under review:
 {content}
@@ -27,34 +33,32 @@ Respond with JSON only:
 }}
 
 Approve if the code follows reasonable design patterns.
-"""
+""")
 
 
-def design_node(state: AgentState) -> dict:
+async def design_node(state: AgentState) -> dict:
     """Review frontend code for design consistency."""
     content = state.get("current_contract") or ""
 
     prompt = DESIGN_PROMPT.format(content=content)
-    response = llm.invoke(prompt)
+    response = await cached_ainvoke(_llm(), prompt, "design")
 
     resp_content = response.content
     if isinstance(resp_content, list):
         resp_content = resp_content[0] if resp_content else ""
     resp_content = resp_content.strip()
 
-    if resp_content.startswith("```"):
-        resp_content = re.sub(r"^```(?:json)?\n?", "", resp_content)
-        resp_content = re.sub(r"\n?```$", "", resp_content)
+    resp_content = strip_fence(resp_content)
 
     try:
-        data = json.loads(resp_content)
+        review = validate_json(ReviewResponse, resp_content)
         feedback = ReviewFeedback(
             agent="design",
-            approved=data.get("approved", False),
-            concerns=data.get("concerns", []),
-            suggestions=data.get("suggestions", [])
+            approved=review.approved,
+            concerns=review.concerns,
+            suggestions=review.suggestions
         )
-    except (json.JSONDecodeError, ValueError):
+    except ValueError:
         feedback = ReviewFeedback(
             agent="design",
             approved=False,
@@ -64,5 +68,5 @@ def design_node(state: AgentState) -> dict:
 
     print(f"   🎨 Design: {'✅ Approved' if feedback.approved else '❌ Issues found'}")
 
-    existing = state.get("review_feedback", [])
-    return {"review_feedback": existing + [feedback]}
+    # review_feedback has an appending reducer, so return only this review
+    return {"review_feedback": [feedback]}
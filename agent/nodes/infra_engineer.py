@@ -1,13 +1,19 @@
-import json
-import re
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+import orjson
 from agent.state import AgentState
+from agent.config.llm import get_llm, per_loop
+from agent.utils.llm_cache import cached_ainvoke
+from agent.utils.json_parse import parse_json_artifact, strip_fence
+from agent.utils.prompt import PromptTemplate, format_review_feedback
 
-load_dotenv()
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0)
+@per_loop
+def _llm():
+    # JSON mode: Gemini returns bare JSON, no prose or code fences
+    return get_llm().bind(
+        temperature=0,
+        response_mime_type="application/json",
+    )
 
-INFRA_ENGINEER_PROMPT = """You are an Infrastructure Engineer.
+INFRA_ENGINEER_PROMPT = PromptTemplate("""You are an Infrastructure Engineer.
 Your job is to take an infrastructure task and produce implementation artifacts.
 
 Task: {task_description}
@@ -23,45 +29,41 @@ Output ONLY a JSON object with these exact keys:
 
 Be precise. Follow infrastructure best practices.
 Output raw JSON only, no markdown code blocks.
-"""
+""")
 
 
-def infra_engineer_node(state: AgentState) -> dict:
+async def infra_engineer_node(state: AgentState) -> dict:
     """Generate infrastructure artifacts based on the task."""
-    feedback_list = state.get("review_feedback", [])
-    feedback_str = "\n".join(
-        f"- [{fb.agent}]: {', '.join(fb.concerns)}"
-        for fb in feedback_list
-        if not fb.approved
-    ) or "None - this is the first draft."
+    feedback_str = format_review_feedback(state.get("review_feedback") or [])
 
     prompt = INFRA_ENGINEER_PROMPT.format(
         task_description=state["task_description"],
         feedback=feedback_str
     )
 
-    response = llm.invoke(prompt)
+    response = await cached_ainvoke(_llm(), prompt, "infra_engineer")
     content = response.content
     if isinstance(content, list):
         content = content[0] if content else ""
     content = content.strip()
 
-    if content.startswith("```"):
-        content = re.sub(r"^```(?:json)?\n?", "", content)
-        content = re.sub(r"\n?```$", "", content)
+    content = strip_fence(content)
 
-    try:
-        json.loads(content)
-    except json.JSONDecodeError:
-        content = json.dumps({
+    # Keep the parsed artifact so the publisher doesn't parse it again;
+    # repaired or recovered JSON replaces the raw reply so reviewers see what ships
+    artifact, content = parse_json_artifact(content)
+    if not isinstance(artifact, dict):
+        artifact = {
             "name": "parse_error",
             "type": "error",
             "content": "",
             "description": f"Failed to parse: {content[:200]}"
-        })
+        }
+        content = orjson.dumps(artifact).decode()
 
     return {
         "current_contract": content,
+        "current_artifact": artifact,
         "status": "reviewing",
         "iteration_count": state.get("iteration_count", 0) + 1,
         "review_feedback": []
@@ -1,21 +1,17 @@
 """Infra Engineer Planner - creates technical specs for infrastructure changes using Claude Code."""
-import json
+import asyncio
 import os
 from agent.state import AgentState
+from agent.adapters.linear_adapter import get_async_linear_adapter
 from agent.config.context import get_context_for_prompt
-from agent.tools.claude_code import run_claude_code, extract_json_from_response
+from agent.tools.claude_code import READ_ONLY_TOOLS, run_claude_code, extract_json_from_response
+from agent.utils.prompt import PromptTemplate
 
 
-INFRA_ENGINEER_PLANNER_PROMPT = """You are a Senior Infrastructure Architect creating a technical specification.
+INFRA_ENGINEER_PLANNER_PROMPT = PromptTemplate("""You are a Senior Infrastructure Architect creating a technical specification.
 
 {project_context}
 
-PRD (Product Requirements Document):
-{prd_content}
-
-Additional Context (Comments):
-{comments}
-
 Create a detailed technical specification including:
 
 1. **Resource Requirements**: What infrastructure resources are needed
@@ -51,26 +47,36 @@ Output your response as JSON (no markdown code blocks):
   "security_notes": ["security consideration"],
   "estimated_effort": "S|M|L"
 }}
-"""
+""")
+
+# Per-issue part of the prompt; the static instructions above go in the system prompt
+INFRA_ENGINEER_PLANNER_REQUEST = PromptTemplate("""PRD (Product Requirements Document):
+{prd_content}
+
+Additional Context (Comments):
+{comments}
+""")
 
 
-def infra_engineer_planner_node(state: AgentState) -> dict:
+async def infra_engineer_planner_node(state: AgentState) -> dict:
     """Generate a technical spec for infrastructure changes using Claude Code."""
     # Fetch fresh issue content from Linear - PRD is in the description after approval
     issue = state.get("current_issue")
     prd_content = ""
+    comments_text = "No comments available."
     
     if issue:
-        from agent.adapters.linear_adapter import LinearAdapter
         try:
-            adapter = LinearAdapter()
-            fresh_issue = adapter.get_issue_by_id(issue.id)
+            adapter = get_async_linear_adapter()
+            # Issue and comments are independent queries - fetch them concurrently
+            fresh_issue, comments = await asyncio.gather(
+                adapter.get_issue_by_id(issue.id),
+                adapter.get_issue_comments(issue.id)
+            )
             if fresh_issue and fresh_issue.description:
                 prd_content = fresh_issue.description
                 print(f"   📄 Fetched fresh PRD from Linear issue {fresh_issue.identifier}")
 
-            # Fetch comments
-            comments = adapter.get_issue_comments(issue.id)
             if comments:
                 comments_text = "\n\n".join(comments)
                 print(f"   💬 Fetched {len(comments)} comments")
@@ -84,20 +90,21 @@ def infra_engineer_planner_node(state: AgentState) -> dict:
     if not prd_content:
         prd_content = state.get("task_description", "No PRD available")
 
-    prompt = INFRA_ENGINEER_PLANNER_PROMPT.format(
-        project_context=get_context_for_prompt(),
+    system_prompt = INFRA_ENGINEER_PLANNER_PROMPT.format(project_context=get_context_for_prompt())
+    prompt = INFRA_ENGINEER_PLANNER_REQUEST.format(
         prd_content=prd_content,
         comments=comments_text
     )
 
     # Run Claude Code CLI
     print("   🤖 Running Claude Code for infrastructure planning...")
-    result = run_claude_code(
+    result = await run_claude_code(
         prompt=prompt,
         working_dir=state.get("workspace_path", "."),
-        allowed_tools=["Read"],  # Read-only for planning
+        allowed_tools=READ_ONLY_TOOLS,  # Read-only for planning
         output_format="text",
-        timeout=120
+        timeout=120,
+        system_prompt=system_prompt
     )
 
     if result.get("error"):
@@ -105,7 +112,7 @@ def infra_engineer_planner_node(state: AgentState) -> dict:
         return {
             "technical_spec": {"error": result["error"]},
             "status": "spec_failed",
-            "messages": state.get("messages", []) + [f"Infra planner failed: {result['error']}"]
+            "messages": [f"Infra planner failed: {result['error']}"]
         }
 
     # Parse the response
@@ -123,5 +130,5 @@ def infra_engineer_planner_node(state: AgentState) -> dict:
     return {
         "technical_spec": tech_spec,
         "status": "spec_ready",
-        "messages": state.get("messages", []) + ["Infra Engineer Planner created technical spec"]
+        "messages": ["Infra Engineer Planner created technical spec"]
     }
@@ -1,15 +1,19 @@
 """Product Manager Agent - converts vague user ideas into structured PRDs with acceptance criteria."""
-import json
-import re
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from agent.state import AgentState
+from agent.state import AgentState, PRDResponse
 from agent.config.context import get_context_for_prompt
+from agent.config.llm import gated_ainvoke, get_llm, per_loop
+from agent.utils.json_parse import validate_json
+from agent.utils.prompt import PromptTemplate
+
+@per_loop
+def _llm():
+    # JSON mode: Gemini returns bare JSON, no prose or code fences
+    return get_llm().bind(
+        temperature=0.3,
+        response_mime_type="application/json",
+    )
 
-load_dotenv()
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0.3)
-
-PRODUCT_MANAGER_PROMPT = """You are a Senior Product Manager creating a Product Requirements Document.
+PRODUCT_MANAGER_PROMPT = PromptTemplate("""You are a Senior Product Manager creating a Product Requirements Document.
 
 {project_context}
 
@@ -62,10 +66,10 @@ Output JSON:
   "priority": "P0|P1|P2",
   "estimated_complexity": "S|M|L|XL"
 }}
-"""
+""")
 
 
-def product_manager_node(state: AgentState) -> dict:
+async def product_manager_node(state: AgentState) -> dict:
     """Generate a structured PRD from user input."""
     feedback = state.get("prd_feedback") or "None - first draft"
 
@@ -75,31 +79,27 @@ def product_manager_node(state: AgentState) -> dict:
         feedback=feedback
     )
 
-    response = llm.invoke(prompt)
+    response = await gated_ainvoke(_llm(), prompt)
     content = response.content
     if isinstance(content, list):
         content = content[0] if content else ""
     content = content.strip()
 
-    # Strip markdown
-    if content.startswith("```"):
-        content = re.sub(r"^```(?:json)?\n?", "", content)
-        content = re.sub(r"\n?```$", "", content)
-
     try:
-        prd = json.loads(content)
-        if prd is None:
-             raise ValueError("Parsed JSON is null")
-             
-        print(f"   📋 Product Manager created PRD: {prd.get('title', 'Untitled')}")
-        print(f"      User stories: {len(prd.get('user_stories', []))}")
-        print(f"      Priority: {prd.get('priority', 'P1')} | Complexity: {prd.get('estimated_complexity', 'M')}")
-    except (json.JSONDecodeError, ValueError) as e:
+        # Tolerates markdown fences, trailing prose and minor JSON glitches
+        parsed = validate_json(PRDResponse, content)
+
+        print(f"   📋 Product Manager created PRD: {parsed.title}")
+        print(f"      User stories: {len(parsed.user_stories)}")
+        print(f"      Priority: {parsed.priority} | Complexity: {parsed.estimated_complexity}")
+        # Downstream formatting supplies its own defaults, so keep only what the model sent
+        prd = parsed.model_dump(exclude_unset=True)
+    except ValueError as e:
         prd = {"error": "Failed to parse PRD", "raw": content[:500]}
         print(f"   ⚠️ Product Manager could not parse PRD response: {e}")
 
     return {
         "prd": prd,
         "status": "prd_ready",
-        "messages": state.get("messages", []) + ["Product Manager created PRD"]
+        "messages": ["Product Manager created PRD"]
     }
@@ -1,17 +1,17 @@
 import os
-import json
+import orjson
 from agent.state import AgentState
 from agent.tools.git import (
-    create_branch, commit_changes, push_branch, create_pr
+    create_branch_async, commit_changes_async, push_branch_async, create_pr_async
 )
-from agent.adapters.linear_adapter import LinearAdapter
+from agent.adapters.linear_adapter import get_async_linear_adapter
 
 
-def publisher_node(state: AgentState) -> dict:
+async def publisher_node(state: AgentState) -> dict:
     """Handle git operations and PR creation."""
     issue = state.get("current_issue")
     if not issue:
-        return {"messages": state.get("messages", []) + ["No issue to publish"]}
+        return {"messages": ["No issue to publish"]}
 
     request_type = state.get("request_type", "general")
     
@@ -19,25 +19,33 @@ def publisher_node(state: AgentState) -> dict:
     branch_name = f"ai/{issue.identifier.lower()}"
 
     # Create and checkout branch
-    success, branch_msg = create_branch(branch_name)
+    success, branch_msg = await create_branch_async(branch_name)
     if not success:
         return {
             "status": "failed",
-            "messages": state.get("messages", []) + [branch_msg]
+            "messages": [branch_msg]
         }
 
     # Handle based on request type
     artifact = state.get("current_contract")
+    # Implementation nodes hand over the parsed artifact; only parse when it's absent
+    artifact_data = state.get("current_artifact")
+    if artifact_data is None and artifact:
+        try:
+            artifact_data = orjson.loads(artifact)
+        except orjson.JSONDecodeError:
+            pass
+    if not isinstance(artifact_data, dict):
+        artifact_data = None
     
     if request_type == "requires_contract" and artifact:
         # Contract request - write to contracts/
         contracts_dir = "contracts"
         os.makedirs(contracts_dir, exist_ok=True)
         
-        try:
-            artifact_data = json.loads(artifact)
+        if artifact_data:
             artifact_name = artifact_data.get("name", issue.identifier).lower()
-        except json.JSONDecodeError:
+        else:
             artifact_name = issue.identifier.lower()
         
         artifact_file = os.path.join(contracts_dir, f"{artifact_name}.json")
@@ -45,16 +53,15 @@ def publisher_node(state: AgentState) -> dict:
             f.write(artifact)
         
         commit_message = f"feat({issue.identifier}): Add {artifact_name} data contract\n\nGenerated by AI Factory"
-        commit_changes(commit_message, [artifact_file])
+        await commit_changes_async(commit_message, [artifact_file])
         
     elif request_type == "infrastructure" and artifact:
         # Infrastructure request - write to infra/
-        try:
-            artifact_data = json.loads(artifact)
+        if artifact_data:
             artifact_name = artifact_data.get("name", issue.identifier.lower())
             artifact_type = artifact_data.get("type", "config")
             artifact_content = artifact_data.get("content", artifact)
-        except json.JSONDecodeError:
+        else:
             artifact_name = issue.identifier.lower()
             artifact_type = "config"
             artifact_content = artifact
@@ -71,16 +78,15 @@ def publisher_node(state: AgentState) -> dict:
             f.write(artifact_content)
         
         commit_message = f"chore({issue.identifier}): Add {artifact_name}\n\nGenerated by AI Factory"
-        commit_changes(commit_message, [artifact_file])
+        await commit_changes_async(commit_message, [artifact_file])
         
     elif artifact:
         # General request - write to src/
-        try:
-            artifact_data = json.loads(artifact)
+        if artifact_data:
             artifact_name = artifact_data.get("name", issue.identifier.lower())
             language = artifact_data.get("language", "python")
             artifact_content = artifact_data.get("content", artifact)
-        except json.JSONDecodeError:
+        else:
             artifact_name = issue.identifier.lower()
             language = "python"
             artifact_content = artifact
@@ -96,33 +102,34 @@ def publisher_node(state: AgentState) -> dict:
             f.write(artifact_content)
         
         commit_message = f"feat({issue.identifier}): Add {artifact_name}\n\nGenerated by AI Factory"
-        commit_changes(commit_message, [artifact_file])
+        await commit_changes_async(commit_message, [artifact_file])
     else:
         return {
             "status": "failed",
-            "messages": state.get("messages", []) + ["No artifact generated to commit"]
+            "messages": ["No artifact generated to commit"]
         }
 
     # Push and create PR
-    push_branch(branch_name)
-    success, pr_result = create_pr(
+    await push_branch_async(branch_name)
+    success, pr_result = await create_pr_async(
         title=f"[{issue.identifier}] {issue.title}",
         body=f"## Summary\n\n{issue.description or 'AI-generated implementation'}\n\n---\n*Generated by Software Factory*"
     )
 
     if success:
-        adapter = LinearAdapter()
-        adapter.transition_issue(issue.id, "Human: Review PR")
-        adapter.add_comment(issue.id, f"✅ PR created: {pr_result}")
+        adapter = get_async_linear_adapter()
+        await adapter.transition_issue_with_comment(
+            issue.id, "Human: Review PR", f"✅ PR created: {pr_result}", issue.team_key
+        )
 
         return {
             "status": "published",
             "pr_url": pr_result,
             "stack_base_branch": branch_name,
-            "messages": state.get("messages", []) + [f"PR created: {pr_result}"]
+            "messages": [f"PR created: {pr_result}"]
         }
 
     return {
         "status": "failed",
-        "messages": state.get("messages", []) + [f"Failed to create PR: {pr_result}"]
+        "messages": [f"Failed to create PR: {pr_result}"]
     }
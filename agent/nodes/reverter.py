@@ -1,9 +1,17 @@
-import subprocess
+import asyncio
 from agent.state import AgentState
-from agent.adapters.linear_adapter import LinearAdapter
+from agent.adapters.linear_adapter import get_async_linear_adapter
+from agent.tools.git import run_git_async
 
 
-def reverter_node(state: AgentState) -> dict:
+async def _run(*cmd: str) -> tuple[int, str]:
+    """Run a command without blocking the event loop; return (returncode, stdout)."""
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE)
+    stdout, _ = await proc.communicate()
+    return proc.returncode, stdout.decode()
+
+
+async def reverter_node(state: AgentState) -> dict:
     """Revert deployment and create bug ticket."""
     issue = state.get("current_issue")
     pr_url = state.get("pr_url")
@@ -13,46 +21,54 @@ def reverter_node(state: AgentState) -> dict:
         return {"revert_status": "skipped"}
 
     try:
-        result = subprocess.run(
-            ["gh", "pr", "view", pr_url, "--json", "mergeCommit", "-q", ".mergeCommit.oid"],
-            capture_output=True,
-            text=True
+        returncode, stdout = await _run(
+            "gh", "pr", "view", pr_url, "--json", "mergeCommit", "-q", ".mergeCommit.oid"
         )
 
-        if result.returncode == 0 and result.stdout.strip():
-            merge_sha = result.stdout.strip()
+        if returncode == 0 and stdout.strip():
+            merge_sha = stdout.strip()
 
-            subprocess.run(["git", "revert", merge_sha, "--no-edit"])
-            subprocess.run(["git", "push", "origin", "main"])
+            # Push only if the revert applied; run_git_async keeps both behind
+            # the repo's lock so they don't race other git work in this checkout
+            success, output = await run_git_async("revert", merge_sha, "--no-edit")
+            if success:
+                success, output = await run_git_async("push", "origin", "main")
+            if not success:
+                print(f"   ⏪ Reverter: Failed to revert {merge_sha[:8]}")
+                return {
+                    "revert_status": "failed",
+                    "messages": [f"Revert of {merge_sha} failed: {output.strip()}"]
+                }
 
             print(f"   ⏪ Reverter: Reverted {merge_sha[:8]}")
 
             if issue:
                 try:
-                    adapter = LinearAdapter()
-                    adapter.add_comment(
+                    adapter = get_async_linear_adapter()
+                    await adapter.transition_issue_with_comment(
                         issue.id,
-                        f"⚠️ **Auto-Reverted**\n\nError spike detected after deployment.\nRevert commit: {merge_sha}"
+                        "AI: Failed",
+                        f"⚠️ **Auto-Reverted**\n\nError spike detected after deployment.\nRevert commit: {merge_sha}",
+                        issue.team_key
                     )
-                    adapter.transition_issue(issue.id, "AI: Failed")
                 except Exception:
                     pass
 
             return {
                 "revert_status": "completed",
                 "reverted_commit": merge_sha,
-                "messages": state.get("messages", []) + [f"Reverted commit {merge_sha}"]
+                "messages": [f"Reverted commit {merge_sha}"]
             }
         else:
             print("   ⏪ Reverter: PR not merged yet")
             return {
                 "revert_status": "skipped",
-                "messages": state.get("messages", []) + ["PR not merged, nothing to revert"]
+                "messages": ["PR not merged, nothing to revert"]
             }
 
     except Exception as e:
         print(f"   ⏪ Reverter: Failed - {e}")
         return {
             "revert_status": "failed",
-            "messages": state.get("messages", []) + [f"Revert failed: {e}"]
+            "messages": [f"Revert failed: {e}"]
         }
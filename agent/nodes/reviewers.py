@@ -0,0 +1,19 @@
+"""Which reviewers apply to a work item; shared by the graph router and combined_review."""
+from typing import Final
+from agent.state import AgentState
+
+# Reviewers to run in parallel for each work item type (default: security only)
+REVIEWER_ROUTES: Final[dict] = {
+    "BACKEND": ["compliance", "security"],
+    "FRONTEND": ["design", "security"],
+}
+DEFAULT_REVIEWERS: Final[list] = ["security"]
+
+
+def reviewers_for(state: AgentState) -> list:
+    """Reviewers that apply to the current work item type."""
+    # stack_manager normalizes current_work_item to a dict with a "type" key
+    current_work = state.get("current_work_item")
+    if current_work:
+        return REVIEWER_ROUTES.get(current_work["type"], DEFAULT_REVIEWERS)
+    return DEFAULT_REVIEWERS
@@ -1,13 +1,19 @@
-import json
-import re
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from agent.state import AgentState, ReviewFeedback
+from agent.state import AgentState, ReviewFeedback, ReviewResponse
+from agent.config.llm import get_llm, per_loop
+from agent.utils.llm_cache import cached_ainvoke
+from agent.utils.json_parse import strip_fence, validate_json
+from agent.utils.prompt import PromptTemplate
 
-load_dotenv()
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0)
+@per_loop
+def _llm():
+    # JSON mode with a response schema, so replies parse without repair
+    return get_llm().bind(
+        temperature=0,
+        response_mime_type="application/json",
+        response_schema=ReviewResponse.model_json_schema(),
+    )
 
-SECURITY_PROMPT = """You are a Security Engineer reviewing a data contract for a healthcare application.
+SECURITY_PROMPT = PromptTemplate("""You are a Security Engineer reviewing a data contract for a healthcare application.
 
 Contract under review:
 {contract}
@@ -27,36 +33,34 @@ Respond with ONLY a JSON object (no markdown):
 IMPORTANT: Be pragmatic. Approve the contract if it addresses basic security.
 Minor improvements can be noted as suggestions without blocking approval.
 If fields mention validation, sanitization, or proper types, that's sufficient.
-"""
+""")
 
 
-def security_node(state: AgentState) -> dict:
+async def security_node(state: AgentState) -> dict:
     """Review the contract for security issues."""
     prompt = SECURITY_PROMPT.format(
         contract=state.get("current_contract", "{}")
     )
 
-    response = llm.invoke(prompt)
+    response = await cached_ainvoke(_llm(), prompt, "security")
     content = response.content
     if isinstance(content, list):
         content = content[0] if content else ""
     content = content.strip()
 
     # Strip markdown code blocks if present
-    if content.startswith("```"):
-        content = re.sub(r"^```(?:json)?\n?", "", content)
-        content = re.sub(r"\n?```$", "", content)
+    content = strip_fence(content)
 
     # Parse the response
     try:
-        data = json.loads(content)
+        review = validate_json(ReviewResponse, content)
         feedback = ReviewFeedback(
             agent="security",
-            approved=data.get("approved", False),
-            concerns=data.get("concerns", []),
-            suggestions=data.get("suggestions", [])
+            approved=review.approved,
+            concerns=review.concerns,
+            suggestions=review.suggestions
         )
-    except (json.JSONDecodeError, ValueError):
+    except ValueError:
         feedback = ReviewFeedback(
             agent="security",
             approved=False,
@@ -64,8 +68,7 @@ def security_node(state: AgentState) -> dict:
             suggestions=["Retry the review"]
         )
 
-    existing_feedback = state.get("review_feedback", [])
-
+    # review_feedback has an appending reducer, so return only this review
     return {
-        "review_feedback": existing_feedback + [feedback]
+        "review_feedback": [feedback]
     }
@@ -1,21 +1,17 @@
 """Software Engineer Planner - creates technical specs for feature implementation using Claude Code."""
-import json
+import asyncio
 import os
 from agent.state import AgentState
+from agent.adapters.linear_adapter import get_async_linear_adapter
 from agent.config.context import get_context_for_prompt
-from agent.tools.claude_code import run_claude_code, extract_json_from_response
+from agent.tools.claude_code import READ_ONLY_TOOLS, run_claude_code, extract_json_from_response
+from agent.utils.prompt import PromptTemplate
 
 
-SOFTWARE_ENGINEER_PLANNER_PROMPT = """You are a Senior Software Architect creating a technical specification for a feature.
+SOFTWARE_ENGINEER_PLANNER_PROMPT = PromptTemplate("""You are a Senior Software Architect creating a technical specification for a feature.
 
 {project_context}
 
-PRD (Product Requirements Document):
-{prd_content}
-
-Additional Context (Comments):
-{comments}
-
 Create a detailed technical specification including:
 
 1. **Component Breakdown**: What modules/components need to be created or modified
@@ -51,26 +47,36 @@ Output your response as JSON (no markdown code blocks):
   "testing_strategy": ["test cases to implement"],
   "estimated_effort": "S|M|L"
 }}
-"""
+""")
 
+# Per-issue part of the prompt; the static instructions above go in the system prompt
+SOFTWARE_ENGINEER_PLANNER_REQUEST = PromptTemplate("""PRD (Product Requirements Document):
+{prd_content}
 
-def software_engineer_planner_node(state: AgentState) -> dict:
+Additional Context (Comments):
+{comments}
+""")
+
+
+async def software_engineer_planner_node(state: AgentState) -> dict:
     """Generate a technical spec for feature implementation using Claude Code."""
     # Fetch fresh issue content from Linear - PRD is in the description after approval
     issue = state.get("current_issue")
     prd_content = ""
+    comments_text = "No comments available."
     
     if issue:
-        from agent.adapters.linear_adapter import LinearAdapter
         try:
-            adapter = LinearAdapter()
-            fresh_issue = adapter.get_issue_by_id(issue.id)
+            adapter = get_async_linear_adapter()
+            # Issue and comments are independent queries - fetch them concurrently
+            fresh_issue, comments = await asyncio.gather(
+                adapter.get_issue_by_id(issue.id),
+                adapter.get_issue_comments(issue.id)
+            )
             if fresh_issue and fresh_issue.description:
                 prd_content = fresh_issue.description
                 print(f"   📄 Fetched fresh PRD from Linear issue {fresh_issue.identifier}")
-            
-            # Fetch comments
-            comments = adapter.get_issue_comments(issue.id)
+
             if comments:
                 comments_text = "\n\n".join(comments)
                 print(f"   💬 Fetched {len(comments)} comments")
@@ -84,20 +90,21 @@ def software_engineer_planner_node(state: AgentState) -> dict:
     if not prd_content:
         prd_content = state.get("task_description", "No PRD available")
 
-    prompt = SOFTWARE_ENGINEER_PLANNER_PROMPT.format(
-        project_context=get_context_for_prompt(),
+    system_prompt = SOFTWARE_ENGINEER_PLANNER_PROMPT.format(project_context=get_context_for_prompt())
+    prompt = SOFTWARE_ENGINEER_PLANNER_REQUEST.format(
         prd_content=prd_content,
         comments=comments_text
     )
 
     # Run Claude Code CLI
     print("   🤖 Running Claude Code for software planning...")
-    result = run_claude_code(
+    result = await run_claude_code(
         prompt=prompt,
         working_dir=state.get("workspace_path", "."),
-        allowed_tools=["Read"],  # Read-only for planning
+        allowed_tools=READ_ONLY_TOOLS,  # Read-only for planning
         output_format="text",
-        timeout=120
+        timeout=120,
+        system_prompt=system_prompt
     )
 
     if result.get("error"):
@@ -105,7 +112,7 @@ def software_engineer_planner_node(state: AgentState) -> dict:
         return {
             "technical_spec": {"error": result["error"]},
             "status": "spec_failed",
-            "messages": state.get("messages", []) + [f"Software planner failed: {result['error']}"]
+            "messages": [f"Software planner failed: {result['error']}"]
         }
 
     # Parse the response
@@ -123,5 +130,5 @@ def software_engineer_planner_node(state: AgentState) -> dict:
     return {
         "technical_spec": tech_spec,
         "status": "spec_ready",
-        "messages": state.get("messages", []) + ["Software Engineer Planner created technical spec"]
+        "messages": ["Software Engineer Planner created technical spec"]
     }
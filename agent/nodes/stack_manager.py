@@ -1,8 +1,8 @@
 from agent.state import AgentState
-from agent.tools.git import create_branch
+from agent.tools.git import create_branch_async
 
 
-def stack_manager_node(state: AgentState) -> dict:
+async def stack_manager_node(state: AgentState) -> dict:
     """Manage the stacked PR workflow."""
     work_items = state.get("work_items", [])
     current_index = state.get("current_work_index", 0)
@@ -14,9 +14,13 @@ def stack_manager_node(state: AgentState) -> dict:
     issue = state.get("current_issue")
 
     if not issue:
-        return {"status": "failed", "messages": state.get("messages", []) + ["No issue for stack"]}
+        return {"status": "failed", "messages": ["No issue for stack"]}
 
-    item_type = current_item.get("type", "CONTRACT") if isinstance(current_item, dict) else current_item.type
+    # Normalize to a dict once so downstream routers can index it directly
+    if not isinstance(current_item, dict):
+        current_item = current_item.model_dump()
+        work_items[current_index] = current_item
+    item_type = current_item.setdefault("type", "CONTRACT")
     
     if item_type == "CONTRACT":
         base_branch = "main"
@@ -26,27 +30,26 @@ def stack_manager_node(state: AgentState) -> dict:
         base_branch = stack_base
 
     branch_name = f"ai/{issue.identifier.lower()}/{item_type.lower()}"
-    success, msg = create_branch(branch_name, base_branch)
+    success, msg = await create_branch_async(branch_name, base_branch)
 
     if not success:
         return {
             "status": "failed",
-            "messages": state.get("messages", []) + [f"Failed to create branch: {msg}"]
+            "messages": [f"Failed to create branch: {msg}"]
         }
 
-    if isinstance(current_item, dict):
-        work_items[current_index]["branch_name"] = branch_name
-        work_items[current_index]["status"] = "in_progress"
-    else:
-        work_items[current_index].branch_name = branch_name
-        work_items[current_index].status = "in_progress"
+    current_item["branch_name"] = branch_name
+    current_item["status"] = "in_progress"
 
     print(f"   📚 Stack Manager: Working on {item_type} → {branch_name}")
 
     return {
         "work_items": work_items,
         "current_work_item": current_item,
+        # Advance the stack; publisher routes back here while items remain
+        "current_work_index": current_index + 1,
+        "remaining_work_items": len(work_items) - current_index - 1,
         "stack_base_branch": stack_base if item_type == "CONTRACT" else state.get("stack_base_branch"),
         "status": f"working_{item_type.lower()}",
-        "messages": state.get("messages", []) + [f"Started {item_type} on {branch_name}"]
+        "messages": [f"Started {item_type} on {branch_name}"]
     }
@@ -1,8 +1,8 @@
 """Sub-Issue Handler - creates sub-issues from technical specs for human review."""
 import os
-import json
+import orjson
 from agent.state import AgentState
-from agent.adapters.linear_adapter import LinearAdapter
+from agent.adapters.linear_adapter import get_linear_adapter
 
 TEAM_KEY = os.getenv("LINEAR_TEAM_KEY", "ENG")
 
@@ -12,86 +12,84 @@ def format_tech_spec_for_review(tech_spec: dict, request_type: str) -> str:
     title = tech_spec.get("title", "Technical Specification")
     effort = tech_spec.get("estimated_effort", "M")
     
+    # One append per logical block; list sections are joined in place
     sections = [f"# {title}\n\n**Estimated Effort:** {effort}\n"]
+    append = sections.append
     
     if request_type == "requires_contract":
         # Contract spec formatting
         contract_name = tech_spec.get("contract_name", "Unknown")
-        sections.append(f"## Contract: `{contract_name}`\n")
+        append(f"## Contract: `{contract_name}`\n")
         
         schema = tech_spec.get("schema", {})
         if schema:
-            sections.append("### Schema\n")
-            for field, details in schema.items():
-                if isinstance(details, dict):
-                    field_type = details.get("type", "unknown")
-                    required = "required" if details.get("required") else "optional"
-                    validation = details.get("validation", "")
-                    sections.append(f"- `{field}` ({field_type}, {required}): {validation}\n")
+            append("### Schema\n" + "".join(
+                f"- `{field}` ({details.get('type', 'unknown')}, "
+                f"{'required' if details.get('required') else 'optional'}): {details.get('validation', '')}\n"
+                for field, details in schema.items()
+                if isinstance(details, dict)
+            ))
         
         if tech_spec.get("sample_valid_payload"):
-            sections.append(f"\n### Sample Valid Payload\n```json\n{json.dumps(tech_spec['sample_valid_payload'], indent=2)}\n```\n")
+            append(f"\n### Sample Valid Payload\n```json\n{orjson.dumps(tech_spec['sample_valid_payload'], option=orjson.OPT_INDENT_2).decode()}\n```\n")
         
         if tech_spec.get("testing_strategy"):
-            sections.append("\n### Testing Strategy\n")
-            for test in tech_spec.get("testing_strategy", []):
-                sections.append(f"- {test}\n")
+            append("\n### Testing Strategy\n" + "".join(f"- {test}\n" for test in tech_spec["testing_strategy"]))
                 
     elif request_type == "infrastructure":
         # Infrastructure spec formatting
         resource_type = tech_spec.get("resource_type", "Unknown")
-        sections.append(f"## Resource Type: `{resource_type}`\n")
+        append(f"## Resource Type: `{resource_type}`\n")
         
         resources = tech_spec.get("resources", [])
         if resources:
-            sections.append("\n### Resources\n")
-            for res in resources:
-                sections.append(f"- **{res.get('name', 'unknown')}** ({res.get('type', 'unknown')}): {res.get('description', '')}\n")
+            append("\n### Resources\n" + "".join(
+                f"- **{res.get('name', 'unknown')}** ({res.get('type', 'unknown')}): {res.get('description', '')}\n"
+                for res in resources
+            ))
         
         env_vars = tech_spec.get("environment_variables", [])
         if env_vars:
-            sections.append("\n### Environment Variables\n")
-            for var in env_vars:
-                req = "required" if var.get("required") else "optional"
-                sections.append(f"- `{var.get('name', 'VAR')}` ({req}): {var.get('description', '')}\n")
+            append("\n### Environment Variables\n" + "".join(
+                f"- `{var.get('name', 'VAR')}` ({'required' if var.get('required') else 'optional'}): {var.get('description', '')}\n"
+                for var in env_vars
+            ))
         
         if tech_spec.get("deployment_steps"):
-            sections.append("\n### Deployment Steps\n")
-            for i, step in enumerate(tech_spec.get("deployment_steps", []), 1):
-                sections.append(f"{i}. {step}\n")
+            append("\n### Deployment Steps\n" + "".join(
+                f"{i}. {step}\n" for i, step in enumerate(tech_spec["deployment_steps"], 1)
+            ))
                 
         if tech_spec.get("rollback_plan"):
-            sections.append(f"\n### Rollback Plan\n{tech_spec['rollback_plan']}\n")
+            append(f"\n### Rollback Plan\n{tech_spec['rollback_plan']}\n")
             
     else:
         # General software spec formatting
         components = tech_spec.get("components", [])
         if components:
-            sections.append("## Components\n")
+            append("## Components\n")
             for comp in components:
-                sections.append(f"### `{comp.get('path', comp.get('name', 'unknown'))}`\n")
-                sections.append(f"**Type:** {comp.get('type', 'module')}\n\n")
-                sections.append(f"{comp.get('description', '')}\n\n")
+                append(
+                    f"### `{comp.get('path', comp.get('name', 'unknown'))}`\n"
+                    f"**Type:** {comp.get('type', 'module')}\n\n"
+                    f"{comp.get('description', '')}\n\n"
+                )
                 if comp.get("public_interface"):
-                    sections.append("**Interface:**\n")
-                    for iface in comp.get("public_interface", []):
-                        sections.append(f"- `{iface}`\n")
-                sections.append("\n")
+                    append("**Interface:**\n" + "".join(f"- `{iface}`\n" for iface in comp["public_interface"]))
+                append("\n")
         
         api_contracts = tech_spec.get("api_contracts", [])
         if api_contracts:
-            sections.append("## API Contracts\n")
-            for api in api_contracts:
-                sections.append(f"### `{api.get('method', 'GET')} {api.get('path', '/unknown')}`\n")
-                sections.append(f"{api.get('description', '')}\n\n")
+            append("## API Contracts\n" + "".join(
+                f"### `{api.get('method', 'GET')} {api.get('path', '/unknown')}`\n{api.get('description', '')}\n\n"
+                for api in api_contracts
+            ))
         
         if tech_spec.get("data_flow"):
-            sections.append(f"## Data Flow\n{tech_spec['data_flow']}\n\n")
+            append(f"## Data Flow\n{tech_spec['data_flow']}\n\n")
         
         if tech_spec.get("testing_strategy"):
-            sections.append("## Testing Strategy\n")
-            for test in tech_spec.get("testing_strategy", []):
-                sections.append(f"- {test}\n")
+            append("## Testing Strategy\n" + "".join(f"- {test}\n" for test in tech_spec["testing_strategy"]))
     
     return "".join(sections)
 
@@ -105,7 +103,7 @@ def sub_issue_handler_node(state: AgentState) -> dict:
     if not tech_spec or not issue:
         return {
             "status": "failed",
-            "messages": state.get("messages", []) + ["No technical spec or issue to create sub-issue from"]
+            "messages": ["No technical spec or issue to create sub-issue from"]
         }
     
     # Format the spec for the sub-issue description
@@ -115,15 +113,17 @@ def sub_issue_handler_node(state: AgentState) -> dict:
     spec_title = tech_spec.get("title", f"Technical Implementation for {issue.identifier}")
     sub_issue_title = f"[Tech Spec] {spec_title}"
     
-    # Create the sub-issue
-    adapter = LinearAdapter()
+    # Create the sub-issue and move the parent to In Progress (waiting for
+    # sub-issues to complete) in a single Linear request
+    adapter = get_linear_adapter()
     try:
-        sub_issue = adapter.create_sub_issue(
+        sub_issue, parent_moved = adapter.create_sub_issue_and_transition_parent(
             parent_id=issue.id,
-            team_key=TEAM_KEY,
+            team_key=issue.team_key or TEAM_KEY,
             title=sub_issue_title,
             description=spec_markdown,
-            state_name="Human: Review ERD"
+            state_name="Human: Review ERD",
+            parent_state_name="AI: In Progress"
         )
         
         if sub_issue:
@@ -131,22 +131,22 @@ def sub_issue_handler_node(state: AgentState) -> dict:
             print(f"      Title: {sub_issue_title}")
             print(f"      State: Human: Review ERD")
             
-            # Transition parent issue to In Progress (waiting for sub-issues to complete)
-            adapter.transition_issue(issue.id, "AI: In Progress")
-            
             return {
                 "status": "awaiting_technical_review",
-                "messages": state.get("messages", []) + [f"Created sub-issue {sub_issue.identifier} for technical review"]
+                "messages": [f"Created sub-issue {sub_issue.identifier} for technical review"]
             }
         else:
+            if parent_moved and issue.state:
+                # The parent update ran in the same request; put it back
+                adapter.transition_issue(issue.id, issue.state, issue.team_key)
             return {
                 "status": "failed",
-                "messages": state.get("messages", []) + ["Failed to create sub-issue"]
+                "messages": ["Failed to create sub-issue"]
             }
             
     except Exception as e:
         print(f"   ⚠️ Error creating sub-issue: {e}")
         return {
             "status": "failed", 
-            "messages": state.get("messages", []) + [f"Error creating sub-issue: {str(e)}"]
+            "messages": [f"Error creating sub-issue: {str(e)}"]
         }
@@ -15,10 +15,9 @@ def supervisor_node(state: AgentState) -> dict:
         return {"status": "approved"}
 
     if iteration >= MAX_ITERATIONS:
-        messages = state.get("messages", [])
         return {
             "status": "failed",
-            "messages": messages + [
+            "messages": [
                 f"Failed to reach approval after {MAX_ITERATIONS} iterations."
             ]
         }
@@ -1,10 +1,21 @@
+import atexit
+import functools
 import os
+from itertools import islice
 import httpx
 from agent.state import AgentState
 
 SENTRY_API = "https://sentry.io/api/0"
 
 
+@functools.cache
+def _get_sentry_client() -> httpx.Client:
+    """Return the process-wide Sentry client so repeated polls reuse the connection."""
+    client = httpx.Client(base_url=SENTRY_API, http2=True, timeout=10.0)
+    atexit.register(client.close)
+    return client
+
+
 def telemetry_node(state: AgentState) -> dict:
     """Monitor production for error spikes after deployment."""
     sentry_token = os.getenv("SENTRY_AUTH_TOKEN")
@@ -15,12 +26,12 @@ def telemetry_node(state: AgentState) -> dict:
         print("   📊 Telemetry: Skipped (Sentry not configured)")
         return {
             "telemetry_status": "skipped",
-            "messages": state.get("messages", []) + ["Sentry not configured"]
+            "messages": ["Sentry not configured"]
         }
 
     try:
-        response = httpx.get(
-            f"{SENTRY_API}/projects/{sentry_org}/{sentry_project}/stats/",
+        response = _get_sentry_client().get(
+            f"/projects/{sentry_org}/{sentry_project}/stats/",
             headers={"Authorization": f"Bearer {sentry_token}"},
             params={"stat": "received", "resolution": "1m", "since": "-5m"}
         )
@@ -29,11 +40,19 @@ def telemetry_node(state: AgentState) -> dict:
             print("   📊 Telemetry: Error fetching stats")
             return {
                 "telemetry_status": "error",
-                "messages": state.get("messages", []) + ["Failed to fetch Sentry stats"]
+                "messages": ["Failed to fetch Sentry stats"]
             }
 
         stats = response.json()
-        recent_errors = sum(point[1] for point in stats[-5:]) if stats else 0
+        if not isinstance(stats, list):
+            print("   📊 Telemetry: Unexpected stats payload")
+            return {
+                "telemetry_status": "error",
+                "messages": ["Unexpected Sentry stats payload"]
+            }
+
+        # Last five one-minute buckets, walked from the end without copying the list
+        recent_errors = sum(point[1] for point in islice(reversed(stats), 5))
 
         ERROR_THRESHOLD = 100
 
@@ -43,19 +62,19 @@ def telemetry_node(state: AgentState) -> dict:
                 "telemetry_status": "error_spike",
                 "error_count": recent_errors,
                 "action": "revert",
-                "messages": state.get("messages", []) + [f"Error spike: {recent_errors} errors in 5min"]
+                "messages": [f"Error spike: {recent_errors} errors in 5min"]
             }
 
         print(f"   📊 Telemetry: ✅ Healthy ({recent_errors} errors)")
         return {
             "telemetry_status": "healthy",
             "error_count": recent_errors,
-            "messages": state.get("messages", []) + [f"Production healthy: {recent_errors} errors"]
+            "messages": [f"Production healthy: {recent_errors} errors"]
         }
 
     except Exception as e:
         print(f"   📊 Telemetry: Error - {e}")
         return {
             "telemetry_status": "error",
-            "messages": state.get("messages", []) + [f"Telemetry error: {e}"]
+            "messages": [f"Telemetry error: {e}"]
         }
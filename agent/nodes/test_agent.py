@@ -1,7 +1,11 @@
 import os
 import subprocess
+import tempfile
 from agent.state import AgentState
 
+# Characters of Playwright output kept in state
+OUTPUT_EXCERPT_CHARS = 1000
+
 
 def test_agent_node(state: AgentState) -> dict:
     """Run E2E tests against the ephemeral environment."""
@@ -10,48 +14,59 @@ def test_agent_node(state: AgentState) -> dict:
         print("   🧪 Tests: Skipped (no preview URL)")
         return {
             "test_status": "skipped",
-            "messages": state.get("messages", []) + ["No preview URL for testing"]
+            "messages": ["No preview URL for testing"]
         }
 
     try:
-        result = subprocess.run(
-            ["npx", "playwright", "test", "--reporter=json"],
-            env={**os.environ, "BASE_URL": preview_url},
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
+        # Spool output to temp files and read back only the excerpt we keep,
+        # so a chatty JSON report is never held in memory whole
+        env = os.environ.copy()
+        env["BASE_URL"] = preview_url
+
+        with tempfile.TemporaryFile("w+") as stdout, tempfile.TemporaryFile("w+") as stderr:
+            result = subprocess.run(
+                ["npx", "playwright", "test", "--reporter=json"],
+                env=env,
+                stdout=stdout,
+                stderr=stderr,
+                timeout=300
+            )
+            stdout.seek(0)
+            test_output = stdout.read(OUTPUT_EXCERPT_CHARS)
+            if result.returncode != 0 and len(test_output) < OUTPUT_EXCERPT_CHARS:
+                stderr.seek(0)
+                test_output += stderr.read(OUTPUT_EXCERPT_CHARS - len(test_output))
 
         if result.returncode == 0:
             print("   🧪 Tests: ✅ All passed")
             return {
                 "test_status": "passed",
-                "test_output": result.stdout[:1000],
-                "messages": state.get("messages", []) + ["All E2E tests passed"]
+                "test_output": test_output,
+                "messages": ["All E2E tests passed"]
             }
 
         print("   🧪 Tests: ❌ Failed")
         return {
             "test_status": "failed",
-            "test_output": (result.stdout + result.stderr)[:1000],
-            "messages": state.get("messages", []) + ["E2E tests failed"]
+            "test_output": test_output,
+            "messages": ["E2E tests failed"]
         }
 
     except subprocess.TimeoutExpired:
         print("   🧪 Tests: ⏰ Timeout")
         return {
             "test_status": "timeout",
-            "messages": state.get("messages", []) + ["E2E tests timed out"]
+            "messages": ["E2E tests timed out"]
         }
     except FileNotFoundError:
         print("   🧪 Tests: Skipped (playwright not found)")
         return {
             "test_status": "skipped",
-            "messages": state.get("messages", []) + ["Playwright not installed"]
+            "messages": ["Playwright not installed"]
         }
     except Exception as e:
         print(f"   🧪 Tests: Error - {e}")
         return {
             "test_status": "error",
-            "messages": state.get("messages", []) + [f"Test error: {e}"]
+            "messages": [f"Test error: {e}"]
         }
@@ -1,16 +1,35 @@
 """Poll Linear for issues and process them through the appropriate workflow."""
+import fcntl
+import functools
+import logging
 import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import RotatingFileHandler
+from typing import NamedTuple
 import time
 import os
 from dotenv import load_dotenv
-from agent.graph import app
-from agent.state import AgentState
-from agent.adapters.linear_adapter import LinearAdapter
+from agent.graph import run_graph_on_thread
+from agent.state import new_agent_state
+from agent.adapters.linear_adapter import (
+    COMPLETED_STATES,
+    LinearAdapter,
+    get_linear_adapter,
+)
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 POLL_INTERVAL = 30  # seconds
+AGENT_CONCURRENCY = int(os.getenv("AGENT_CONCURRENCY", "4"))  # issues processed in parallel
+# Held by whichever pipeline (poller or webhook server) is running
+LOCK_FILE = os.getenv("POLL_LOCK_FILE", "/tmp/software-factory-poll.lock")
 TEAM_KEY = os.getenv("LINEAR_TEAM_KEY", "ENG")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE")  # rotated; logs go to stderr when unset
 
 # Workflow columns that trigger AI action
 ACTION_COLUMNS = [
@@ -19,100 +38,134 @@ ACTION_COLUMNS = [
     "AI: Implement",     # Engineer implements sub-issue code
 ]
 
+# GitHub PR links in issue comments; owner/repo stop at whitespace so links
+# embedded in markdown prose don't swallow the surrounding text
+PR_URL_PATTERN = re.compile(r'https://github\.com/[^/\s]+/[^/\s]+/pull/\d+')
 
-def determine_workflow_phase(issue, state_name: str) -> dict:
-    """Determine workflow phase based on state and issue properties."""
-    is_sub = issue.parent_id is not None
+# Issue ID -> PR URL for issues in Human: Review PR, so each issue's
+# comments are fetched once rather than every tick
+_pr_urls: dict[str, str] = {}
+
+# Graph runs outlive a tick, so the pool persists across ticks; issues it has
+# queued or running are skipped when the next tick sees them still in a column
+_executor = ThreadPoolExecutor(max_workers=AGENT_CONCURRENCY, thread_name_prefix="issue")
+_in_flight: set[str] = set()
+_in_flight_lock = threading.Lock()
+
+# Columns watched for completion: merged PRs and finished parent issues
+REVIEW_PR_STATE = "Human: Review PR"
+IN_PROGRESS_STATE = "AI: In Progress"
+
+# Sub-issue states shown as done in the progress count (Canceled is not)
+DONE_STATES = frozenset({"Done", "Completed", "Closed"})
+
+# Phases whose issues move to In Progress as soon as they are picked up
+AUTO_TRANSITION_PHASES = frozenset({"erd", "implement"})
+
+# Final graph statuses reported back to the issue as a failure
+FAILED_STATUSES = frozenset({"failed", "error"})
+
+# Everything one tick reads, fetched in a single request
+POLLED_STATES = ACTION_COLUMNS + [REVIEW_PR_STATE, IN_PROGRESS_STATE]
+
+
+def configure_logging():
+    """Route pipeline logs through one handler at LOG_LEVEL.
     
-    if state_name == "AI: Create PRD":
-        # PRD phase - Product Manager creates PRD
-        return {
-            "phase": "prd",
-            "is_sub_issue": False,
-            "skip_pm": False,
-        }
-    elif state_name == "AI: Create ERD":
-        # ERD phase - Engineer creates technical sub-issues
-        # PRD should already exist in description
-        return {
-            "phase": "erd",
-            "is_sub_issue": False,
-            "skip_pm": True,  # Skip PM, go to classifier -> planner
-        }
-    elif state_name == "AI: Implement":
-        # Implementation phase - only sub-issues should be here
-        return {
-            "phase": "implement",
-            "is_sub_issue": True,  # Force sub-issue behavior
-            "skip_pm": True,
-        }
+    Per-issue detail is logged at DEBUG and transitions at INFO, so the
+    default level keeps the concurrent workers' output short.
+    """
+    if LOG_FILE:
+        handler = RotatingFileHandler(LOG_FILE, maxBytes=10 * 1024 * 1024, backupCount=5, delay=True)
     else:
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s"))
+    logging.basicConfig(level=LOG_LEVEL, handlers=[handler])
+
+
+def acquire_single_instance_lock():
+    """Exit if another poller or webhook server already holds LOCK_FILE.
+    
+    Two pipelines on the same team would pick up every issue twice. The lock
+    lasts as long as the returned file handle stays open.
+    """
+    handle = open(LOCK_FILE, "a+")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.seek(0)
+        logger.error(f"Another pipeline is already running (pid {handle.read().strip() or '?'}, lock {LOCK_FILE})")
+        sys.exit(1)
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    return handle
+
+
+class PhaseInfo(NamedTuple):
+    """How an issue in a given column enters the workflow."""
+    phase: str
+    is_sub_issue: bool
+    skip_pm: bool
+
+
+# Column -> phase; built once since every issue on every tick looks it up
+_PHASE_TABLE = {
+    # PRD phase - Product Manager creates PRD
+    "AI: Create PRD": PhaseInfo("prd", is_sub_issue=False, skip_pm=False),
+    # ERD phase - PRD should already be in the description, so skip PM
+    # and go to classifier -> planner
+    "AI: Create ERD": PhaseInfo("erd", is_sub_issue=False, skip_pm=True),
+    # Implementation phase - only sub-issues should be here
+    "AI: Implement": PhaseInfo("implement", is_sub_issue=True, skip_pm=True),
+}
+
+
+def determine_workflow_phase(issue, state_name: str) -> PhaseInfo:
+    """Determine workflow phase based on state and issue properties."""
+    phase_info = _PHASE_TABLE.get(state_name)
+    if phase_info is None:
         # Unknown state
-        return {
-            "phase": "unknown",
-            "is_sub_issue": is_sub,
-            "skip_pm": is_sub,
-        }
+        is_sub = issue.parent_id is not None
+        phase_info = PhaseInfo("unknown", is_sub_issue=is_sub, skip_pm=is_sub)
+    return phase_info
 
 
-def process_issue(issue, adapter: LinearAdapter, phase_info: dict):
+def process_issue(issue, adapter: LinearAdapter, phase_info: PhaseInfo):
     """Process a single issue through the workflow."""
-    print(f"\n📋 Processing: {issue.identifier} - {issue.title}")
-    print(f"   Phase: {phase_info['phase']}")
+    logger.info(f"{issue.identifier}: processing '{issue.title}' (phase {phase_info.phase})")
     
-    if phase_info["is_sub_issue"]:
-        print(f"   📎 Sub-issue of parent: {issue.parent_id}")
+    if phase_info.is_sub_issue:
+        logger.debug(f"{issue.identifier}: sub-issue of parent {issue.parent_id}")
     
     # Don't transition to In Progress at start - let nodes handle their own transitions
     # Only ERD and Implement phases should auto-transition
-    if phase_info["phase"] in ["erd", "implement"]:
-        adapter.transition_issue(issue.id, "AI: In Progress")
+    if phase_info.phase in AUTO_TRANSITION_PHASES:
+        adapter.transition_issue(issue.id, "AI: In Progress", issue.team_key)
     
     # Build initial state
-    initial_state: AgentState = {
-        "task_description": f"{issue.title}\n\n{issue.description or ''}",
-        "current_contract": None,
-        "review_feedback": [],
-        "iteration_count": 0,
-        "status": "drafting",
-        "messages": [],
-        "current_issue": issue,
-        "pr_url": None,
-        "request_type": None,
-        "work_items": None,
-        "current_work_index": None,
-        "current_work_item": None,
-        "stack_base_branch": None,
-        "ephemeral_status": None,
-        "preview_url": None,
-        "ephemeral_db_url": None,
-        "test_status": None,
-        "test_output": None,
-        "telemetry_status": None,
-        "error_count": None,
-        "action": None,
-        "revert_status": None,
-        "reverted_commit": None,
-        "is_sub_issue": phase_info["is_sub_issue"],
-        "parent_issue": None,
-        "technical_spec": None,
-        "prd": None,
-        "prd_feedback": None,
-        "workflow_phase": phase_info["phase"],
-    }
+    initial_state = new_agent_state(
+        task_description=f"{issue.title}\n\n{issue.description or ''}",
+        current_issue=issue,
+        is_sub_issue=phase_info.is_sub_issue,
+        workflow_phase=phase_info.phase,
+    )
 
     try:
-        result = app.invoke(initial_state)
+        # LLM nodes are async, so the graph must be driven with ainvoke; the
+        # worker thread's loop is reused so pooled Claude Code sessions carry over
+        result = run_graph_on_thread(initial_state)
 
         status = result.get("status", "unknown")
         if status == "published":
-            print(f"   ✅ PR created: {result.get('pr_url')}")
+            logger.info(f"{issue.identifier}: PR created: {result.get('pr_url')}")
             # Publisher node handles transition to Human: Review PR
         elif status == "awaiting_prd_review":
-            print(f"   ✅ PRD created, moved to Human: Review PRD")
+            logger.info(f"{issue.identifier}: PRD created, moved to Human: Review PRD")
         elif status == "awaiting_technical_review":
-            print(f"   ✅ ERD created, sub-issues in Human: Review ERD")
-        elif status in ["failed", "error"]:
+            logger.info(f"{issue.identifier}: ERD created, sub-issues in Human: Review ERD")
+        elif status in FAILED_STATUSES:
             messages = result.get('messages', [])
             feedback = result.get('review_feedback', [])
             
@@ -126,158 +179,210 @@ def process_issue(issue, adapter: LinearAdapter, phase_info: dict):
             
             error_summary = "; ".join(error_details) if error_details else "No details"
             
-            adapter.transition_issue(issue.id, "AI: Failed")
-            adapter.add_comment(issue.id, f"❌ Failed: {error_summary[:500]}")
-            print(f"   ❌ Failed: {status}")
-            print(f"      Details: {error_summary}")
+            adapter.transition_issue_with_comment(
+                issue.id, "AI: Failed", f"❌ Failed: {error_summary[:500]}", issue.team_key
+            )
+            logger.error(f"{issue.identifier}: failed with status {status}: {error_summary}")
         else:
-            print(f"   ℹ️  Completed with status: {status}")
+            logger.info(f"{issue.identifier}: completed with status {status}")
 
     except Exception as e:
-        import traceback
-        adapter.transition_issue(issue.id, "AI: Failed")
-        adapter.add_comment(issue.id, f"❌ Error: {str(e)}")
-        print(f"   ❌ Error: {e}")
-        traceback.print_exc()
+        adapter.transition_issue_with_comment(issue.id, "AI: Failed", f"❌ Error: {str(e)}", issue.team_key)
+        logger.exception(f"{issue.identifier}: error: {e}")
 
 
 def extract_pr_url_from_comments(comments: list) -> str | None:
     """Extract GitHub PR URL from issue comments."""
-    pr_pattern = r'https://github\.com/[^/]+/[^/]+/pull/\d+'
-    
     for comment in comments:
-        match = re.search(pr_pattern, comment)
+        match = PR_URL_PATTERN.search(comment)
         if match:
             return match.group(0)
     
     return None
 
 
-def check_pr_merges_and_complete(adapter: LinearAdapter):
-    """Check issues in Human: Review PR for merged PRs and complete them."""
-    print("\n🔍 Checking for merged PRs...")
+def check_pr_merges_and_complete(adapter: LinearAdapter, pr_issues: list | None = None) -> set:
+    """Check issues in Human: Review PR for merged PRs and complete them.
+    
+    Args:
+        pr_issues: Issues already fetched for the column (queried if omitted)
+    
+    Returns:
+        IDs of parent issues completed along the way
+    """
+    logger.debug("Checking for merged PRs")
+    completed_parents = set()
     
     # Try to import GitHub adapter - skip if not configured
     try:
-        from agent.adapters.github_adapter import GitHubAdapter
-        github = GitHubAdapter()
+        from agent.adapters.github_adapter import get_github_adapter
+        github = get_github_adapter()
     except ValueError as e:
-        print(f"   ⚠️ GitHub integration not configured: {e}")
-        return
+        logger.warning(f"GitHub integration not configured: {e}")
+        return completed_parents
     except Exception as e:
-        print(f"   ⚠️ GitHub adapter error: {e}")
-        return
+        logger.warning(f"GitHub adapter error: {e}")
+        return completed_parents
     
     # Get issues in Human: Review PR
-    pr_issues = adapter.get_issues_in_state(TEAM_KEY, "Human: Review PR")
+    if pr_issues is None:
+        pr_issues = adapter.get_issues_in_state(TEAM_KEY, REVIEW_PR_STATE)
+    
+    # Forget issues that have left the column since the last tick
+    in_review = {issue.id for issue in pr_issues}
+    for issue_id in _pr_urls.keys() - in_review:
+        del _pr_urls[issue_id]
     
     if not pr_issues:
-        print("   No issues awaiting PR review.")
-        return
+        logger.debug("No issues awaiting PR review")
+        return completed_parents
     
-    print(f"   Found {len(pr_issues)} issue(s) in Human: Review PR")
+    logger.debug(f"Found {len(pr_issues)} issue(s) in Human: Review PR")
     
     for issue in pr_issues:
-        # Get comments to find PR URL
-        comments = adapter.get_issue_comments(issue.id)
-        pr_url = extract_pr_url_from_comments(comments)
+        pr_url = _pr_urls.get(issue.id)
+        if not pr_url:
+            # Get comments to find PR URL
+            comments = adapter.get_issue_comments(issue.id)
+            pr_url = extract_pr_url_from_comments(comments)
         
         if not pr_url:
-            print(f"   ⚠️ {issue.identifier}: No PR URL found in comments")
+            logger.warning(f"{issue.identifier}: no PR URL found in comments")
             continue
+        _pr_urls[issue.id] = pr_url
         
         # Check if PR is merged
         if github.is_pr_merged(pr_url):
-            print(f"   ✅ {issue.identifier}: PR merged! Moving to Done")
-            adapter.transition_issue(issue.id, "Done")
-            adapter.add_comment(issue.id, "🎉 PR merged! Issue completed.")
+            logger.info(f"{issue.identifier}: PR merged, moving to Done")
+            _pr_urls.pop(issue.id, None)
+            adapter.transition_issue_with_comment(issue.id, "Done", "🎉 PR merged! Issue completed.", issue.team_key)
             
             # Check if parent should be completed
-            if issue.parent_id:
-                check_parent_completion(adapter, issue.parent_id)
+            if issue.parent_id and check_parent_completion(adapter, issue.parent_id):
+                completed_parents.add(issue.parent_id)
         else:
-            print(f"   ⏳ {issue.identifier}: PR not yet merged")
+            logger.debug(f"{issue.identifier}: PR not yet merged")
+    
+    return completed_parents
 
 
-def check_parent_completion(adapter: LinearAdapter, parent_id: str):
-    """Check if all sub-issues are complete and complete the parent if so."""
+def check_parent_completion(adapter: LinearAdapter, parent_id: str) -> bool:
+    """Check if all sub-issues are complete and complete the parent if so.
+    
+    Returns:
+        True if the parent was moved to Done
+    """
     parent = adapter.get_issue_by_id(parent_id)
     if not parent:
-        print(f"   ⚠️ Could not find parent issue: {parent_id}")
-        return
+        logger.warning(f"Could not find parent issue: {parent_id}")
+        return False
     
     # Check if all sub-issues are done
     if adapter.all_sub_issues_completed(parent_id):
-        print(f"   🎉 All sub-issues complete! Moving parent {parent.identifier} to Done")
-        adapter.transition_issue(parent_id, "Done")
-        adapter.add_comment(parent_id, "🎉 All sub-issues completed! Parent issue marked as done.")
+        logger.info(f"{parent.identifier}: all sub-issues complete, moving parent to Done")
+        adapter.transition_issue_with_comment(
+            parent_id, "Done", "🎉 All sub-issues completed! Parent issue marked as done.", parent.team_key
+        )
+        return True
+    return False
 
 
-def check_in_progress_parents(adapter: LinearAdapter):
-    """Check parent issues in AI: In Progress to see if they should be completed."""
-    print("\n🔍 Checking parent issues for completion...")
+def check_in_progress_parents(adapter: LinearAdapter, in_progress: list | None = None):
+    """Check parent issues in AI: In Progress to see if they should be completed.
+    
+    Args:
+        in_progress: Issues already fetched for the column (queried if omitted)
+    """
+    logger.debug("Checking parent issues for completion")
     
     # Get parent issues in AI: In Progress
-    in_progress = adapter.get_issues_in_state(TEAM_KEY, "AI: In Progress")
+    if in_progress is None:
+        in_progress = adapter.get_issues_in_state(TEAM_KEY, IN_PROGRESS_STATE)
     
     # Filter to only parent issues (no parent_id)
     parent_issues = [i for i in in_progress if i.parent_id is None]
     
     if not parent_issues:
-        print("   No parent issues in progress.")
+        logger.debug("No parent issues in progress")
         return
     
-    print(f"   Found {len(parent_issues)} parent issue(s) in AI: In Progress")
+    logger.debug(f"Found {len(parent_issues)} parent issue(s) in AI: In Progress")
+    
+    # One request for every parent's sub-issues instead of one or two per parent
+    subs_by_parent = adapter.get_sub_issues_bulk([parent.id for parent in parent_issues])
     
     for parent in parent_issues:
-        if adapter.all_sub_issues_completed(parent.id):
-            print(f"   🎉 All sub-issues complete! Moving {parent.identifier} to Done")
-            adapter.transition_issue(parent.id, "Done")
-            adapter.add_comment(parent.id, "🎉 All sub-issues completed! Parent issue marked as done.")
+        sub_issues = subs_by_parent[parent.id]
+        if sub_issues and all(s.state in COMPLETED_STATES for s in sub_issues):
+            logger.info(f"{parent.identifier}: all sub-issues complete, moving to Done")
+            adapter.transition_issue_with_comment(
+                parent.id, "Done", "🎉 All sub-issues completed! Parent issue marked as done.", parent.team_key
+            )
         else:
-            sub_issues = adapter.get_sub_issues(parent.id)
-            done_count = sum(1 for s in sub_issues if s.state in {"Done", "Completed", "Closed"})
-            print(f"   ⏳ {parent.identifier}: {done_count}/{len(sub_issues)} sub-issues complete")
+            done_count = sum(1 for s in sub_issues if s.state in DONE_STATES)
+            logger.debug(f"{parent.identifier}: {done_count}/{len(sub_issues)} sub-issues complete")
+
+
+def _finish_issue(issue, future):
+    """Release an issue for later ticks once its graph run ends."""
+    with _in_flight_lock:
+        _in_flight.discard(issue.id)
+    error = future.exception()
+    if error is not None:
+        logger.error(f"{issue.identifier}: {error}")
 
 
 def poll_and_process():
     """Poll Linear for issues in all action columns and process them."""
-    adapter = LinearAdapter()
+    adapter = get_linear_adapter()
+    by_state = adapter.get_issues_in_states(TEAM_KEY, POLLED_STATES)
     
-    # Phase 1-3: Process AI action columns
+    # Phase 1-3: Hand new issues in the AI action columns to the worker pool
     for column in ACTION_COLUMNS:
-        print(f"\n🔄 Checking '{column}' column...")
-        issues = adapter.get_issues_in_state(TEAM_KEY, column)
-        
-        if not issues:
-            print("   No issues found.")
-            continue
-        
-        print(f"   Found {len(issues)} issue(s)")
+        issues = by_state[column]
+        logger.debug(f"'{column}': {len(issues)} issue(s)")
         
         for issue in issues:
-            phase_info = determine_workflow_phase(issue, column)
-            process_issue(issue, adapter, phase_info)
+            with _in_flight_lock:
+                if issue.id in _in_flight:
+                    logger.debug(f"{issue.identifier}: still being processed")
+                    continue
+                _in_flight.add(issue.id)
+            future = _executor.submit(
+                process_issue, issue, adapter, determine_workflow_phase(issue, column)
+            )
+            future.add_done_callback(functools.partial(_finish_issue, issue))
     
     # Phase 4: Check for merged PRs and complete issues
-    check_pr_merges_and_complete(adapter)
+    completed = check_pr_merges_and_complete(adapter, by_state[REVIEW_PR_STATE])
     
-    # Phase 5: Check parent issues for auto-completion
-    check_in_progress_parents(adapter)
+    # Phase 5: Check parent issues for auto-completion (the snapshot predates
+    # phase 4, so skip parents it just completed)
+    check_in_progress_parents(
+        adapter,
+        [i for i in by_state[IN_PROGRESS_STATE] if i.id not in completed]
+    )
 
 
-def main():
-    """Main polling loop."""
+def main(once: bool = False):
+    """Main polling loop; with once, run a single cycle and wait for its issues."""
     print("🏭 Software Factory - Workflow Pipeline")
     print("=" * 50)
     print(f"Monitoring columns: {', '.join(ACTION_COLUMNS)}")
     print("Also checking: Human: Review PR (for merged PRs)")
+    configure_logging()
+    _lock = acquire_single_instance_lock()  # held for the life of the process
+
+    if once:
+        poll_and_process()
+        _executor.shutdown(wait=True)
+        return
 
     while True:
         poll_and_process()
-        print(f"\n⏳ Sleeping for {POLL_INTERVAL}s...")
+        logger.debug(f"Sleeping for {POLL_INTERVAL}s")
         time.sleep(POLL_INTERVAL)
 
 
 if __name__ == "__main__":
-    main()
+    main(once="--once" in sys.argv[1:])
@@ -1,5 +1,7 @@
-from typing import TypedDict, Literal, List, Optional, Any
-from pydantic import BaseModel
+import operator
+from types import MappingProxyType
+from typing import Annotated, TypedDict, Literal, List, Optional, Any
+from pydantic import BaseModel, ConfigDict
 
 
 class ContractSchema(BaseModel):
@@ -29,14 +31,72 @@ class WorkItem(BaseModel):
     status: Literal["pending", "in_progress", "completed", "failed"] = "pending"
 
 
+class ReviewResponse(BaseModel):
+    """Structured output schema for the review agents."""
+    approved: bool
+    concerns: List[str]
+    suggestions: List[str]
+
+
+class ClassifierResponse(BaseModel):
+    """Structured output schema for the request classifier."""
+    classification: Literal["requires_contract", "infrastructure", "general"]
+
+
+class UserStory(BaseModel):
+    """A PRD user story; legacy nested fields are kept as extras."""
+    model_config = ConfigDict(extra="allow")
+    id: str = ""
+    as_a: str = "user"
+    i_want: str = "feature"
+    so_that: str = "benefit"
+
+
+class AcceptanceCriterion(BaseModel):
+    """A Gherkin scenario linked to a user story."""
+    model_config = ConfigDict(extra="allow")
+    id: str = ""
+    story_id: str = "General"
+    scenario: str = "Unnamed scenario"
+    given: str = "N/A"
+    when: str = "N/A"
+    then: str = "N/A"
+
+
+class PRDResponse(BaseModel):
+    """Output schema for the Product Manager; parsed and validated in one pass."""
+    model_config = ConfigDict(extra="allow")
+    title: str = "Untitled"
+    problem_statement: str = "N/A"
+    user_stories: List[UserStory] = []
+    acceptance_criteria: List[AcceptanceCriterion] = []
+    edge_cases: List[str] = []
+    out_of_scope: List[str] = []
+    success_metrics: List[str] = []
+    priority: str = "P1"
+    estimated_complexity: str = "M"
+
+
+def merge_review_feedback(existing: Optional[list], update: Optional[list]) -> list:
+    """Reducer for review_feedback so parallel reviewers can append concurrently.
+    
+    Reviewers return a one-element list that is appended; implementation nodes
+    return an empty list to clear feedback before a new review cycle.
+    """
+    if not update:
+        return []
+    return (existing or []) + update
+
+
 class AgentState(TypedDict):
     """Shared state across all agents in the graph."""
     task_description: str
     current_contract: Optional[str]
-    review_feedback: List[ReviewFeedback]
+    current_artifact: Optional[dict]  # current_contract parsed, set by the implementation nodes
+    review_feedback: Annotated[List[ReviewFeedback], merge_review_feedback]
     iteration_count: int
     status: Literal["drafting", "reviewing", "approved", "failed", "published", "architected", "stack_complete", "working_contract", "working_backend", "working_frontend", "prd_ready", "prd_approved", "spec_ready", "awaiting_technical_review", "awaiting_prd_review"]
-    messages: List[str]
+    messages: Annotated[List[str], operator.add]  # nodes return only new messages
     # Phase 2: Linear integration
     current_issue: Optional[Any]
     pr_url: Optional[str]
@@ -48,7 +108,8 @@ class AgentState(TypedDict):
     # Phase 3: Stacked PRs
     work_items: Optional[List[Any]]
     current_work_index: Optional[int]
-    current_work_item: Optional[Any]
+    remaining_work_items: Optional[int]  # items left after the current one, set by stack_manager
+    current_work_item: Optional[dict]  # WorkItem fields as a dict, normalized by stack_manager
     stack_base_branch: Optional[str]
     # Phase 3: Ephemeral environments
     ephemeral_status: Optional[str]
@@ -71,3 +132,47 @@ class AgentState(TypedDict):
     technical_spec: Optional[Any]
     # Workflow phase (prd, erd, implement)
     workflow_phase: Optional[Literal["prd", "erd", "implement"]]
+
+
+# Starting values for every AgentState key; read-only so callers can't alter it
+_DEFAULT_STATE = MappingProxyType({
+    "task_description": "",
+    "current_contract": None,
+    "current_artifact": None,
+    "review_feedback": [],
+    "iteration_count": 0,
+    "status": "drafting",
+    "messages": [],
+    "current_issue": None,
+    "pr_url": None,
+    "prd": None,
+    "prd_feedback": None,
+    "request_type": None,
+    "work_items": None,
+    "current_work_index": None,
+    "remaining_work_items": None,
+    "current_work_item": None,
+    "stack_base_branch": None,
+    "ephemeral_status": None,
+    "preview_url": None,
+    "ephemeral_db_url": None,
+    "test_status": None,
+    "test_output": None,
+    "telemetry_status": None,
+    "error_count": None,
+    "action": None,
+    "revert_status": None,
+    "reverted_commit": None,
+    "is_sub_issue": None,
+    "parent_issue": None,
+    "technical_spec": None,
+    "workflow_phase": None,
+})
+
+
+def new_agent_state(**overrides) -> AgentState:
+    """Build the initial state for a graph run from the defaults plus overrides.
+    
+    The list fields get fresh lists so runs never share a mutable default.
+    """
+    return {**_DEFAULT_STATE, "review_feedback": [], "messages": [], **overrides}
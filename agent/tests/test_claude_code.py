@@ -0,0 +1,112 @@
+"""Tests for the Claude Code session pool, with the CLI process stubbed out."""
+import asyncio
+import sys
+import threading
+import pytest
+from agent import graph
+from agent.tools import claude_code
+from agent.tools.claude_code import ClaudeSession, ClaudeSessionPool, run_claude_code
+
+
+class FakeSession:
+    def __init__(self):
+        self.call_count = 0
+        self.lock = asyncio.Lock()
+        self.alive = True
+        self.stderr = ""
+
+    async def send(self, prompt: str, timeout: int) -> dict:
+        self.call_count += 1
+        return {"type": "result", "result": prompt, "num_turns": 1}
+
+    def kill(self):
+        self.alive = False
+
+
+def _fake_spawn(spawned: list):
+    async def spawn(*args):
+        await asyncio.sleep(0.01)  # let a parallel branch reach the lookup
+        spawned.append(FakeSession())
+        return spawned[-1]
+    return spawn
+
+
+def test_parallel_runs_share_one_spawned_session():
+    pool = ClaudeSessionPool(max_calls=5)
+    spawned = []
+    pool._spawn = _fake_spawn(spawned)
+
+    async def run_both():
+        return await asyncio.gather(
+            pool.run("a", ".", ("Read",), None, 10),
+            pool.run("b", ".", ("Read",), None, 10),
+        )
+
+    results = asyncio.run(run_both())
+    assert [r["result"] for r in results] == ["a", "b"]
+    assert len(spawned) == 1
+    assert spawned[0].call_count == 2
+
+
+def test_worker_thread_reuses_sessions_across_graph_runs(monkeypatch):
+    monkeypatch.setattr(claude_code, "SESSION_MAX_CALLS", 5)
+    spawned = []
+
+    class PlannerOnlyApp:
+        async def ainvoke(self, state):
+            response = await run_claude_code(state["prompt"])
+            return {"result": response["result"]}
+
+    monkeypatch.setattr(graph, "get_app", PlannerOnlyApp)
+    results = []
+
+    def worker():
+        claude_code._session_pool()._spawn = _fake_spawn(spawned)
+        try:
+            for prompt in ("first issue", "second issue"):
+                results.append(graph.run_graph_on_thread({"prompt": prompt})["result"])
+        finally:
+            claude_code._session_pool()._sessions.clear()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert results == ["first issue", "second issue"]
+    assert len(spawned) == 1
+    assert spawned[0].call_count == 2
+
+
+def test_session_path_honours_output_format(monkeypatch):
+    monkeypatch.setattr(claude_code, "SESSION_MAX_CALLS", 5)
+
+    async def both_formats():
+        claude_code._session_pool()._spawn = _fake_spawn([])
+        try:
+            return await run_claude_code("hi"), await run_claude_code("hi", output_format="json")
+        finally:
+            claude_code._session_pool()._sessions.clear()
+
+    text, as_json = asyncio.run(both_formats())
+    assert text == {"result": "hi", "error": None}
+    assert as_json["metadata"] == {"num_turns": 1}
+
+
+def test_session_exit_reports_stderr():
+    script = "import sys; sys.stdin.readline(); sys.stderr.write('Invalid API key\\n')"
+
+    async def send_to_dying_cli():
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", script,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        session = ClaudeSession(proc)
+        try:
+            await session.send("hi", timeout=10)
+        finally:
+            await proc.wait()
+
+    with pytest.raises(EOFError, match="Invalid API key"):
+        asyncio.run(send_to_dying_cli())
@@ -0,0 +1,60 @@
+"""Tests for the async git runner's per-repo serialization."""
+import asyncio
+import pytest
+from agent.tools import git
+from agent.tools.git import run_git_async
+
+
+@pytest.fixture
+def fake_git(monkeypatch):
+    """Replace the git subprocess with one that takes 20 ms; return the peak in-flight counts."""
+    in_flight: dict = {}
+    peaks = {"total": 0}
+
+    class FakeProc:
+        returncode = 0
+
+        def __init__(self, cwd):
+            self.cwd = cwd
+
+        async def communicate(self):
+            in_flight[self.cwd] = in_flight.get(self.cwd, 0) + 1
+            peaks[self.cwd] = max(peaks.get(self.cwd, 0), in_flight[self.cwd])
+            peaks["total"] = max(peaks["total"], sum(in_flight.values()))
+            await asyncio.sleep(0.02)
+            in_flight[self.cwd] -= 1
+            return b"ok", None
+
+    async def create_subprocess_exec(*cmd, cwd, **kwargs):
+        return FakeProc(cwd)
+
+    monkeypatch.setattr(git.asyncio, "create_subprocess_exec", create_subprocess_exec)
+    return peaks
+
+
+def test_same_repo_commands_run_one_at_a_time(fake_git):
+    async def both():
+        return await asyncio.gather(
+            run_git_async("add", "-A", cwd="/repo/a"),
+            run_git_async("commit", "-m", "x", cwd="/repo/a"),
+        )
+
+    assert asyncio.run(both()) == [(True, "ok"), (True, "ok")]
+    assert fake_git["/repo/a"] == 1
+
+
+def test_different_repos_run_concurrently(fake_git):
+    async def both():
+        await asyncio.gather(
+            run_git_async("fetch", cwd="/repo/a"),
+            run_git_async("fetch", cwd="/repo/b"),
+        )
+
+    asyncio.run(both())
+    assert fake_git["total"] == 2
+
+
+def test_run_git_async_reports_failure(tmp_path):
+    success, output = asyncio.run(run_git_async("rev-parse", "HEAD", cwd=str(tmp_path)))
+    assert not success
+    assert "not a git repository" in output
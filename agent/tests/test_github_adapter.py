@@ -0,0 +1,22 @@
+"""Tests for the sync GitHubAdapter wrappers around AsyncGitHubAdapter."""
+import asyncio
+import pytest
+from agent.adapters.github_adapter import GitHubAdapter
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    monkeypatch.setenv("GITHUB_API_KEY", "test-key")
+    return GitHubAdapter()
+
+
+def test_are_prs_merged_refuses_running_loop(adapter):
+    async def _call():
+        adapter.are_prs_merged(["https://github.com/o/r/pull/1"])
+
+    with pytest.raises(RuntimeError, match="AsyncGitHubAdapter"):
+        asyncio.run(_call())
+
+
+def test_are_prs_merged_empty_list_from_sync_code(adapter):
+    assert adapter.are_prs_merged([]) == {}
@@ -0,0 +1,29 @@
+"""Tests for the graph's routing functions."""
+from agent.graph import route_from_publisher, route_to_reviewers
+from agent.nodes.reviewers import reviewers_for
+from agent.state import new_agent_state
+
+
+def test_route_from_publisher_continues_stack():
+    assert route_from_publisher(new_agent_state(remaining_work_items=2)) == "stack_manager"
+
+
+def test_route_from_publisher_deploys_when_stack_done():
+    assert route_from_publisher(new_agent_state(remaining_work_items=0)) == "deployer"
+
+
+def test_route_from_publisher_deploys_without_stack():
+    assert route_from_publisher(new_agent_state()) == "deployer"
+
+
+def test_reviewers_follow_work_item_type():
+    assert reviewers_for(new_agent_state(current_work_item={"type": "BACKEND"})) == ["compliance", "security"]
+    assert reviewers_for(new_agent_state(current_work_item={"type": "CONTRACT"})) == ["security"]
+    assert reviewers_for(new_agent_state()) == ["security"]
+
+
+def test_combined_review_replaces_fan_out(monkeypatch):
+    state = new_agent_state(current_work_item={"type": "FRONTEND"})
+    assert route_to_reviewers(state) == ["design", "security"]
+    monkeypatch.setenv("COMBINED_REVIEW", "1")
+    assert route_to_reviewers(state) == ["combined_review"]
@@ -0,0 +1,73 @@
+"""Tests for parsing JSON out of LLM responses."""
+import orjson
+import pytest
+from agent.state import ReviewResponse
+from agent.utils.json_parse import parse_first_json, parse_json_artifact, strip_fence, validate_json
+
+
+@pytest.mark.parametrize("content, expected", [
+    ('{"a": 1}', '{"a": 1}'),
+    ('```json\n{"a": 1}\n```', '{"a": 1}'),
+    ('```\n{"a": 1}\n```', '{"a": 1}'),
+    ('```json{"a": 1}```', '{"a": 1}'),
+    ('```json\n{"a": 1}', '{"a": 1}'),
+])
+def test_strip_fence(content, expected):
+    assert strip_fence(content) == expected
+
+
+def test_parse_clean_document():
+    assert parse_first_json('{"approved": true}') == {"approved": True}
+
+
+def test_parse_ignores_trailing_prose():
+    assert parse_first_json('{"a": 1}\nHope this helps!') == {"a": 1}
+
+
+def test_parse_fenced_block_after_prose():
+    content = 'Here is the contract:\n```json\n{"name": "User"}\n```\nLet me know.'
+    assert parse_first_json(content) == {"name": "User"}
+
+
+def test_parse_object_after_prose_without_fence():
+    assert parse_first_json('Sure! {"a": [1, 2]} done') == {"a": [1, 2]}
+
+
+def test_parse_repairs_malformed_json():
+    assert parse_first_json('{"a": 1, "b": [1, 2,],}') == {"a": 1, "b": [1, 2]}
+
+
+def test_parse_repairs_truncated_json():
+    assert parse_first_json('{"a": 1, "b": "unfinish') == {"a": 1, "b": "unfinish"}
+
+
+def test_parse_returns_none_for_prose():
+    assert parse_first_json("I could not produce a contract.") is None
+    assert parse_first_json("plain {braces") is None
+
+
+def test_validate_json_recovers_from_prose():
+    content = 'Review:\n```json\n{"approved": false, "concerns": ["x"], "suggestions": []}\n```'
+    review = validate_json(ReviewResponse, content)
+    assert review.approved is False
+    assert review.concerns == ["x"]
+
+
+def test_validate_json_raises_without_object():
+    with pytest.raises(ValueError):
+        validate_json(ReviewResponse, "no json here")
+
+
+def test_parse_json_artifact_keeps_clean_text():
+    content = '{"name": "User", "fields": {}}'
+    assert parse_json_artifact(content) == ({"name": "User", "fields": {}}, content)
+
+
+def test_parse_json_artifact_reserializes_repaired_json():
+    artifact, text = parse_json_artifact('Here it is: {"name": "User", "fields": {},}')
+    assert artifact == {"name": "User", "fields": {}}
+    assert orjson.loads(text) == artifact
+
+
+def test_parse_json_artifact_without_json():
+    assert parse_json_artifact("no contract") == (None, "no contract")
@@ -0,0 +1,111 @@
+"""Tests for LinearAdapter pagination, against a stubbed GraphQL transport."""
+import asyncio
+import pytest
+from agent.adapters import linear_adapter
+from agent.adapters.linear_adapter import LinearAdapter
+
+
+def _node(issue_id: str, state: str = "AI: Create PRD", parent_id: str | None = None) -> dict:
+    return {
+        "id": issue_id,
+        "identifier": issue_id.upper(),
+        "title": issue_id,
+        "description": "",
+        "state": {"name": state},
+        "priority": 0,
+        "parent": {"id": parent_id} if parent_id else None,
+    }
+
+
+def _page(nodes: list, cursor: str | None = None) -> dict:
+    return {"data": {"issues": {
+        "nodes": nodes,
+        "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+    }}}
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    monkeypatch.setenv("LINEAR_API_KEY", "test-key")
+    adapter = LinearAdapter()
+    yield adapter
+    adapter.close()
+
+
+def _stub_pages(adapter, pages: list) -> list:
+    """Serve pages in order from adapter._query; returns the variables of each call."""
+    calls = []
+
+    def query(_query, variables=None):
+        calls.append(variables)
+        return pages[len(calls) - 1]
+
+    adapter._query = query
+    return calls
+
+
+def test_get_issues_in_states_follows_cursor(adapter):
+    calls = _stub_pages(adapter, [
+        _page([_node("a"), _node("b", "Human: Review PR")], cursor="c1"),
+        _page([_node("c")]),
+    ])
+    by_state = adapter.get_issues_in_states("ENG", ["AI: Create PRD", "Human: Review PR", "AI: Implement"])
+
+    assert [i.id for i in by_state["AI: Create PRD"]] == ["a", "c"]
+    assert [i.id for i in by_state["Human: Review PR"]] == ["b"]
+    assert by_state["AI: Implement"] == []
+    assert [call["after"] for call in calls] == [None, "c1"]
+
+
+def test_graphql_errors_are_not_read_as_empty(adapter):
+    _stub_pages(adapter, [_page([_node("a")], cursor="c1"), {"errors": [{"message": "rate limited"}]}])
+    with pytest.raises(ValueError):
+        adapter.get_issues_in_states("ENG", ["AI: Create PRD"])
+
+
+def test_get_sub_issues_bulk_reads_every_page(adapter):
+    _stub_pages(adapter, [
+        _page([_node("s1", "Done", parent_id="p1")], cursor="c1"),
+        _page([_node("s2", "AI: Implement", parent_id="p1"), _node("s3", "Done", parent_id="p2")]),
+    ])
+    by_parent = adapter.get_sub_issues_bulk(["p1", "p2", "p3"])
+
+    assert [i.id for i in by_parent["p1"]] == ["s1", "s2"]
+    assert [i.id for i in by_parent["p2"]] == ["s3"]
+    assert by_parent["p3"] == []
+
+
+def _team_states(*states) -> dict:
+    return {"data": {"workflowStates": {"nodes": [{"id": i, "name": n} for i, n in states]}}}
+
+
+def test_state_ids_are_cached_per_team(adapter, monkeypatch):
+    cache = {}
+    monkeypatch.setattr(linear_adapter, "STATE_ID_CACHE", cache)
+    monkeypatch.setattr(adapter, "_state_id_cache", cache)
+    teams = {"ENG": _team_states(("eng-done", "Done")), "OPS": _team_states(("ops-done", "Done"))}
+    queried = []
+
+    def query(_query, variables=None):
+        queried.append(variables["teamKey"])
+        return teams[variables["teamKey"]]
+
+    adapter._query = query
+    assert adapter._get_state_id("Done", "ENG") == "eng-done"
+    assert adapter._get_state_id("Done", "OPS") == "ops-done"
+    assert adapter._get_state_id("Done", "ENG") == "eng-done"
+    assert queried == ["ENG", "OPS"]
+
+
+def test_async_adapter_is_closed_with_its_loop(monkeypatch, capsys):
+    monkeypatch.setenv("LINEAR_API_KEY", "test-key")
+
+    async def run_once():
+        adapter = linear_adapter.get_async_linear_adapter()
+        await linear_adapter.close_async_linear_adapter()
+        return adapter
+
+    first, second = asyncio.run(run_once()), asyncio.run(run_once())
+    assert first is not second
+    assert first._client.is_closed and second._client.is_closed
+    assert "never closed" not in capsys.readouterr().out
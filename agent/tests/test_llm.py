@@ -0,0 +1,96 @@
+"""Tests for the per-loop Gemini client and the process-wide request cap."""
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from agent.config import llm as llm_config
+from agent.config.llm import close_llm_clients, gated_ainvoke, get_llm, per_loop
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """Answers every generateContent call with the text "ok"."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        body = json.dumps({
+            "candidates": [{"content": {"role": "model", "parts": [{"text": "ok"}]}, "finishReason": "STOP"}]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGeminiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("GOOGLE_GEMINI_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    yield
+    server.shutdown()
+
+
+def test_per_loop_caches_within_a_loop_only():
+    calls = []
+
+    @per_loop
+    def make(name):
+        calls.append(name)
+        return object()
+
+    async def twice():
+        return make("a"), make("a")
+
+    first, second = asyncio.run(twice()), asyncio.run(twice())
+    assert first[0] is first[1]
+    assert second[0] is not first[0]
+    assert calls == ["a", "a"]
+
+
+def test_llm_works_across_event_loops(fake_gemini):
+    # Poll workers call asyncio.run once per issue; each run needs a live client
+    async def run_once():
+        try:
+            return (await gated_ainvoke(get_llm(), "hi")).content
+        finally:
+            await close_llm_clients()
+
+    assert [asyncio.run(run_once()) for _ in range(3)] == ["ok", "ok", "ok"]
+
+
+def test_gemini_cap_holds_across_threads(monkeypatch):
+    # Poll and webhook workers each run their own loop; the cap is process-wide
+    monkeypatch.setattr(llm_config, "_GEMINI_SLOTS", threading.BoundedSemaphore(2))
+    monkeypatch.setattr(llm_config, "GEMINI_SLOT_POLL", 0.001)
+    counter_lock = threading.Lock()
+    in_flight, peak = [0], [0]
+
+    class SlowLLM:
+        async def ainvoke(self, prompt):
+            with counter_lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.02)
+            with counter_lock:
+                in_flight[0] -= 1
+            return prompt
+
+    async def fan_out():
+        return await asyncio.gather(*(gated_ainvoke(SlowLLM(), i) for i in range(4)))
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(asyncio.run(fan_out()))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [[0, 1, 2, 3], [0, 1, 2, 3]]
+    assert peak[0] == 2
@@ -0,0 +1,35 @@
+"""Tests for the AgentState reducers and defaults."""
+from agent.state import ReviewFeedback, merge_review_feedback, new_agent_state
+
+
+def _review(agent: str, approved: bool = True) -> ReviewFeedback:
+    return ReviewFeedback(agent=agent, approved=approved, concerns=[], suggestions=[])
+
+
+def test_merge_review_feedback_appends_reviews():
+    security, design = _review("security"), _review("design", approved=False)
+    assert merge_review_feedback([security], [design]) == [security, design]
+
+
+def test_merge_review_feedback_starts_from_none():
+    security = _review("security")
+    assert merge_review_feedback(None, [security]) == [security]
+
+
+def test_merge_review_feedback_empty_update_clears():
+    assert merge_review_feedback([_review("security")], []) == []
+    assert merge_review_feedback([_review("security")], None) == []
+
+
+def test_new_agent_state_gets_fresh_lists():
+    first, second = new_agent_state(), new_agent_state()
+    first["messages"].append("hello")
+    assert second["messages"] == []
+    assert first["review_feedback"] is not second["review_feedback"]
+
+
+def test_new_agent_state_applies_overrides():
+    state = new_agent_state(task_description="Add login", workflow_phase="prd")
+    assert state["task_description"] == "Add login"
+    assert state["workflow_phase"] == "prd"
+    assert state["status"] == "drafting"
@@ -0,0 +1,104 @@
+"""Tests for webhook verification and payload filtering."""
+import asyncio
+import hashlib
+import hmac
+import time
+import pytest
+from agent import webhook_server
+
+
+@pytest.fixture
+def secret(monkeypatch):
+    monkeypatch.setattr(webhook_server, "WEBHOOK_SECRET", "s3cret")
+    return "s3cret"
+
+
+def _sign(secret: str, body: bytes) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def _payload(state: str = "AI: Create PRD", **overrides) -> dict:
+    payload = {
+        "type": "Issue",
+        "action": "update",
+        "webhookTimestamp": int(time.time() * 1000),
+        "data": {"id": "issue-1", "state": {"name": state}},
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_verify_signature_accepts_valid(secret):
+    body = b'{"type": "Issue"}'
+    assert webhook_server.verify_signature(body, _sign(secret, body))
+
+
+def test_verify_signature_rejects_tampered_body(secret):
+    assert not webhook_server.verify_signature(b'{"type": "Other"}', _sign(secret, b'{"type": "Issue"}'))
+
+
+def test_verify_signature_rejects_missing_header(secret):
+    assert not webhook_server.verify_signature(b"{}", None)
+
+
+def test_issue_in_action_column_is_queued():
+    assert webhook_server.issue_id_from_payload(_payload()) == "issue-1"
+
+
+def test_issue_outside_action_columns_is_ignored():
+    assert webhook_server.issue_id_from_payload(_payload(state="Backlog")) is None
+
+
+def test_non_issue_events_are_ignored():
+    assert webhook_server.issue_id_from_payload(_payload(type="Comment")) is None
+    assert webhook_server.issue_id_from_payload(_payload(action="remove")) is None
+
+
+def test_stale_delivery_is_ignored():
+    stale = int((time.time() - 2 * webhook_server.MAX_TIMESTAMP_SKEW) * 1000)
+    assert webhook_server.issue_id_from_payload(_payload(webhookTimestamp=stale)) is None
+
+
+def test_unsigned_deliveries_rejected_without_secret(monkeypatch):
+    monkeypatch.setattr(webhook_server, "WEBHOOK_SECRET", None)
+    monkeypatch.setattr(webhook_server, "WEBHOOK_INSECURE", False)
+    assert not webhook_server.verify_signature(b"{}", None)
+
+
+def test_insecure_opt_out_accepts_unsigned(monkeypatch):
+    monkeypatch.setattr(webhook_server, "WEBHOOK_SECRET", None)
+    monkeypatch.setattr(webhook_server, "WEBHOOK_INSECURE", True)
+    assert webhook_server.verify_signature(b"{}", None)
+
+
+def test_server_refuses_to_start_without_secret(monkeypatch):
+    monkeypatch.setattr(webhook_server, "WEBHOOK_SECRET", None)
+    monkeypatch.setattr(webhook_server, "WEBHOOK_INSECURE", False)
+    monkeypatch.setattr(webhook_server, "configure_logging", lambda: None)
+    monkeypatch.setattr(webhook_server, "acquire_single_instance_lock", lambda: None)
+    monkeypatch.setattr(webhook_server, "serve", pytest.fail)
+    with pytest.raises(SystemExit):
+        webhook_server.main()
+
+
+def test_serve_survives_failed_reconcile(monkeypatch):
+    calls = []
+
+    def flaky_reconcile(enqueue):
+        calls.append(enqueue)
+        if len(calls) == 1:
+            raise ValueError("Linear GraphQL error")
+
+    monkeypatch.setattr(webhook_server, "WEBHOOK_PORT", 0)
+    monkeypatch.setattr(webhook_server, "RECONCILE_INTERVAL", 0)
+    monkeypatch.setattr(webhook_server, "reconcile", flaky_reconcile)
+
+    async def run():
+        task = asyncio.create_task(webhook_server.serve())
+        while len(calls) < 2 and not task.done():
+            await asyncio.sleep(0.01)
+        assert not task.done()
+        task.cancel()
+
+    asyncio.run(run())
+    assert len(calls) >= 2
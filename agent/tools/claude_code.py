@@ -1,85 +1,398 @@
 """Claude Code CLI wrapper for headless mode execution."""
 
-import subprocess
-import json
+import asyncio
+import atexit
+import collections
+import functools
+import orjson
 import logging
+import os
+import threading
+import weakref
 from typing import Optional
 
+from agent.utils.json_parse import parse_first_json
+
 logger = logging.getLogger(__name__)
 
+# Reuse a long-lived CLI process for up to this many prompts (0 = spawn per call)
+SESSION_MAX_CALLS = int(os.getenv("CLAUDE_SESSION_MAX_CALLS", "0"))
+
+# Tool sets used by the nodes; tuples so the joined CLI argument can be cached
+READ_ONLY_TOOLS = ("Read",)
+IMPLEMENTATION_TOOLS = ("Read", "Edit", "Write", "Bash")
+CORRECTION_TOOLS = ("Read", "Edit", "Bash")
+
+# stream-json puts a whole result on one line; asyncio's default 64 KiB line limit is too small
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+# The CLI writes each event with "type" first; user events carry tool results
+# (whole file contents) that nothing here reads, so they are skipped undecoded
+USER_EVENT_PREFIX = b'{"type":"user"'
+
+# A run's `timeout` is an idle limit between stream-json events, so long but
+# healthy runs keep going; this caps the total time of a single run
+MAX_RUNTIME = int(os.getenv("CLAUDE_MAX_RUNTIME", "1800"))
+
+# Lines of a session's stderr kept for error reports; the rest is dropped so a
+# long-lived process can't fill its pipe
+SESSION_STDERR_LINES = 50
+
+
+class IdleTimeout(asyncio.TimeoutError):
+    """No stream-json event arrived within the idle timeout."""
+
+    def __init__(self, partial: str = ""):
+        super().__init__(partial)
+        self.partial = partial  # text of the last assistant turn, if any
+
+
+@functools.lru_cache(maxsize=32)
+def _tools_arg(allowed_tools: tuple[str, ...]) -> str:
+    """Comma-joined --allowedTools value, built once per tool set."""
+    return ",".join(allowed_tools)
+
+
+class ClaudeSession:
+    """A stream-json Claude Code process that accepts one prompt per stdin line."""
+
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+        self.call_count = 0
+        self.lock = asyncio.Lock()
+        self._stderr_tail = collections.deque(maxlen=SESSION_STDERR_LINES)
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+
+    async def _drain_stderr(self):
+        while line := await self.proc.stderr.readline():
+            self._stderr_tail.append(line.decode(errors="replace"))
+
+    @property
+    def stderr(self) -> str:
+        """The last SESSION_STDERR_LINES lines the CLI wrote to stderr."""
+        return "".join(self._stderr_tail)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    def kill(self):
+        try:
+            self.proc.kill()
+        except (ProcessLookupError, RuntimeError):
+            pass
+
+    async def send(self, prompt: str, timeout: int) -> dict:
+        """Send one user turn and wait for its result message."""
+        self.call_count += 1
+        self.proc.stdin.write(orjson.dumps({
+            "type": "user",
+            "message": {"role": "user", "content": prompt}
+        }) + b"\n")
+        await self.proc.stdin.drain()
+        return await asyncio.wait_for(self._read_result(timeout), timeout=MAX_RUNTIME)
+
+    async def _read_result(self, idle_timeout: float) -> dict:
+        while True:
+            try:
+                line = await asyncio.wait_for(self.proc.stdout.readline(), idle_timeout)
+            except asyncio.TimeoutError:
+                raise IdleTimeout() from None
+            if not line:
+                # The process is exiting; give stderr a moment to reach EOF
+                await asyncio.wait({self._stderr_task}, timeout=1)
+                stderr = self.stderr
+                if stderr:
+                    logger.error(f"Claude Code stderr: {stderr}")
+                raise EOFError(stderr or "Claude Code session closed")
+            if line.startswith(USER_EVENT_PREFIX):
+                continue
+            try:
+                message = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            if message.get("type") == "result":
+                return message
+
+
+class ClaudeSessionPool:
+    """Claude Code sessions keyed by workspace, tools and system prompt.
+    
+    Sessions are recycled after max_calls prompts so conversation history
+    does not pile up across unrelated issues.
+    """
+
+    def __init__(self, max_calls: int):
+        self.max_calls = max_calls
+        self._sessions: dict[tuple, ClaudeSession] = {}
+        self._loop = None
+        self._spawn_lock: asyncio.Lock | None = None  # created per loop in run()
+
+    async def _spawn(self, working_dir: str, allowed_tools: tuple[str, ...], system_prompt: str | None) -> ClaudeSession:
+        cmd = [
+            "claude",
+            "-p",
+            "--input-format", "stream-json",
+            "--output-format", "stream-json",
+            "--verbose",
+            "--allowedTools", _tools_arg(allowed_tools)
+        ]
+        if system_prompt:
+            cmd += ["--append-system-prompt", system_prompt]
+        logger.info(f"Starting Claude Code session in {working_dir}")
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=working_dir,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT
+        )
+        return ClaudeSession(proc)
+
+    async def run(
+        self,
+        prompt: str,
+        working_dir: str,
+        allowed_tools: tuple[str, ...],
+        system_prompt: str | None,
+        timeout: int
+    ) -> dict:
+        """Send prompt to the session for this key and return its result event."""
+        # Subprocess pipes are bound to the loop that created them
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self.close()
+            self._loop = loop
+            self._spawn_lock = asyncio.Lock()
+
+        key = (os.path.abspath(working_dir), allowed_tools, system_prompt)
+        # Parallel branches with the same key would otherwise both spawn, and
+        # the overwritten process would be orphaned where close() can't see it
+        async with self._spawn_lock:
+            session = self._sessions.get(key)
+            if session is None or not session.alive or session.call_count >= self.max_calls:
+                if session is not None:
+                    session.kill()
+                session = await self._spawn(working_dir, allowed_tools, system_prompt)
+                self._sessions[key] = session
+
+        async with session.lock:
+            try:
+                message = await session.send(prompt, timeout)
+            except (asyncio.TimeoutError, EOFError, ConnectionError):
+                # A session in an unknown state can't take the next prompt
+                session.kill()
+                self._sessions.pop(key, None)
+                raise
+
+        if message.get("is_error") and session.stderr:
+            logger.error(f"Claude Code stderr: {session.stderr}")
+        return message
 
-def run_claude_code(
+    def close(self):
+        for session in self._sessions.values():
+            session.kill()
+        self._sessions.clear()
+
+    async def aclose(self):
+        """Kill and reap every session while their event loop is still running."""
+        sessions = list(self._sessions.values())
+        self.close()
+        for session in sessions:
+            await session.proc.wait()
+            await session._stderr_task
+
+
+# One pool per thread, since each worker thread drives its own event loop.
+# Poll and webhook workers keep that loop across issues (run_graph_on_thread),
+# so a session outlives the graph run that started it.
+_local = threading.local()
+_all_pools: "weakref.WeakSet[ClaudeSessionPool]" = weakref.WeakSet()
+
+
+def _session_pool() -> ClaudeSessionPool:
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = ClaudeSessionPool(SESSION_MAX_CALLS)
+        _all_pools.add(pool)
+    return pool
+
+
+@atexit.register
+def _close_all_pools():
+    for pool in list(_all_pools):
+        pool.close()
+
+
+async def close_claude_sessions():
+    """Shut down the running loop's pooled Claude Code sessions before the loop closes.
+    
+    Pools are found by loop rather than by thread, so exit cleanup on the main
+    thread can close a finished worker thread's sessions.
+    """
+    loop = asyncio.get_running_loop()
+    for pool in list(_all_pools):
+        if pool._loop is loop:
+            await pool.aclose()
+
+
+def _assistant_text(event: dict) -> str:
+    content = (event.get("message") or {}).get("content") or []
+    return "".join(
+        block.get("text", "") for block in content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+async def _read_stream_json(
+    stream: asyncio.StreamReader,
+    idle_timeout: float | None = None
+) -> tuple[dict | None, str]:
+    """Decode stream-json events line by line; return the result event and any non-JSON output.
+    
+    Only the result event and stray non-JSON lines are kept, not the whole
+    transcript.
+    
+    Raises:
+        IdleTimeout: If no line arrives within idle_timeout seconds.
+    """
+    result_event = None
+    plain = []
+    partial = ""
+    while True:
+        try:
+            line = await asyncio.wait_for(stream.readline(), idle_timeout)
+        except asyncio.TimeoutError:
+            raise IdleTimeout(partial) from None
+        if not line:
+            break
+        if line.startswith(USER_EVENT_PREFIX):
+            continue  # tool results echoed back; often the bulk of the stream
+        try:
+            event = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            plain.append(line.decode())
+            continue
+        if not isinstance(event, dict):
+            continue
+        if event.get("type") == "result":
+            result_event = event
+        elif event.get("type") == "assistant":
+            logger.debug("Claude Code: assistant turn received")
+            partial = _assistant_text(event) or partial
+    return result_event, "".join(plain)
+
+
+async def run_claude_code(
     prompt: str,
     working_dir: str = ".",
-    allowed_tools: list[str] | None = None,
+    allowed_tools: tuple[str, ...] | list[str] = READ_ONLY_TOOLS,
     output_format: str = "text",
-    timeout: int = 300
+    timeout: int = 300,
+    system_prompt: str | None = None
 ) -> dict:
     """Execute Claude Code CLI in headless mode.
     
+    The CLI runs as an asyncio subprocess, so other graph branches keep
+    running while it works.
+    
     Args:
         prompt: The task prompt to send to Claude Code.
         working_dir: Directory to run the command in.
-        allowed_tools: List of tools to auto-approve (Read, Edit, Write, Bash).
-        output_format: Output format - 'json', 'text', or 'stream-json'.
-        timeout: Command timeout in seconds.
+        allowed_tools: Tools to auto-approve (Read, Edit, Write, Bash); defaults to READ_ONLY_TOOLS.
+        output_format: 'json' adds the result event's metadata; 'text' returns
+            the result text only. Output is always read as stream-json.
+        timeout: Seconds without any output before the run is killed; runs
+            are also capped at CLAUDE_MAX_RUNTIME overall.
+        system_prompt: Static instructions appended to Claude Code's system
+            prompt. Keeping them out of the per-call prompt lets repeated
+            calls share a cacheable prompt prefix.
         
     Returns:
-        dict with 'result', 'error', and optionally 'metadata' keys.
+        dict with 'result', 'error', and optionally 'metadata' keys; a killed
+        run may carry the last assistant text under 'partial'.
     """
-    if allowed_tools is None:
-        allowed_tools = ["Read"]
+    allowed_tools = tuple(allowed_tools)
     
+    if SESSION_MAX_CALLS > 0:
+        try:
+            message = await _session_pool().run(prompt, working_dir, allowed_tools, system_prompt, timeout)
+            if message.get("is_error"):
+                return {"result": None, "error": message.get("result") or "Claude Code session error"}
+            return _result_response(message, message.get("result"), output_format)
+        except IdleTimeout:
+            logger.error(f"Claude Code session produced no output for {timeout}s")
+            return _timeout_response(f"No output for {timeout} seconds", "")
+        except asyncio.TimeoutError:
+            logger.error(f"Claude Code session exceeded the {MAX_RUNTIME}s run limit")
+            return _timeout_response(f"Command exceeded {MAX_RUNTIME} seconds", "")
+        except FileNotFoundError:
+            logger.error("Claude Code CLI not found - ensure it's installed")
+            return {"result": None, "error": "Claude Code CLI not found. Install with: npm install -g @anthropic-ai/claude-code"}
+        except Exception as e:
+            logger.error(f"Claude Code session error: {e}")
+            return {"result": None, "error": str(e)}
+    
+    # Every format is read as stream-json events, line by line as they arrive
     cmd = [
         "claude",
         "-p", prompt,
-        "--allowedTools", ",".join(allowed_tools),
-        "--output-format", output_format
+        "--allowedTools", _tools_arg(allowed_tools),
+        "--output-format", "stream-json",
+        "--verbose"  # print mode requires --verbose for stream-json
     ]
+    if system_prompt:
+        cmd += ["--append-system-prompt", system_prompt]
     
     logger.info(f"Running Claude Code CLI: {' '.join(cmd[:3])}...")
     
     try:
-        result = subprocess.run(
-            cmd,
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
             cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=timeout
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT
         )
+        try:
+            (result_event, stdout), stderr_bytes = await asyncio.wait_for(
+                asyncio.gather(_read_stream_json(proc.stdout, timeout), proc.stderr.read()),
+                MAX_RUNTIME
+            )
+            await proc.wait()
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        stderr = stderr_bytes.decode()
         
-        if result.returncode != 0:
-            logger.warning(f"Claude Code exited with code {result.returncode}")
-            if result.stderr:
-                logger.error(f"Claude Code stderr: {result.stderr}")
-            if result.stdout:
-                logger.error(f"Claude Code stdout: {result.stdout}")
+        if proc.returncode != 0:
+            logger.warning(f"Claude Code exited with code {proc.returncode}")
+            if stderr:
+                logger.error(f"Claude Code stderr: {stderr}")
+            if stdout:
+                logger.error(f"Claude Code stdout: {stdout}")
             return {
                 "result": None,
-                "error": result.stderr or f"Exit code: {result.returncode}",
-                "stdout": result.stdout
+                "error": stderr or f"Exit code: {proc.returncode}",
+                "stdout": stdout
             }
         
-        if output_format == "json":
-            try:
-                parsed = json.loads(result.stdout)
-                return {
-                    "result": parsed.get("result", result.stdout),
-                    "error": None,
-                    "metadata": parsed.get("metadata", {})
-                }
-            except json.JSONDecodeError:
-                # Claude Code may return plain text even with --output-format json
-                return {
-                    "result": result.stdout,
-                    "error": None
-                }
-        
-        return {"result": result.stdout, "error": result.stderr if result.stderr else None}
+        if result_event is None:
+            # Claude Code may return plain text even with a JSON output format
+            return {
+                "result": stdout,
+                "error": None
+            }
+        return _result_response(result_event, result_event.get("result", stdout), output_format, stderr)
         
-    except subprocess.TimeoutExpired:
-        logger.error(f"Claude Code timed out after {timeout}s")
-        return {"result": None, "error": f"Command timed out after {timeout} seconds"}
+    except IdleTimeout as e:
+        logger.error(f"Claude Code produced no output for {timeout}s")
+        return _timeout_response(f"No output for {timeout} seconds", e.partial)
+    except asyncio.TimeoutError:
+        logger.error(f"Claude Code exceeded the {MAX_RUNTIME}s run limit")
+        return _timeout_response(f"Command exceeded {MAX_RUNTIME} seconds", "")
     except FileNotFoundError:
         logger.error("Claude Code CLI not found - ensure it's installed")
         return {"result": None, "error": "Claude Code CLI not found. Install with: npm install -g @anthropic-ai/claude-code"}
@@ -88,24 +401,27 @@ def run_claude_code(
         return {"result": None, "error": str(e)}
 
 
+def _result_response(result_event: dict, result, output_format: str, stderr: str = "") -> dict:
+    """Successful run result, with the event's metadata when output_format is 'json'."""
+    if output_format == "json":
+        return {
+            "result": result,
+            "error": None,
+            "metadata": {k: v for k, v in result_event.items() if k not in ("type", "result")}
+        }
+    return {"result": result, "error": stderr if stderr else None}
+
+
+def _timeout_response(error: str, partial: str) -> dict:
+    """Error result for a killed run, keeping the last assistant text if any."""
+    response = {"result": None, "error": error}
+    if partial:
+        response["partial"] = partial
+    return response
+
+
 def extract_json_from_response(response: str) -> dict | None:
     """Extract JSON from a Claude Code response that may contain markdown."""
-    import re
-    
-    # Try to parse directly first
-    try:
-        return json.loads(response.strip())
-    except json.JSONDecodeError:
-        pass
-    
-    # Try to extract from markdown code block
-    if "```" in response:
-        # Find JSON code blocks
-        json_match = re.search(r'```(?:json)?\s*\n([\s\S]*?)\n```', response)
-        if json_match:
-            try:
-                return json.loads(json_match.group(1).strip())
-            except json.JSONDecodeError:
-                pass
-    
-    return None
+    # raw_decode picks the first object out of fences or surrounding prose
+    parsed = parse_first_json(response)
+    return parsed if isinstance(parsed, dict) else None
@@ -1,16 +1,16 @@
 import os
 import subprocess
+import time
 from typing import Tuple, Optional
+import httpx
 
+VERCEL_API_URL = "https://api.vercel.com"
+DEPLOY_POLL_INTERVAL = 5  # seconds between readiness checks
+DEPLOY_TIMEOUT = 600  # seconds to wait for the build, like `vercel deploy` does
 
-def deploy_preview(branch: str) -> Tuple[bool, Optional[str]]:
-    """Deploy a preview environment for the branch."""
-    vercel_token = os.getenv("VERCEL_TOKEN")
-    vercel_project = os.getenv("VERCEL_PROJECT")
-
-    if not vercel_token or not vercel_project:
-        return False, "VERCEL_TOKEN or VERCEL_PROJECT not set"
 
+def _deploy_preview_cli(branch: str, vercel_token: str) -> Tuple[bool, Optional[str]]:
+    """Deploy the working directory with the Vercel CLI."""
     try:
         result = subprocess.run(
             [
@@ -33,6 +33,59 @@ def deploy_preview(branch: str) -> Tuple[bool, Optional[str]]:
         return False, str(e)
 
 
+def deploy_preview(branch: str) -> Tuple[bool, Optional[str]]:
+    """Deploy a preview environment for the branch.
+    
+    The branch is already pushed by the publisher, so with GITHUB_REPO set the
+    deployment is created from it through the Vercel REST API and polled until
+    ready. That skips the Vercel CLI's Node startup and local upload. Without
+    GITHUB_REPO the CLI deploys the working directory instead.
+    """
+    vercel_token = os.getenv("VERCEL_TOKEN")
+    vercel_project = os.getenv("VERCEL_PROJECT")
+
+    if not vercel_token or not vercel_project:
+        return False, "VERCEL_TOKEN or VERCEL_PROJECT not set"
+
+    owner, _, repo = os.getenv("GITHUB_REPO", "").partition("/")
+    if not repo:
+        return _deploy_preview_cli(branch, vercel_token)
+
+    params = {"teamId": os.getenv("VERCEL_TEAM_ID")} if os.getenv("VERCEL_TEAM_ID") else None
+    try:
+        with httpx.Client(
+            base_url=VERCEL_API_URL,
+            headers={"Authorization": f"Bearer {vercel_token}"},
+            params=params,
+            timeout=30.0
+        ) as client:
+            response = client.post("/v13/deployments", json={
+                "name": vercel_project,
+                "project": vercel_project,
+                "gitSource": {"type": "github", "org": owner, "repo": repo, "ref": branch},
+                "meta": {"branch": branch}
+            })
+            if response.status_code not in (200, 201):
+                return False, response.text
+
+            deployment = response.json()
+            deadline = time.monotonic() + DEPLOY_TIMEOUT
+            while deployment.get("readyState") not in ("READY", "ERROR", "CANCELED"):
+                if time.monotonic() > deadline:
+                    return False, f"Deployment {deployment.get('id')} not ready after {DEPLOY_TIMEOUT}s"
+                time.sleep(DEPLOY_POLL_INTERVAL)
+                response = client.get(f"/v13/deployments/{deployment['id']}")
+                response.raise_for_status()
+                deployment = response.json()
+
+            if deployment["readyState"] != "READY":
+                return False, f"Deployment {deployment.get('id')} finished as {deployment['readyState']}"
+            return True, f"https://{deployment['url']}"
+
+    except Exception as e:
+        return False, str(e)
+
+
 def provision_ephemeral_db(branch: str) -> Tuple[bool, Optional[str]]:
     """Provision an ephemeral database branch using Neon."""
     neon_api_key = os.getenv("NEON_API_KEY")
@@ -42,8 +95,6 @@ def provision_ephemeral_db(branch: str) -> Tuple[bool, Optional[str]]:
         return False, "NEON_API_KEY not set"
 
     try:
-        import httpx
-
         response = httpx.post(
             f"https://console.neon.tech/api/v2/projects/{neon_project}/branches",
             headers={"Authorization": f"Bearer {neon_api_key}"},
@@ -1,6 +1,13 @@
+import asyncio
+import os
 import subprocess
+import threading
 from typing import Optional, Tuple
 
+# Per-thread (event loop, {repo path: asyncio.Lock}) - git commands in one
+# repo race on .git/index.lock, and asyncio locks can't cross event loops
+_repo_locks = threading.local()
+
 
 def run_git(*args: str, cwd: str = ".") -> Tuple[bool, str]:
     """Run a git command and return (success, output)."""
@@ -16,6 +23,33 @@ def run_git(*args: str, cwd: str = ".") -> Tuple[bool, str]:
         return False, str(e)
 
 
+def _repo_lock(cwd: str) -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    if getattr(_repo_locks, "loop", None) is not loop:
+        _repo_locks.loop, _repo_locks.locks = loop, {}
+    return _repo_locks.locks.setdefault(os.path.abspath(cwd), asyncio.Lock())
+
+
+async def run_git_async(*args: str, cwd: str = ".") -> Tuple[bool, str]:
+    """Run a git command without blocking the event loop and return (success, output).
+    
+    Commands in the same repo run one at a time; different repos (e.g. the
+    worktrees of a stack) proceed concurrently.
+    """
+    async with _repo_lock(cwd):
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "git", *args,
+                cwd=cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT
+            )
+            output, _ = await proc.communicate()
+            return proc.returncode == 0, output.decode(errors="replace")
+        except Exception as e:
+            return False, str(e)
+
+
 def create_branch(branch_name: str, base: str = "main") -> Tuple[bool, str]:
     """Create and checkout a new branch, or checkout if it exists."""
     run_git("fetch", "origin")
@@ -44,8 +78,8 @@ def checkout_branch(branch_name: str) -> bool:
 def commit_changes(message: str, files: list[str] = None) -> bool:
     """Stage and commit changes."""
     if files:
-        for file in files:
-            run_git("add", file)
+        # One git process for all paths; "--" keeps paths from parsing as options
+        run_git("add", "--", *files)
     else:
         run_git("add", "-A")
 
@@ -79,3 +113,56 @@ def get_current_branch() -> str:
     """Get the current branch name."""
     success, output = run_git("branch", "--show-current")
     return output.strip() if success else ""
+
+
+# Async variants for graph nodes, routed through run_git_async so they don't
+# block the event loop and serialize per repo
+
+async def create_branch_async(branch_name: str, base: str = "main") -> Tuple[bool, str]:
+    """Create and checkout a new branch, or checkout if it exists."""
+    await run_git_async("fetch", "origin")
+
+    success, output = await run_git_async("checkout", "-b", branch_name, f"origin/{base}")
+    if success:
+        return True, f"Created and checked out {branch_name}"
+
+    success, output = await run_git_async("checkout", branch_name)
+    if success:
+        await run_git_async("pull", "origin", branch_name)
+        return True, f"Checked out existing branch {branch_name}"
+
+    return False, f"Failed to create/checkout branch: {output}"
+
+
+async def commit_changes_async(message: str, files: list[str] = None) -> bool:
+    """Stage and commit changes."""
+    if files:
+        await run_git_async("add", "--", *files)
+    else:
+        await run_git_async("add", "-A")
+
+    success, _ = await run_git_async("commit", "-m", message)
+    return success
+
+
+async def push_branch_async(branch_name: str) -> bool:
+    """Push branch to origin."""
+    success, _ = await run_git_async("push", "-u", "origin", branch_name)
+    return success
+
+
+async def create_pr_async(title: str, body: str, base: str = "main") -> Tuple[bool, Optional[str]]:
+    """Create a PR using GitHub CLI and return (success, pr_url)."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "gh", "pr", "create", "--title", title, "--body", body, "--base", base,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode == 0:
+            # gh pr create outputs the PR URL
+            return True, stdout.decode().strip()
+        return False, stderr.decode()
+    except Exception as e:
+        return False, str(e)
@@ -0,0 +1,122 @@
+"""Helpers for parsing JSON out of LLM responses."""
+import json
+import re
+import json_repair
+import orjson
+
+# Compiled once; every LLM node strips fences on each response
+FENCE_OPEN = re.compile(r"^```(?:json)?\n?")
+FENCE_CLOSE = re.compile(r"\n?```$")
+
+_DECODER = json.JSONDecoder()
+
+
+def strip_fence(content: str) -> str:
+    """Strip a surrounding markdown code fence (``` or ```json) if present."""
+    if not content.startswith("```"):
+        return content
+    # Fast path: fence line on top and closing fence at the end - plain slicing
+    nl = content.find("\n")
+    if nl != -1 and content.endswith("```") and nl < len(content) - 3:
+        return content[nl + 1:-3].rstrip()
+    # Jagged fences (no newline, missing close) go through the regexes
+    content = FENCE_OPEN.sub("", content, count=1)
+    return FENCE_CLOSE.sub("", content, count=1)
+
+
+def _fenced_blocks(content: str):
+    """Yield the body of each ``` fenced block, scanning with str.find (linear, no regex)."""
+    pos = content.find("```")
+    while pos != -1:
+        body_start = content.find("\n", pos) + 1
+        if not body_start:
+            return
+        end = content.find("```", body_start)
+        if end == -1:
+            return
+        yield content[body_start:end]
+        pos = content.find("```", end + 3)
+
+
+def parse_first_json(content: str):
+    """Parse the first JSON value in an LLM response, ignoring fences and chatter.
+    
+    A clean document goes through orjson; otherwise raw_decode stops at the
+    end of the first value, so trailing prose needs no regex. If the text
+    does not start with JSON, try each fenced block after leading prose,
+    then retry from the first "{". Malformed JSON
+    (trailing commas, unquoted keys, truncated output) is salvaged with
+    json_repair rather than discarding the whole reply.
+    
+    Returns:
+        The parsed value, or None if no JSON value could be decoded.
+    """
+    content = strip_fence(content.strip())
+    # Fast path: JSON-mode replies are a single clean document
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        pass
+    try:
+        return _DECODER.raw_decode(content)[0]
+    except json.JSONDecodeError:
+        pass
+    for block in _fenced_blocks(content):
+        try:
+            return orjson.loads(block)
+        except orjson.JSONDecodeError:
+            pass
+    start = content.find("{")
+    if start > 0:
+        try:
+            return _DECODER.raw_decode(content, start)[0]
+        except json.JSONDecodeError:
+            pass
+    # Last resort before the caller's failure path (and another LLM round trip)
+    if start > 0:
+        content = content[start:]
+    if content[:1] in ("{", "["):
+        repaired = json_repair.loads(content)
+        # Only accept a container of the kind the text opened, never a prose guess
+        if repaired and isinstance(repaired, dict if content[0] == "{" else list):
+            return repaired
+    return None
+
+
+def parse_json_artifact(content: str):
+    """Parse an LLM artifact and return it with the text that represents it.
+    
+    A clean JSON document keeps its original text. Anything that had to be
+    recovered from prose or repaired is re-serialized, so reviewers see
+    exactly the object that gets published.
+    
+    Returns:
+        (parsed value or None, artifact text)
+    """
+    content = strip_fence(content.strip())
+    try:
+        return orjson.loads(content), content
+    except orjson.JSONDecodeError:
+        pass
+    artifact = parse_first_json(content)
+    if artifact is None:
+        return None, content
+    return artifact, orjson.dumps(artifact, option=orjson.OPT_INDENT_2).decode()
+
+
+def validate_json(model, content: str):
+    """Validate an LLM response against a pydantic model.
+    
+    JSON-mode replies are clean and go through a single pydantic-core pass;
+    anything else is recovered with parse_first_json first.
+    
+    Raises:
+        ValueError: If no JSON object could be recovered or it fails validation.
+    """
+    try:
+        return model.model_validate_json(content)
+    except ValueError:
+        raw = parse_first_json(content)
+        if not isinstance(raw, dict):
+            raise ValueError("No JSON object in response")
+        return model.model_validate(raw)
@@ -0,0 +1,36 @@
+"""Opt-in response cache for deterministic (temperature=0) LLM calls."""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from agent.config.llm import gated_ainvoke
+
+MAX_ENTRIES = 512
+
+# blake2b(namespace + prompt) -> LLM response, least recently used first
+_responses: OrderedDict = OrderedDict()
+_lock = threading.Lock()  # poll workers share the cache across threads
+
+
+async def cached_ainvoke(llm, prompt: str, namespace: str):
+    """Await the gated llm.ainvoke(prompt), serving repeats from memory when LLM_CACHE=1.
+
+    The namespace (usually the node name) keeps nodes whose bound settings
+    differ from sharing entries for the same prompt text.
+    """
+    if os.getenv("LLM_CACHE") != "1":
+        return await gated_ainvoke(llm, prompt)
+
+    key = hashlib.blake2b(f"{namespace}\0{prompt}".encode(), digest_size=16).hexdigest()
+    with _lock:
+        response = _responses.get(key)
+        if response is not None:
+            _responses.move_to_end(key)
+            return response
+
+    response = await gated_ainvoke(llm, prompt)
+    with _lock:
+        _responses[key] = response
+        if len(_responses) > MAX_ENTRIES:
+            _responses.popitem(last=False)
+    return response
@@ -0,0 +1,41 @@
+"""Prompt templates parsed once at import time."""
+from string import Formatter
+
+
+class PromptTemplate:
+    """A str.format-style prompt, pre-split into literal text and field names.
+    
+    Parsing (including the {{ }} unescaping) happens once in __init__, so
+    format() only joins the cached chunks with the supplied values.
+    """
+
+    def __init__(self, template: str):
+        chunks = []
+        for literal, field, spec, conversion in Formatter().parse(template):
+            if spec or conversion:
+                raise ValueError(f"Unsupported format spec in prompt field {field!r}")
+            if literal:
+                chunks.append((literal, None))
+            if field is not None:
+                chunks.append((None, field))
+        self.template = template
+        self._chunks = tuple(chunks)
+
+    def format(self, **values) -> str:
+        """Render the prompt; raises KeyError for a missing field like str.format."""
+        return "".join([
+            literal if field is None else str(values[field])
+            for literal, field in self._chunks
+        ])
+
+
+NO_FEEDBACK = "None - this is the first draft."
+
+
+def format_review_feedback(feedback_list: list) -> str:
+    """Render rejected reviews as "- [agent]: concerns" lines for a retry prompt."""
+    return "\n".join([
+        f"- [{fb.agent}]: {', '.join(fb.concerns)}"
+        for fb in feedback_list
+        if not fb.approved
+    ]) or NO_FEEDBACK
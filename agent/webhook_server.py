@@ -0,0 +1,202 @@
+"""Process Linear issues as webhooks report them entering an AI action column.
+
+Event-driven replacement for the poll.py loop: Linear POSTs issue changes to
+/linear/webhook, matching issue IDs go onto an asyncio.Queue, and a few
+workers run them through the workflow. A reconciliation pass every
+RECONCILE_INTERVAL seconds picks up anything a missed delivery left behind
+and runs the merged-PR and parent-completion checks.
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import orjson
+from agent.adapters.linear_adapter import get_linear_adapter
+from agent.poll import (
+    ACTION_COLUMNS,
+    IN_PROGRESS_STATE,
+    POLLED_STATES,
+    REVIEW_PR_STATE,
+    TEAM_KEY,
+    acquire_single_instance_lock,
+    configure_logging,
+    check_in_progress_parents,
+    check_pr_merges_and_complete,
+    determine_workflow_phase,
+    process_issue,
+)
+
+WEBHOOK_PATH = "/linear/webhook"
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8000"))
+WEBHOOK_URL = os.getenv("LINEAR_WEBHOOK_URL")  # public URL to register with Linear
+WEBHOOK_SECRET = os.getenv("LINEAR_WEBHOOK_SECRET")
+# Accepting unsigned deliveries lets anyone queue work for Claude's Edit/Bash
+# tools, so running without a secret needs this explicit opt-out
+WEBHOOK_INSECURE = os.getenv("LINEAR_WEBHOOK_INSECURE") == "1"
+WORKER_COUNT = int(os.getenv("WEBHOOK_WORKERS", "2"))
+RECONCILE_INTERVAL = 300  # seconds
+MAX_TIMESTAMP_SKEW = 60  # seconds; older deliveries are treated as replays
+
+logger = logging.getLogger(__name__)
+
+
+def verify_signature(body: bytes, signature: str | None) -> bool:
+    """Check the Linear-Signature header (hex HMAC-SHA256 of the raw body)."""
+    if not WEBHOOK_SECRET:
+        return WEBHOOK_INSECURE
+    if not signature:
+        return False
+    expected = hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def issue_id_from_payload(payload: dict) -> str | None:
+    """Return the issue ID if the event puts an issue in an AI action column."""
+    if payload.get("type") != "Issue" or payload.get("action") not in ("create", "update"):
+        return None
+
+    sent_at = payload.get("webhookTimestamp")
+    if sent_at and abs(time.time() - sent_at / 1000) > MAX_TIMESTAMP_SKEW:
+        return None
+
+    data = payload.get("data") or {}
+    if (data.get("state") or {}).get("name") not in ACTION_COLUMNS:
+        return None
+    return data.get("id")
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Acknowledge deliveries immediately; the work happens on the queue."""
+
+    def do_POST(self):
+        if self.path != WEBHOOK_PATH:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not verify_signature(body, self.headers.get("Linear-Signature")):
+            self.send_response(401)
+            self.end_headers()
+            return
+
+        try:
+            payload = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        issue_id = issue_id_from_payload(payload) if isinstance(payload, dict) else None
+        if issue_id:
+            self.server.enqueue(issue_id)
+
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        # Deliveries are frequent; the workers log what they act on
+        pass
+
+
+def handle_issue(issue_id: str):
+    """Re-read the issue and process it if it is still in an action column."""
+    adapter = get_linear_adapter()
+    issue = adapter.get_issue_by_id(issue_id)
+    if not issue or issue.state not in ACTION_COLUMNS:
+        return
+    process_issue(issue, adapter, determine_workflow_phase(issue, issue.state))
+
+
+def reconcile(enqueue):
+    """Queue anything sitting in an action column, then run the completion checks."""
+    adapter = get_linear_adapter()
+    by_state = adapter.get_issues_in_states(TEAM_KEY, POLLED_STATES)
+    for column in ACTION_COLUMNS:
+        for issue in by_state[column]:
+            enqueue(issue.id)
+
+    completed = check_pr_merges_and_complete(adapter, by_state[REVIEW_PR_STATE])
+    check_in_progress_parents(
+        adapter,
+        [i for i in by_state[IN_PROGRESS_STATE] if i.id not in completed]
+    )
+
+
+async def worker(queue: asyncio.Queue, pending: set):
+    """Process queued issues one at a time; process_issue blocks, so it runs in a thread."""
+    loop = asyncio.get_running_loop()
+    while True:
+        issue_id = await queue.get()
+        try:
+            await loop.run_in_executor(None, handle_issue, issue_id)
+        except Exception as e:
+            logger.exception(f"Error handling issue {issue_id}: {e}")
+        finally:
+            pending.discard(issue_id)
+            queue.task_done()
+
+
+async def serve():
+    """Run the webhook receiver, the workers and the reconciliation timer."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    pending = set()  # queued or in-flight issue IDs; only touched on the loop thread
+
+    def enqueue(issue_id: str):
+        if issue_id not in pending:
+            pending.add(issue_id)
+            queue.put_nowait(issue_id)
+
+    def enqueue_threadsafe(issue_id: str):
+        loop.call_soon_threadsafe(enqueue, issue_id)
+
+    server = ThreadingHTTPServer(("", WEBHOOK_PORT), WebhookHandler)
+    server.enqueue = enqueue_threadsafe
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Listening on :{WEBHOOK_PORT}{WEBHOOK_PATH}")
+
+    workers = [asyncio.create_task(worker(queue, pending)) for _ in range(WORKER_COUNT)]
+    try:
+        while True:
+            # One failed sweep (timeout, 5xx, GraphQL error) must not stop the server
+            try:
+                await loop.run_in_executor(None, reconcile, enqueue_threadsafe)
+            except Exception as e:
+                logger.exception(f"Error reconciling action columns: {e}")
+            await asyncio.sleep(RECONCILE_INTERVAL)
+    finally:
+        server.shutdown()
+        for task in workers:
+            task.cancel()
+
+
+def main():
+    """Register the webhook (if a public URL is configured) and start serving."""
+    print("🏭 Software Factory - Webhook Pipeline")
+    print("=" * 50)
+    print(f"Monitoring columns: {', '.join(ACTION_COLUMNS)}")
+    print(f"Reconciling every {RECONCILE_INTERVAL}s")
+    configure_logging()
+    _lock = acquire_single_instance_lock()  # held for the life of the process
+
+    if not WEBHOOK_SECRET:
+        if not WEBHOOK_INSECURE:
+            logger.error("LINEAR_WEBHOOK_SECRET is not set; refusing to accept unsigned deliveries "
+                         "(set LINEAR_WEBHOOK_INSECURE=1 to run without verification)")
+            sys.exit(1)
+        logger.warning("LINEAR_WEBHOOK_INSECURE=1 - deliveries will not be verified")
+
+    if WEBHOOK_URL:
+        get_linear_adapter().ensure_webhook(TEAM_KEY, WEBHOOK_URL, WEBHOOK_SECRET)
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()